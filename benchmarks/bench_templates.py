@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark issue template rendering as the number of milestones grows
+
+Renders the task and discussion templates for synthetic milestones and
+prints the cost per rendered file, which should stay flat from tens to
+hundreds of milestones.
+
+Usage: python benchmarks/bench_templates.py [--sizes 10 100 500 1000] [--workers N]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import create_templates
+
+def synthetic_jobs(count):
+    """Render jobs for `count` milestones with three labels each."""
+    jobs = []
+    for i in range(count):
+        data = {'milestone': f'Milestone{i}', 'milestone_labels': [f'label-{i}-{j}' for j in range(3)]}
+        for name in create_templates.TEMPLATES.values():
+            jobs.append((name, data))
+    return jobs
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark issue template rendering")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500, 1000],
+                        help="Milestone counts to render")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Render processes (default: 1, in-process; 0 = one per CPU)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for name in create_templates.TEMPLATES.values():
+        create_templates.get_environment().get_template(name)
+    print(f"Template load (bytecode cache): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print(f"{'milestones':>10} {'files':>6} {'total ms':>10} {'ms/file':>8}")
+    for size in args.sizes:
+        jobs = synthetic_jobs(size)
+        start = time.perf_counter()
+        create_templates.render_all(jobs, args.workers or None)
+        elapsed = time.perf_counter() - start
+        print(f"{size:>10} {len(jobs):>6} {elapsed * 1000:>10.1f} {elapsed * 1000 / len(jobs):>8.3f}")
+
+if __name__ == "__main__":
+    main()
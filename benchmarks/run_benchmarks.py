@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the generators, on synthetic inputs from 10 to 10,000 entries
+
+For each size it writes a synthetic categories.txt, a task CSV shaped like
+src/framework_tasks.csv and a template directory into a temporary
+directory, then times each phase (best of --repeat runs):
+
+    parse_categories     categories.txt text -> validated model with indexes
+    load_categories      the same through the on-disk cache (cache hit)
+    milestones           unique milestones and their labels from the model
+    render_templates     generate_templates into an empty directory
+    regenerate_templates generate_templates again with nothing changed
+    scan_templates       read the headers of every template, no header cache
+    create_config        scan (cached headers) and build config.yml
+    plan_sync            read labels/milestones from scripts/fake_github.py and diff them
+    plan_import          stream the task CSV and hash every row for the upsert
+
+Results are written as JSON to ../.cache/benchmarks/. With a baseline
+(benchmarks/baseline.json, or --baseline), any phase slower than the
+baseline by more than --threshold makes the suite exit with status 1.
+--save-baseline stores this run as the new baseline.
+
+The caches the scripts normally keep in ../.cache are pointed at the
+temporary directory, so a benchmark run leaves them untouched.
+
+Usage: python benchmarks/run_benchmarks.py [--sizes 10 100 1000 10000] [--repeat 3]
+                                           [--baseline FILE] [--threshold 1.5] [--save-baseline]
+"""
+
+import io
+import csv
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import contextlib
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import categories as categories_module
+import create_config
+import create_templates
+import fake_github
+import github_client
+import import_tasks
+import sync_categories
+
+RESULTS_DIR = ROOT / ".cache" / "benchmarks"
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+
+# Differences below this are noise, whatever the ratio
+MIN_REGRESSION_SECONDS = 0.002
+
+def write_categories(path, count, seed=0):
+    """A categories.txt with count entries: mostly label,milestone pairs, some label-only and single entries."""
+    rng = random.Random(seed)
+    milestones = [f"Milestone{i}" for i in range(max(1, count // 3))]
+    lines = ["# Synthetic categories"]
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.1:
+            lines.append(f"Label{i},")
+        elif kind < 0.2:
+            lines.append(f"Single{i}")
+        else:
+            lines.append(f"Label{i},{rng.choice(milestones)}")
+    path.write_text('\n'.join(lines) + '\n')
+
+def write_tasks(path, count, categories, seed=0):
+    """A task CSV shaped like src/framework_tasks.csv, with count rows."""
+    rng = random.Random(seed)
+    milestones = categories.milestones or ['Framework']
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['title', 'start_date', 'end_date', 'milestone', 'labels', 'assignees', 'content'])
+        for i in range(count):
+            milestone = rng.choice(milestones)
+            labels = categories.labels_by_milestone.get(milestone, [])[:3] + ['CVsTT']
+            content = (f"# Task {i}\n\n## Details\nSynthetic task number {i} for {milestone}.\n\n"
+                       f"## Status\n- [ ] Discussed\n- [ ] Awaiting feedback\n- [ ] Done\n")
+            writer.writerow([f"Task {i}", '2025-05-22', '2025-07-03', milestone, ','.join(labels),
+                             rng.choice(['LT', 'OTHERS', 'CVsTT']), content])
+
+def best_of(repeat, func, setup=None):
+    """Fastest of repeat timed calls of func, each after an untimed setup()."""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def clear_directory(path):
+    for entry in path.glob('*'):
+        entry.unlink()
+
+def run_size(size, workdir, repeat):
+    """Time every phase for one input size; returns {phase: seconds}."""
+    categories_file = workdir / "categories.txt"
+    template_dir = workdir / "templates"
+    tasks_file = workdir / "tasks.csv"
+    write_categories(categories_file, size)
+    text = categories_file.read_text()
+    parsed = categories_module.parse_categories(text)
+    write_tasks(tasks_file, size, parsed)
+    template_dir.mkdir(exist_ok=True)
+
+    results = {}
+    results['parse_categories'] = best_of(repeat, lambda: categories_module.parse_categories(text))
+    categories_module.load_categories(categories_file)
+    results['load_categories'] = best_of(repeat, lambda: categories_module.load_categories(categories_file),
+                                         setup=categories_module._loaded.clear)
+    results['milestones'] = best_of(repeat, lambda: [(m, list(labels)) for m, labels
+                                                     in parsed.labels_by_milestone.items()])
+
+    def empty_templates():
+        clear_directory(template_dir)
+        create_templates.MANIFEST_FILE.unlink(missing_ok=True)
+    results['render_templates'] = best_of(repeat, lambda: create_templates.generate_templates(parsed, template_dir),
+                                          setup=empty_templates)
+    results['regenerate_templates'] = best_of(repeat, lambda: create_templates.generate_templates(parsed, template_dir))
+
+    results['scan_templates'] = best_of(repeat, lambda: create_config.scan_template_files(template_dir),
+                                        setup=lambda: create_config.HEADER_CACHE_FILE.unlink(missing_ok=True))
+    results['create_config'] = best_of(repeat, lambda: create_config.create_config_yml(
+        create_config.scan_template_files(template_dir), custom_links=[]))
+
+    # Half of the labels and milestones already exist, some with an outdated description
+    desired = sync_categories.desired_state(parsed)
+    state = fake_github.FakeState()
+    for i, (name, description) in enumerate(desired['labels'].items()):
+        if i % 2 == 0:
+            state.add_label('benchmark/repo', name, description='old' if i % 4 == 0 else description)
+    for i, (name, description) in enumerate(desired['milestones'].items()):
+        if i % 2 == 0:
+            state.add_milestone('benchmark/repo', name, description)
+    # Without ETags every run reads the full lists, as the first sync of the day would
+    fake = fake_github.FakeGitHub(state, etags=False).start()
+    github_client._client = github_client.GitHubClient(base_url=fake.url, token='benchmark',
+                                                       cache=github_client.EtagCache(workdir / "github"))
+    try:
+        results['plan_sync'] = best_of(repeat, lambda: sync_categories.build_plan(
+            desired, sync_categories.read_state('benchmark/repo')))
+    finally:
+        github_client._client.close()
+        github_client._client = None
+        fake.close()
+
+    results['plan_import'] = best_of(repeat, lambda: [import_tasks.render_marker(task)
+                                                      for task in import_tasks.read_tasks(tasks_file)])
+    return results
+
+def compare(results, baseline, threshold):
+    """Phases slower than threshold x baseline: [(phase, size, seconds, baseline seconds)]."""
+    regressions = []
+    for phase, sizes in results.items():
+        for size, seconds in sizes.items():
+            before = baseline.get(phase, {}).get(size)
+            if before and seconds > before * threshold and seconds - before > MIN_REGRESSION_SECONDS:
+                regressions.append((phase, size, seconds, before))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the generators on synthetic inputs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000],
+                        help="Number of categories.txt entries and CSV rows to generate")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per phase, the fastest counts (default: 3)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="Results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="Fail when a phase takes more than this times its baseline (default: 1.5)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        # Keep the scripts' own caches out of ../.cache
+        categories_module.CACHE_FILE = workdir / "categories.pickle"
+        create_templates.MANIFEST_FILE = workdir / "templates_manifest.json"
+        create_config.HEADER_CACHE_FILE = workdir / "template_headers.json"
+
+        for size in args.sizes:
+            size_dir = workdir / str(size)
+            size_dir.mkdir()
+            timings = run_size(size, size_dir, args.repeat)
+            for phase, seconds in timings.items():
+                results.setdefault(phase, {})[str(size)] = seconds
+
+    sizes = [str(size) for size in args.sizes]
+    print(f"{'phase':<22}" + ''.join(f"{size:>12}" for size in sizes))
+    for phase, timings in results.items():
+        print(f"{phase:<22}" + ''.join(f"{timings[size] * 1000:>10.2f}ms" for size in sizes))
+
+    record = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'results': results,
+    }
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output = RESULTS_DIR / f"results-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.write_text(json.dumps(record, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(record, indent=2) + '\n')
+        print(f"✓ Saved baseline to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}, run with --save-baseline to create one")
+        return 0
+    baseline = json.loads(args.baseline.read_text())['results']
+    regressions = compare(results, baseline, args.threshold)
+    for phase, size, seconds, before in regressions:
+        print(f"❌ {phase} at {size}: {seconds * 1000:.2f}ms, baseline {before * 1000:.2f}ms "
+              f"({seconds / before:.1f}x)")
+    if regressions:
+        return 1
+    print(f"✅ No phase slower than {args.threshold}x its baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Roadmap analytics: progress, overdue tasks and burndown per milestone and assignee
+
+Tasks are read from the task CSVs or from the local mirror (mirror.py) and
+turned into columns: one NumPy array per attribute, with milestones as
+integer codes and assignees and status checkboxes as boolean matrices (one
+row per task, one column per assignee or checkbox). Every figure is then an
+array expression or a matrix product over all tasks at once, so thousands of
+tasks take milliseconds.
+
+Status comes from the checkboxes in the task bodies (`- [x] Ongoing`,
+`- [ ] Need Assistance`). All bodies are scanned with one regex pass over
+their concatenation, and each match is mapped back to its task by counting
+the body separators before it.
+A task is done when its issue is closed or a DONE_STATUSES box is checked,
+and overdue when it is not done and its end date has passed.
+
+The burndown counts, at each step from the first start date, the tasks
+still planned (end date not reached) and those still open. Open tasks use
+the issues' closed dates, so from CSVs, which have none, a task with a done
+box counts as done from today.
+
+Usage: python analytics.py [CSV ...] [--mirror] [--repo OWNER/REPO] [--project ID] [--today YYYY-MM-DD]
+                           [--burndown [MILESTONE]] [--step DAYS]
+
+    import analytics
+    tasks = analytics.from_csv(['../src/framework_tasks.csv'])
+    analytics.progress(tasks, 'assignee')
+    analytics.to_frame(tasks)   # pandas DataFrame, for the notebook
+"""
+
+import re
+import csv
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+import github_client
+import mirror
+import project_board
+import sync_categories
+import tracing
+from validate_tasks import DATE_PATTERN, split_list
+
+# A body separator, or a checkbox line: (separator, tick, name)
+CHECKBOX = re.compile(r'^(?:(\x1e)|[ \t]*[-*] \[([ x])\][ \t]*(\S[^\n]*?)[ \t]*$)', re.M)
+
+# Lowercase checkbox names that mark a task as done, in progress or stuck
+DONE_STATUSES = ('done', 'completed', 'complete', 'finished')
+ACTIVE_STATUSES = ('started', 'ongoing', 'in progress')
+HELP_STATUSES = ('need assistance', 'blocked')
+
+# Joins the bodies scanned for checkboxes (an ASCII record separator; NUL would be
+# stripped by NumPy's string arrays), so no checkbox line spans two of them
+BODY_SEPARATOR = '\n\x1e\n'
+
+def factorize(values):
+    """(codes, names): an int code per value into the names in order of first appearance; '' gets -1."""
+    index = {}
+    codes = np.fromiter((index.setdefault(value, len(index)) if value else -1 for value in values),
+                        dtype=np.int64, count=len(values))
+    return codes, list(index)
+
+def to_dates(values):
+    """datetime64[D] array of YYYY-MM-DD strings (or ISO timestamps); NaT where there is no date."""
+    return np.array([value[:10] if value and DATE_PATTERN.fullmatch(value[:10]) else 'NaT' for value in values],
+                    dtype='datetime64[D]')
+
+def one_hot(lists):
+    """(matrix, names): a boolean tasks x names matrix with True where a task's list holds the name."""
+    lengths = np.fromiter(map(len, lists), dtype=np.int64, count=len(lists))
+    codes, names = factorize([value for values in lists for value in values])
+    matrix = np.zeros((len(lists), len(names)), dtype=bool)
+    matrix[np.repeat(np.arange(len(lists)), lengths), codes] = True
+    return matrix, names
+
+def parse_statuses(bodies):
+    """(checked, names): tasks x checkbox-names matrix of the boxes ticked in each body.
+
+    Names are lowercased and sorted; a box that appears only unticked still
+    gets a column.
+    """
+    with tracing.span('parse statuses', tasks=len(bodies)):
+        found = CHECKBOX.findall(BODY_SEPARATOR.join(bodies).lower())
+        if not found:
+            return np.zeros((len(bodies), 0), dtype=bool), []
+        separators, ticks, names = (np.array(column) for column in zip(*found))
+        is_box = separators == ''
+        # Every separator starts the next body, so counting them gives each checkbox's task
+        task = np.cumsum(~is_box)[is_box]
+        names, codes = np.unique(names[is_box], return_inverse=True)
+        ticked = ticks[is_box] == 'x'
+
+        checked = np.zeros((len(bodies), len(names)), dtype=bool)
+        checked[task[ticked], codes[ticked]] = True
+    return checked, names.tolist()
+
+class Tasks:
+    """Tasks as columns; every array has one entry (or row) per task.
+
+    titles, numbers        lists (numbers are issue numbers, None from CSVs)
+    bodies                 list of the task or issue bodies
+    milestone              int codes into milestone_names, -1 for none
+    start, end, closed     datetime64[D] arrays, NaT when unknown
+    is_closed              bool array (issue closed)
+    assigned               bool matrix tasks x assignee_names
+    checked                bool matrix tasks x status_names (ticked checkboxes)
+    """
+
+    def __init__(self, titles, start, end, milestones, assignees, bodies, closed=None, numbers=None):
+        self.titles = list(titles)
+        self.numbers = list(numbers) if numbers is not None else [None] * len(self.titles)
+        self.bodies = list(bodies)
+        self.start = to_dates(start)
+        self.end = to_dates(end)
+        self.closed = to_dates(closed if closed is not None else [''] * len(self.titles))
+        self.is_closed = ~np.isnat(self.closed)
+        self.milestone, self.milestone_names = factorize(milestones)
+        self.assigned, self.assignee_names = one_hot(assignees)
+        self.checked, self.status_names = parse_statuses(bodies)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def has_status(self, names):
+        """Tasks with any of the named checkboxes ticked."""
+        columns = [i for i, name in enumerate(self.status_names) if name in names]
+        return self.checked[:, columns].any(axis=1)
+
+    @property
+    def done(self):
+        return self.is_closed | self.has_status(DONE_STATUSES)
+
+    def overdue(self, today):
+        """Tasks not done whose end date is before today."""
+        return ~self.done & ~np.isnat(self.end) & (self.end < np.datetime64(today, 'D'))
+
+    def membership(self, by):
+        """(matrix, names): tasks x groups for by='milestone' or 'assignee'."""
+        if by == 'assignee':
+            return self.assigned, self.assignee_names
+        matrix = np.zeros((len(self), len(self.milestone_names)), dtype=bool)
+        has = self.milestone >= 0
+        matrix[np.flatnonzero(has), self.milestone[has]] = True
+        return matrix, self.milestone_names
+
+def from_rows(rows):
+    """Tasks from task-CSV rows (dicts with the import_tasks.py columns)."""
+    return Tasks(
+        titles=[(row.get('title') or '').strip() for row in rows],
+        start=[(row.get('start_date') or '').strip() for row in rows],
+        end=[(row.get('end_date') or '').strip() for row in rows],
+        milestones=[(split_list(row.get('milestone')) or [''])[0] for row in rows],
+        assignees=[split_list(row.get('assignees')) for row in rows],
+        bodies=[row.get('content') or '' for row in rows],
+    )
+
+def from_csv(paths):
+    """Tasks from one or more task CSVs."""
+    rows = []
+    for path in paths:
+        with open(path, newline='') as f:
+            rows.extend(csv.DictReader(f))
+    return from_rows(rows)
+
+def from_mirror(db, repo, project_id=None):
+    """Tasks from the issues in the local mirror, with start/end dates from the project board."""
+    issues = mirror.issues(db, repo)
+    values = mirror.project_values(db, project_id, repo) if project_id else {}
+    dates = [values.get((repo, issue['number']), {}) for issue in issues]
+    return Tasks(
+        titles=[issue['title'] for issue in issues],
+        numbers=[issue['number'] for issue in issues],
+        start=[d.get(project_board.START_FIELD, '') for d in dates],
+        end=[d.get(project_board.END_FIELD, '') for d in dates],
+        milestones=[issue['milestone'] or '' for issue in issues],
+        assignees=[issue['assignees'] for issue in issues],
+        bodies=[issue['body'] or '' for issue in issues],
+        closed=[(issue['closed_at'] or '') if issue['state'] == 'closed' else '' for issue in issues],
+    )
+
+def progress(tasks, by='milestone', today=None):
+    """Counts per milestone or assignee: a dict of equal-length columns.
+
+    'name', 'tasks', 'done', 'active', 'help', 'overdue' and 'progress'
+    (done / tasks). A task with several assignees counts for each of them.
+    """
+    today = today or np.datetime64('today', 'D')
+    matrix, names = tasks.membership(by)
+    columns = np.column_stack([
+        np.ones(len(tasks), dtype=bool),
+        tasks.done,
+        tasks.has_status(ACTIVE_STATUSES) & ~tasks.done,
+        tasks.has_status(HELP_STATUSES) & ~tasks.done,
+        tasks.overdue(today),
+    ]).astype(np.int64)
+    counts = matrix.T.astype(np.int64) @ columns
+    totals = counts[:, 0]
+    return {
+        'name': list(names),
+        'tasks': totals,
+        'done': counts[:, 1],
+        'active': counts[:, 2],
+        'help': counts[:, 3],
+        'overdue': counts[:, 4],
+        'progress': np.divide(counts[:, 1], totals, out=np.zeros(len(totals)), where=totals > 0),
+    }
+
+def burndown(tasks, mask=None, today=None, step=7):
+    """(days, planned, open) every step days from the first start date to the last end date.
+
+    planned counts the tasks whose end date is still ahead (or unknown);
+    open counts those not done yet, and is -1 for days after today. mask
+    selects the tasks (e.g. one milestone).
+    """
+    today = np.datetime64(today or 'today', 'D')
+    mask = np.ones(len(tasks), dtype=bool) if mask is None else mask
+    start, end = tasks.start[mask], tasks.end[mask]
+    known = np.concatenate((start[~np.isnat(start)], end[~np.isnat(end)]))
+    if not len(known):
+        return np.array([], dtype='datetime64[D]'), np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    days = np.arange(known.min(), max(known.max(), today) + 1, step)
+
+    # Done without a closed date (a ticked done box) counts from today
+    done_on = np.where(tasks.is_closed, tasks.closed, np.where(tasks.done, today, np.datetime64('NaT')))[mask]
+    total = int(mask.sum())
+    planned = total - np.searchsorted(np.sort(end[~np.isnat(end)]), days, side='right')
+    still_open = total - np.searchsorted(np.sort(done_on[~np.isnat(done_on)]), days, side='right')
+    return days, planned, np.where(days <= today, still_open, -1)
+
+def to_frame(tasks, today=None):
+    """The tasks as a pandas DataFrame, one row per task (needs pandas)."""
+    import pandas as pd
+    today = today or np.datetime64('today', 'D')
+    frame = pd.DataFrame({
+        'number': tasks.numbers,
+        'title': tasks.titles,
+        'milestone': [tasks.milestone_names[code] if code >= 0 else None for code in tasks.milestone],
+        'start': tasks.start,
+        'end': tasks.end,
+        'closed': tasks.closed,
+        'done': tasks.done,
+        'overdue': tasks.overdue(today),
+        'assignees': [[tasks.assignee_names[i] for i in np.flatnonzero(row)] for row in tasks.assigned],
+    })
+    for i, name in enumerate(tasks.status_names):
+        frame[name] = tasks.checked[:, i]
+    return frame
+
+def print_progress(table, heading):
+    print(f"\n{heading}:")
+    if not table['name']:
+        print("   (none)")
+        return
+    width = max([len(heading)] + [len(name) for name in table['name']])
+    print(f"   {heading:<{width}}  Tasks  Done  Active  Help  Overdue  Progress")
+    order = np.argsort(table['name'], kind='stable')
+    for i in order:
+        print(f"   {table['name'][i]:<{width}}  {table['tasks'][i]:5d}  {table['done'][i]:4d}  "
+              f"{table['active'][i]:6d}  {table['help'][i]:4d}  {table['overdue'][i]:7d}  "
+              f"{table['progress'][i]:8.0%}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Progress, overdue tasks and burndown of the roadmap")
+    parser.add_argument("csv", nargs="*", help="Task CSV files (default: ../src/*.csv)")
+    parser.add_argument("--mirror", action="store_true", help="Read the issues from the local mirror (mirror.py)")
+    parser.add_argument("--repo", help="GitHub repository (owner/repo) for --mirror - uses current repo if not specified")
+    parser.add_argument("--project", help="Project board whose dates are used with --mirror (default: the CVsTT board)")
+    parser.add_argument("--today", help="Date overdue tasks are counted at (YYYY-MM-DD, default: today)")
+    parser.add_argument("--burndown", nargs="?", const="", metavar="MILESTONE",
+                        help="Print the burndown of all tasks, or of one milestone")
+    parser.add_argument("--step", type=int, default=7, help="Days between burndown points (default: 7)")
+    parser.add_argument("--api-url", metavar="URL", help="API whose mirror is read with --mirror")
+    args = parser.parse_args()
+
+    print("Roadmap analytics")
+    print("=================")
+
+    today = np.datetime64(args.today or 'today', 'D')
+    try:
+        if args.mirror:
+            if args.api_url:
+                github_client.use_api(args.api_url)
+            repo = sync_categories.resolve_repo(args.repo)
+            if not repo:
+                print("❌ Error: could not determine the repository, use --repo OWNER/REPO")
+                return
+            tasks = from_mirror(mirror.connect(), repo, args.project or project_board.PROJECT_ID)
+            print(f"Loaded {len(tasks)} issues of {repo} from the local mirror (today: {today})")
+        else:
+            paths = args.csv or sorted((Path(__file__).parent.parent / "src").glob("*.csv"))
+            tasks = from_csv(paths)
+            print(f"Loaded {len(tasks)} tasks from {len(paths)} CSV files (today: {today})")
+
+        print_progress(progress(tasks, 'milestone', today), "Milestone")
+        print_progress(progress(tasks, 'assignee', today), "Assignee")
+
+        done = tasks.done
+        overdue = tasks.overdue(today)
+        print(f"\n✅ {int(done.sum())} of {len(tasks)} tasks done, {int(overdue.sum())} overdue")
+
+        if args.burndown is not None:
+            mask = None
+            if args.burndown:
+                if args.burndown not in tasks.milestone_names:
+                    print(f"❌ Error: no tasks in milestone {args.burndown}")
+                    return
+                mask = tasks.milestone == tasks.milestone_names.index(args.burndown)
+            days, planned, still_open = burndown(tasks, mask, today, args.step)
+            print(f"\nBurndown ({args.burndown or 'all milestones'}), every {args.step} days:")
+            print(f"   {'Date':<10}  Planned  Open")
+            for day, plan, left in zip(days, planned, still_open):
+                print(f"   {day}  {plan:7d}  {left if left >= 0 else '':>4}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+if __name__ == "__main__":
+    main()
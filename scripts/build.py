@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Run the whole regeneration in one process: sync → templates → config
+
+The steps are modelled as a small dependency graph:
+
+    categories ─┬─> sync       (labels and milestones on GitHub)
+                └─> templates ──> config   (.github/ISSUE_TEMPLATE/config.yml)
+
+categories.txt is parsed once and handed to both sync and templates, which
+run concurrently. The templates step passes the name, description and
+filename of every generated template to the config step in memory, so
+config.yml is built without re-reading them from disk.
+
+Each step's inputs are fingerprinted in ../.cache/build_state.json; a step
+whose fingerprint matches the last successful run is skipped. The sync step
+always runs, since labels and milestones can be deleted or edited on GitHub:
+it reads them with conditional requests, so an unchanged repository costs
+two free 304s.
+
+With --watch the process stays up after the build and regenerates only the
+templates and config entries affected by each later change (see watch.py).
+
+Usage: python build.py [--repo OWNER/REPO] [--skip-sync] [--plan] [--force] [--workers N] [--trace FILE]
+                       [--watch [--poll]]
+"""
+
+import json
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+import create_config
+import create_templates
+import github_client
+import sync_categories
+import tracing
+import watch
+from categories import load_categories, CATEGORIES_FILE
+
+STATE_FILE = Path(__file__).parent.parent / ".cache" / "build_state.json"
+CUSTOM_LINKS_FILE = create_config.CUSTOM_LINKS_FILE
+
+class Stage:
+    """One step of the pipeline.
+
+    fingerprint(results) returns a string identifying the step's inputs, or
+    None if it must always run. It is checked before the step and stored
+    after it, so a step's own outputs can be part of it. run(results)
+    returns the step's result, or None on failure. Both get the results of
+    the steps it depends on.
+    """
+
+    def __init__(self, name, run, deps=(), fingerprint=None):
+        self.name = name
+        self.run = run
+        self.deps = tuple(deps)
+        self.fingerprint = fingerprint or (lambda results: None)
+
+def digest(*parts):
+    """Stable hash of JSON-serialisable parts."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+def load_state():
+    try:
+        with open(STATE_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def run_stage(stage, inputs):
+    with tracing.span(stage.name, 'stage'):
+        return stage.run(inputs)
+
+def run_pipeline(stages, state, force=False, workers=4):
+    """Run stages in dependency order, independent ones concurrently.
+
+    Returns (results, statuses); statuses maps stage name to 'ran', 'skipped',
+    'failed' or 'blocked' (a dependency failed). state is updated in place.
+    """
+    unknown = {dep for stage in stages for dep in stage.deps} - {stage.name for stage in stages}
+    if unknown:
+        raise ValueError(f"Unknown pipeline dependencies: {', '.join(sorted(unknown))}")
+
+    results = {}
+    statuses = {}
+    running = {}
+
+    def start(pool, stage):
+        inputs = {dep: results[dep] for dep in stage.deps}
+        fingerprint = stage.fingerprint(inputs)
+        previous = state.get(stage.name, {})
+        if not force and fingerprint and previous.get('fingerprint') == fingerprint:
+            results[stage.name] = previous.get('result')
+            statuses[stage.name] = 'skipped'
+            print(f"- {stage.name}: inputs unchanged, skipped")
+            return
+        print(f"▶ {stage.name}")
+        running[pool.submit(run_stage, stage, inputs)] = (stage, inputs)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while len(statuses) < len(stages):
+            settled = len(statuses)
+            for stage in stages:
+                if stage.name in statuses or any(stage is s for s, _ in running.values()):
+                    continue
+                if any(statuses.get(dep) in ('failed', 'blocked') for dep in stage.deps):
+                    statuses[stage.name] = 'blocked'
+                    print(f"✗ {stage.name}: blocked by a failed dependency")
+                elif all(dep in results for dep in stage.deps):
+                    start(pool, stage)
+
+            if not running:
+                if len(statuses) == settled:
+                    # Nothing running and nothing could start: the remaining stages wait on each other
+                    waiting = [stage.name for stage in stages if stage.name not in statuses]
+                    raise ValueError(f"Pipeline dependency cycle between: {', '.join(waiting)}")
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, inputs = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ {stage.name}: {e}")
+                    result = None
+                if result is None:
+                    statuses[stage.name] = 'failed'
+                    state.pop(stage.name, None)
+                    continue
+                results[stage.name] = result
+                statuses[stage.name] = 'ran'
+                # Taken after the run, since a step's own outputs can be among its inputs
+                fingerprint = stage.fingerprint(inputs)
+                if fingerprint:
+                    state[stage.name] = {'fingerprint': fingerprint, 'result': result}
+    return results, statuses
+
+def file_stamp(path):
+    """(name, mtime, size) of a file, or None if missing; cheap change detection without reading it."""
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return [Path(path).name, stat.st_mtime_ns, stat.st_size]
+
+def build_stages(args):
+    """The sync → templates → config graph for the given command-line options."""
+    categories = load_categories()
+    print(f"Loaded {len(categories.entries)} entries from {CATEGORIES_FILE.name}")
+    categories_key = [(c.label, c.milestone) for c in categories.entries]
+    template_dir = create_config.TEMPLATE_DIR
+
+    try:
+        custom_links_text = CUSTOM_LINKS_FILE.read_text()
+    except FileNotFoundError:
+        custom_links_text = '[]'
+
+    def sync(results):
+        repo = sync_categories.resolve_repo(args.repo)
+        if not repo:
+            print("❌ sync: could not determine the repository, use --repo OWNER/REPO")
+            return None
+        outcome = sync_categories.sync_repo(categories, repo, plan_only=args.plan, workers=args.workers)
+        if outcome is None:
+            return None
+        plan, done = outcome['plan'], outcome['done']
+        planned = {action: len(items) for action, items in plan.items()}
+        if done and any(done[action] < count for action, count in planned.items()):
+            # Leave the step unfinished so the failed writes are retried next time
+            print("❌ sync: some changes failed")
+            return None
+        return {'repo': repo, 'planned': planned, 'done': done}
+
+    def templates(results):
+        return create_templates.generate_templates(categories)
+
+    def templates_fingerprint(results):
+        sources = [create_templates.template_source(name) for name in create_templates.TEMPLATES.values()]
+        outputs = sorted(file_stamp(path) for path in template_dir.glob("*.yml")
+                         if create_templates.is_generated(path.name))
+        return digest(categories_key, sources, outputs)
+
+    def general_templates():
+        # Hand-written templates are not generated, so they are the only ones read from disk
+        return sorted(path for path in template_dir.glob("*.yml")
+                      if path.name != "config.yml" and not create_templates.is_generated(path.name))
+
+    def config(results):
+        templates = list(results['templates']['templates'])
+        templates += [meta for meta in map(create_config.read_template, general_templates()) if meta]
+        config = create_config.create_config_yml(templates, json.loads(custom_links_text))
+        config_file = create_config.write_config(config)
+        print(f"✓ Created {config_file}")
+        return {'entries': len(config['contact_links'])}
+
+    def config_fingerprint(results):
+        # config.yml itself is included so an edited or deleted file is regenerated
+        return digest(results['templates']['templates'], custom_links_text,
+                      [file_stamp(path) for path in general_templates()],
+                      file_stamp(template_dir / "config.yml"))
+
+    stages = [Stage('templates', templates, fingerprint=templates_fingerprint),
+              Stage('config', config, deps=['templates'], fingerprint=config_fingerprint)]
+    if not args.skip_sync:
+        # No fingerprint: GitHub's side can change without any local input changing
+        stages.insert(0, Stage('sync', sync))
+    return stages
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync categories and regenerate issue templates and config")
+    parser.add_argument("--repo", help="GitHub repository (owner/repo) - uses current repo if not specified")
+    parser.add_argument("--skip-sync", action="store_true", help="Do not sync labels and milestones")
+    parser.add_argument("--plan", action="store_true", help="Only plan the sync, do not write to GitHub")
+    parser.add_argument("--force", action="store_true", help="Run every step even if its inputs are unchanged")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Concurrent GitHub requests during sync (default: 4)")
+    parser.add_argument("--api-url", metavar="URL",
+                        help="GitHub API to use, e.g. http://127.0.0.1:8000 for fake_github.py")
+    parser.add_argument("--trace", metavar="FILE", help="Write a Chrome trace of the run's phases to FILE")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and regenerate templates and config when their inputs change")
+    parser.add_argument("--poll", action="store_true",
+                        help="With --watch, poll for changes instead of using inotify (e.g. on network drives)")
+    args = parser.parse_args()
+    if args.api_url:
+        github_client.use_api(args.api_url)
+    if args.trace:
+        tracing.enable(args.trace)
+
+    print("Building CVsTT project planning files")
+    print("=====================================")
+
+    try:
+        state = load_state()
+        stages = build_stages(args)
+        _, statuses = run_pipeline(stages, state, args.force)
+        create_templates.write_atomic(STATE_FILE, json.dumps(state, indent=2, sort_keys=True))
+
+        print(f"\n✅ Summary:")
+        for stage in stages:
+            print(f"   {stage.name}: {statuses[stage.name]}")
+        github_client.usage.report()
+
+        if args.watch:
+            watch.watch(poll=args.poll)
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Shared categories model for the scripts and the notebook
+
+Parses ../categories.txt (one `label,milestone` per line) once into a
+validated Categories model with label -> milestone and milestone -> labels
+indexes. The parsed model is cached in ../.cache/categories.pickle, keyed by
+the file's mtime, size and SHA-256, so later runs skip parsing entirely.
+
+Usage:
+    from categories import load_categories
+    categories = load_categories()
+    categories.labels_by_milestone   # {'EMD': ['EMD'], ...}
+    categories.milestone_by_label    # {'EMD': 'EMD', 'ESGF': '', ...}
+
+Run directly to print the parsed model and any validation warnings.
+"""
+
+import os
+import pickle
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import tracing
+
+CATEGORIES_FILE = Path(__file__).parent.parent / "categories.txt"
+CACHE_FILE = Path(__file__).parent.parent / ".cache" / "categories.pickle"
+
+# Bump when the model changes shape so stale pickles are ignored
+CACHE_VERSION = 1
+
+# GitHub rejects longer label names
+MAX_LABEL_LENGTH = 50
+
+@dataclass(frozen=True)
+class Category:
+    """One line of categories.txt; milestone is '' for label-only entries such as 'ESGF,'."""
+    label: str
+    milestone: str
+
+@dataclass
+class Categories:
+    """Validated, deduplicated categories with lookup indexes."""
+    entries: list = field(default_factory=list)
+    warnings: list = field(default_factory=list)
+    milestone_by_label: dict = field(default_factory=dict)
+    labels_by_milestone: dict = field(default_factory=dict)
+
+    @property
+    def labels(self):
+        """Unique labels in file order."""
+        return list(self.milestone_by_label)
+
+    @property
+    def milestones(self):
+        """Unique non-empty milestones in file order."""
+        return list(self.labels_by_milestone)
+
+    def add(self, category):
+        """Validate and index one entry, recording a warning if it is dropped or suspicious."""
+        label, milestone = category.label, category.milestone
+        if not label:
+            self.warnings.append(f"Skipping entry with empty label (milestone '{milestone}')")
+            return
+        if len(label) > MAX_LABEL_LENGTH:
+            self.warnings.append(f"Skipping label longer than {MAX_LABEL_LENGTH} characters: {label}")
+            return
+        if label in self.milestone_by_label:
+            previous = self.milestone_by_label[label]
+            if previous == milestone:
+                self.warnings.append(f"Duplicate entry: {label},{milestone}")
+                return
+            self.warnings.append(f"Label '{label}' is mapped to milestones '{previous}' and '{milestone}'")
+        if not milestone:
+            self.warnings.append(f"Label '{label}' has no milestone, only the label is synced")
+
+        self.entries.append(category)
+        self.milestone_by_label.setdefault(label, milestone)
+        if milestone:
+            # (label, milestone) pairs are unique by now, so no membership scan is needed
+            self.labels_by_milestone.setdefault(milestone, []).append(label)
+
+def parse_categories(text):
+    """Parse categories.txt content into a Categories model."""
+    categories = Categories()
+    for line in text.splitlines():
+        line = line.strip()
+        if line and not line.startswith('#'):
+            parts = line.split(',', 1)  # Split on first comma only
+            if len(parts) == 2:
+                categories.add(Category(parts[0].strip(), parts[1].strip()))
+            else:
+                # Single entry - use as both label and milestone
+                category = parts[0].strip()
+                categories.add(Category(category, category))
+    return categories
+
+_loaded = {}
+
+def load_categories(path=CATEGORIES_FILE, use_cache=True):
+    """Load the categories model, from memory or the on-disk cache when the file is unchanged."""
+    path = Path(path)
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+    if use_cache and key in _loaded:
+        return _loaded[key]
+
+    with tracing.span('load categories') as span:
+        cached = _read_cache() if use_cache else None
+        if cached and cached['key'] == key:
+            categories = _from_plain(cached['categories'])
+            span.set(source='cache')
+        else:
+            data = path.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+            if cached and cached['key'][0] == key[0] and cached['sha256'] == digest:
+                # Touched but unchanged: keep the parsed model, refresh the key
+                categories = _from_plain(cached['categories'])
+                span.set(source='cache')
+            else:
+                categories = parse_categories(data.decode())
+                span.set(source='parsed')
+            if use_cache:
+                _write_cache({'version': CACHE_VERSION, 'key': key, 'sha256': digest,
+                              'categories': _to_plain(categories)})
+
+    _loaded[key] = categories
+    return categories
+
+def _to_plain(categories):
+    # Only builtins are pickled, so the cache does not depend on how this module was imported
+    return {
+        'entries': [(c.label, c.milestone) for c in categories.entries],
+        'warnings': categories.warnings,
+        'milestone_by_label': categories.milestone_by_label,
+        'labels_by_milestone': categories.labels_by_milestone,
+    }
+
+def _from_plain(plain):
+    return Categories(
+        entries=[Category(label, milestone) for label, milestone in plain['entries']],
+        warnings=list(plain['warnings']),
+        milestone_by_label=dict(plain['milestone_by_label']),
+        labels_by_milestone={m: list(labels) for m, labels in plain['labels_by_milestone'].items()},
+    )
+
+def _read_cache():
+    try:
+        with open(CACHE_FILE, 'rb') as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError):
+        return None
+    return cached if isinstance(cached, dict) and cached.get('version') == CACHE_VERSION else None
+
+def _write_cache(cached):
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CACHE_FILE.with_name(f".{CACHE_FILE.name}.{os.getpid()}.tmp")
+        with open(tmp, 'wb') as f:
+            pickle.dump(cached, f)
+        os.replace(tmp, CACHE_FILE)
+    except OSError as e:
+        print(f"Warning: could not write {CACHE_FILE}: {e}")
+
+def main():
+    categories = load_categories()
+    print(f"Loaded {len(categories.entries)} entries from categories.txt")
+    for warning in categories.warnings:
+        print(f"⚠️  {warning}")
+    print(f"\nMilestones:")
+    for milestone, labels in categories.labels_by_milestone.items():
+        print(f"   • {milestone} (labels: {', '.join(labels)})")
+    label_only = [label for label, milestone in categories.milestone_by_label.items() if not milestone]
+    if label_only:
+        print(f"\nLabel-only entries: {', '.join(label_only)}")
+
+if __name__ == "__main__":
+    main()
@@ -2,61 +2,198 @@
 """
 Create config.yml for GitHub issue templates with organized menus
 
-Usage: python create_config.py
+Only the top-level name and description of each template are needed, so
+templates are read as a YAML event stream (libyaml's C parser when
+available) that stops as soon as both keys are found. Headers are cached per
+file by mtime and size in ../.cache/template_headers.json, and files that
+changed are read in parallel.
+
+Usage: python create_config.py [--trace FILE]
 """
 
+import os
 import json
 import yaml
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import tracing
+
+# libyaml is several times faster than the pure-Python parser
+Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+HEADER_KEYS = ('name', 'description')
+HEADER_CACHE_FILE = Path(__file__).parent.parent / ".cache" / "template_headers.json"
+
+CUSTOM_LINKS_FILE = Path(__file__).parent.parent / "custom_links.json"
+
 def load_custom_links():
     """Load custom links from custom_links.json."""
-    custom_file = Path(__file__).parent.parent / "custom_links.json"
     try:
-        with open(custom_file, 'r') as f:
+        with open(CUSTOM_LINKS_FILE, 'r') as f:
             return json.load(f)
     except FileNotFoundError:
         return []
 
-def scan_templates():
-    """Scan template files and organize by type."""
-    template_dir = Path(__file__).parent.parent / ".github" / "ISSUE_TEMPLATE"
+TEMPLATE_DIR = Path(__file__).parent.parent / ".github" / "ISSUE_TEMPLATE"
+
+def scalar_value(loader, event):
+    """The value of a scalar event typed as yaml.safe_load would give it (bool, int, None, ...)."""
+    tag = event.tag
+    if tag is None or tag == '!':
+        tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+    return loader.construct_object(yaml.ScalarNode(tag, event.value, style=event.style))
+
+def read_header(stream):
+    """Top-level name and description of an issue template (text or open file).
     
-    tasks = []
-    discussions = []
-    general = []
+    Walks the YAML event stream and stops once both keys have been seen, so
+    the form body is normally never parsed. Values are typed like safe_load's;
+    a top-level alias or merge key, or a name or description that is not a
+    scalar, makes the whole document be loaded with safe_load's rules instead.
+    """
+    header = {}
+    loader = Loader(stream)
+    full_load = False
+    try:
+        depth = 0
+        key = None
+        while loader.check_event():
+            event = loader.get_event()
+            if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                depth += 1
+                if depth == 2:
+                    # A top-level value that is a collection
+                    if key in HEADER_KEYS:
+                        full_load = True
+                        break
+                    key = None
+            elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                depth -= 1
+            elif depth == 1 and (isinstance(event, yaml.AliasEvent) or
+                                 (key is None and event.value == '<<' and event.implicit[0])):
+                full_load = True
+                break
+            elif depth == 1 and isinstance(event, yaml.ScalarEvent):
+                if key is None:
+                    key = event.value
+                    continue
+                if key in HEADER_KEYS:
+                    header[key] = scalar_value(loader, event)
+                    if len(header) == len(HEADER_KEYS):
+                        break
+                key = None
+    finally:
+        loader.dispose()
+    if full_load:
+        if hasattr(stream, 'seek'):
+            stream.seek(0)
+        document = yaml.load(stream, Loader)
+        header = {key: document[key] for key in HEADER_KEYS if key in document} if isinstance(document, dict) else {}
+    return {'name': header.get('name'), 'description': header.get('description', '')}
+
+def read_template(template_file):
+    """Metadata (filename, name, description) of one template file, or None if unreadable."""
+    try:
+        with tracing.span('read header', 'yaml', file=template_file.name), open(template_file, 'r') as f:
+            header = read_header(f)
+    except Exception as e:
+        print(f"Warning: Could not read {template_file.name}: {e}")
+        return None
+    return {
+        'filename': template_file.name,
+        'name': header['name'] or template_file.stem,
+        'description': header['description'] or '',
+    }
+
+def load_header_cache():
+    try:
+        with open(HEADER_CACHE_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def save_header_cache(cache):
+    try:
+        HEADER_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = HEADER_CACHE_FILE.with_name(f".{HEADER_CACHE_FILE.name}.{os.getpid()}.tmp")
+        with open(tmp, 'w') as f:
+            # Dates in a header are cached as their text
+            json.dump(cache, f, default=str)
+        os.replace(tmp, HEADER_CACHE_FILE)
+    except OSError as e:
+        print(f"Warning: could not write {HEADER_CACHE_FILE}: {e}")
+
+def scan_template_files(template_dir=TEMPLATE_DIR, include=None, workers=8):
+    """Metadata of every template file in template_dir, optionally filtered by filename.
     
+    Files whose mtime and size match the header cache are not opened; the
+    rest are read on a thread pool.
+    """
     if not template_dir.exists():
-        return tasks, discussions, general
+        return []
     
-    for template_file in template_dir.glob("*.yml"):
-        if template_file.name == "config.yml":
+    with tracing.span('scan templates', 'yaml') as span:
+        templates, changed = _scan(template_dir, include, workers)
+        span.set(files=len(templates), read=changed)
+    return templates
+
+def _scan(template_dir, include, workers):
+    cache = load_header_cache()
+    templates = []
+    changed = []
+    seen = set()
+    for entry in os.scandir(template_dir):
+        if not entry.name.endswith('.yml') or entry.name == "config.yml":
+            continue
+        if include and not include(entry.name):
             continue
-            
-        try:
-            with open(template_file, 'r') as f:
-                content = yaml.safe_load(f)
-            
-            name = content.get('name', template_file.stem)
-            description = content.get('description', '')
-            url = f"/issues/new?template={template_file.name}"
-            
-            entry = {
-                "name": name,
-                "url": url,
-                "about": description
-            }
-            
-            # Categorize by filename
-            if template_file.name.startswith('task_'):
-                tasks.append(entry)
-            elif template_file.name.startswith('discussion_'):
-                discussions.append(entry)
-            else:
-                general.append(entry)
-                
-        except Exception as e:
-            print(f"Warning: Could not read {template_file.name}: {e}")
+        stat = entry.stat()
+        key = os.path.abspath(entry.path)
+        seen.add(key)
+        cached = cache.get(key)
+        if cached and cached['stamp'] == [stat.st_mtime_ns, stat.st_size]:
+            templates.append(cached['metadata'])
+        else:
+            changed.append((key, Path(entry.path), [stat.st_mtime_ns, stat.st_size]))
+    
+    if changed:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for (key, _, stamp), metadata in zip(changed, pool.map(read_template, [c[1] for c in changed])):
+                if metadata:
+                    templates.append(metadata)
+                    cache[key] = {'stamp': stamp, 'metadata': metadata}
+    
+    # Forget deleted files in this directory; other directories' entries are kept
+    prefix = os.path.abspath(template_dir) + os.sep
+    stale = [key for key in cache if key.startswith(prefix) and key not in seen]
+    for key in stale:
+        del cache[key]
+    if changed or stale:
+        save_header_cache(cache)
+    return templates, len(changed)
+
+def organize_templates(templates):
+    """Split template metadata into sorted task, discussion and general menu entries."""
+    tasks = []
+    discussions = []
+    general = []
+    
+    for template in templates:
+        entry = {
+            "name": template['name'],
+            "url": f"/issues/new?template={template['filename']}",
+            "about": template['description']
+        }
+        
+        # Categorize by filename
+        if template['filename'].startswith('task_'):
+            tasks.append(entry)
+        elif template['filename'].startswith('discussion_'):
+            discussions.append(entry)
+        else:
+            general.append(entry)
     
     # Sort alphabetically
     tasks.sort(key=lambda x: x['name'])
@@ -65,12 +202,24 @@ def scan_templates():
     
     return tasks, discussions, general
 
-def create_config_yml():
-    """Create the config.yml file with organized sections."""
+def scan_templates():
+    """Scan template files and organize by type."""
+    return organize_templates(scan_template_files())
+
+def create_config_yml(templates=None, custom_links=None):
+    """Create the config.yml file with organized sections.
+    
+    templates is a list of template metadata (filename, name, description)
+    already in memory; the template directory is scanned when it is omitted.
+    """
     
     # Load data
-    custom_links = load_custom_links()
-    tasks, discussions, general = scan_templates()
+    if custom_links is None:
+        custom_links = load_custom_links()
+    if templates is None:
+        tasks, discussions, general = scan_templates()
+    else:
+        tasks, discussions, general = organize_templates(templates)
     
     # Start with blank issues enabled
     config = {
@@ -125,7 +274,35 @@ def create_config_yml():
     
     return config
 
+def write_config(config, template_dir=TEMPLATE_DIR):
+    """Write config.yml into the template directory; returns its path."""
+    template_dir.mkdir(parents=True, exist_ok=True)
+    config_file = template_dir / "config.yml"
+    with tracing.span('write config', 'io'), open(config_file, 'w') as f:
+        yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+    return config_file
+
+def print_structure(config):
+    """Print the issue chooser menu."""
+    print(f"\nIssue chooser structure:")
+    for i, link in enumerate(config["contact_links"], 1):
+        name = link["name"]
+        if "─────" in name:
+            print(f"   {name}")
+        elif link["url"] == "#":
+            print(f"   📁 {name}")
+        else:
+            print(f"   {i:2d}. {name}")
+    
+    print(f"\nTotal entries: {len(config['contact_links'])}")
+
 def main():
+    parser = argparse.ArgumentParser(description="Create config.yml for the issue templates")
+    parser.add_argument("--trace", metavar="FILE", help="Write a Chrome trace of the run's phases to FILE")
+    args = parser.parse_args()
+    if args.trace:
+        tracing.enable(args.trace)
+
     print("Creating GitHub Issue Template Config")
     print("====================================")
     
@@ -133,29 +310,11 @@ def main():
         # Generate config
         config = create_config_yml()
         
-        # Create template directory
-        template_dir = Path(__file__).parent.parent / ".github" / "ISSUE_TEMPLATE"
-        template_dir.mkdir(parents=True, exist_ok=True)
-        
         # Write config file
-        config_file = template_dir / "config.yml"
-        with open(config_file, 'w') as f:
-            yaml.dump(config, f, default_flow_style=False, sort_keys=False)
-        
+        config_file = write_config(config)
         print(f"✓ Created {config_file}")
         
-        # Show structure
-        print(f"\nIssue chooser structure:")
-        for i, link in enumerate(config["contact_links"], 1):
-            name = link["name"]
-            if "─────" in name:
-                print(f"   {name}")
-            elif link["url"] == "#":
-                print(f"   📁 {name}")
-            else:
-                print(f"   {i:2d}. {name}")
-        
-        print(f"\nTotal entries: {len(config['contact_links'])}")
+        print_structure(config)
         
     except Exception as e:
         print(f"❌ Error: {e}")
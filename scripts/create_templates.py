@@ -5,518 +5,221 @@ Create GitHub issue template files from categories.txt
 Reads ../categories.txt with format: label,milestone
 Creates task and discussion templates for each unique milestone.
 
-Usage: python create_templates.py
+Only templates whose inputs (milestone, labels and template source) changed
+since the last run are re-rendered; the input hashes are kept in
+../.cache/templates_manifest.json. task_*.yml and discussion_*.yml files that
+no longer belong to a milestone are removed.
+
+The Jinja2 sources live in scripts/templates/ and are loaded through one
+Environment whose compiled bytecode is cached in ../.cache/jinja, so a cold
+start does not re-parse them. A render costs tens of microseconds, so it runs
+in-process unless --workers asks for a process pool.
+
+Usage: python create_templates.py [--workers N] [--trace FILE]
 """
 
-import subprocess
+import os
 import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from jinja2 import Template
-
-def load_categories():
-    """Load categories from categories.txt file with format: label,milestone per line."""
-    categories_file = Path(__file__).parent.parent / "categories.txt"
-    entries = []
-    
-    with open(categories_file, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#'):
-                parts = line.split(',', 1)  # Split on first comma only
-                if len(parts) == 2:
-                    label = parts[0].strip()
-                    milestone = parts[1].strip()
-                    entries.append({
-                        'label': label,
-                        'milestone': milestone
-                    })
-                elif len(parts) == 1:
-                    # Single entry - use as both label and milestone
-                    category = parts[0].strip()
-                    entries.append({
-                        'label': category,
-                        'milestone': category
-                    })
-    
-    return entries
-
-def get_unique_milestones(entries):
-    """Get unique milestones and their associated labels."""
-    milestone_labels = {}
-    
-    for entry in entries:
-        milestone = entry['milestone']
-        label = entry['label']
-        
-        if milestone not in milestone_labels:
-            milestone_labels[milestone] = []
-        
-        if label not in milestone_labels[milestone]:
-            milestone_labels[milestone].append(label)
-    
-    return milestone_labels
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+
+import tracing
+from categories import load_categories
+from create_config import TEMPLATE_DIR, read_header
+
+TEMPLATE_SOURCE_DIR = Path(__file__).parent / "templates"
+BYTECODE_CACHE_DIR = Path(__file__).parent.parent / ".cache" / "jinja"
+MANIFEST_FILE = Path(__file__).parent.parent / ".cache" / "templates_manifest.json"
+
+# Registry of generated template kinds: output filename prefix -> Jinja2 source
+TASK_TEMPLATE = "task.yml.j2"
+DISCUSSION_TEMPLATE = "discussion.yml.j2"
+TEMPLATES = {
+    'task': TASK_TEMPLATE,
+    'discussion': DISCUSSION_TEMPLATE,
+}
+
+# Below this many files a pool costs more than it saves
+MIN_PARALLEL_RENDERS = 64
+
+@lru_cache(maxsize=None)
+def get_environment():
+    """The shared Jinja2 environment, loading scripts/templates/ with a persistent bytecode cache."""
+    BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(str(TEMPLATE_SOURCE_DIR)),
+        bytecode_cache=FileSystemBytecodeCache(str(BYTECODE_CACHE_DIR)),
+        auto_reload=False,
+    )
+
+def template_source(name):
+    """Source text of a registered template."""
+    return get_environment().loader.get_source(get_environment(), name)[0]
+
+def render_template(name, template_data):
+    """Render one registered template (runs in pool workers too)."""
+    return get_environment().get_template(name).render(**template_data)
+
+def _render_job(job):
+    return render_template(*job)
+
+def render_all(jobs, workers=1):
+    """Render (template name, data) jobs in order, on a process pool when asked and there are enough of them."""
+    jobs = list(jobs)
+    if workers == 1 or len(jobs) < MIN_PARALLEL_RENDERS:
+        return [render_template(name, data) for name, data in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_job, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))))
 
 def create_task_template():
-    """Create Jinja2 template for task issues in WCRP-universe style."""
-    return Template("""name: 'CVsTT Task: {{ milestone }}'
-description: 'Create a {{ milestone }} task'
-title: '{{ milestone }}: <brief description>'
-projects: ["WCRP-CMIP/4"]  # CVsTT project board
-labels:
-    - CVsTT
-    - task{% for label in milestone_labels %}
-    - {{ label }}{% endfor %}
-body:
-
--   type: markdown
-    attributes:
-        value: |
-            ## {{ milestone }} Task Specification
-            
-            Define a task for {{ milestone }} development work.
-
--   id: description
-    type: textarea
-    attributes:
-        label: Task Description
-        description: |
-            Provide a detailed description of the task, including its primary aims, scope, and technical requirements.
-        placeholder: 'Describe what needs to be built, implemented, or fixed'
-    validations:
-        required: true
-
--   id: priority
-    type: dropdown
-    attributes:
-        label: Priority Level
-        description: How urgent is this task?
-        options:
-            - "Critical - Blocking other work"
-            - "High - Important for milestone"
-            - "Medium - Standard priority"
-            - "Low - Nice to have"
-        default: 2
-    validations:
-        required: true
-
--   type: markdown
-    attributes:
-        value: |
-            ## Task Specification
-            
-            Define the deliverables and acceptance criteria for this development task.
-
--   id: minimum_requirements
-    type: textarea
-    attributes:
-        label: Minimum Deliverables (Essential)
-        placeholder: |
-            **Must have:**
-            - Core feature working
-            - Basic tests passing
-            - Minimal documentation
-            
-            **Acceptance:**
-            - Code works as specified
-            - Passes review
-        render: markdown
-    validations:
-        required: true
-
--   id: ideal_requirements
-    type: textarea
-    attributes:
-        label: Extended Deliverables (Optional)
-        description: |
-            Define the ideal scope and deliverables if time and resources permit.
-            
-            Include enhancements beyond the MVP that would add significant value.
-        placeholder: |
-            **Nice to have:**
-            - Advanced features
-            - Performance optimizations
-            - Comprehensive tests
-            - Full documentation
-        render: markdown
-    validations:
-        required: false
-
--   type: markdown
-    attributes:
-        value: |
-            ## Support & Quality Assurance
-            
-            Describe the support framework and quality assurance approach.
-
--   id: assistance_plan
-    type: checkboxes
-    attributes:
-        label: Support Plan
-        description: |
-            Participation in meetings, carrying out work relevant to the task at hand.
-        options:
-            - label: "I can work on this myself"
-            - label: "I need help implementing a solution"
-            - label: "I'm just reporting this task"
-            - label: "I will participate in relevant meetings"
-            - label: "I will provide technical guidance"
-            - label: "I will conduct code review"
-    validations:
-        required: true
-
--   type: markdown
-    attributes:
-        value: |
-            ## Context & Dependencies
-            
-            Provide project context and identify task relationships.
-
--   id: context_dependencies
-    type: textarea
-    attributes:
-        label: Project Context and Dependencies
-        description: |
-            Explain the strategic importance and constraints for this task within the {{ milestone }} project.
-        placeholder: |
-            **Why needed:**
-            - Required for milestone X
-            - Blocks/enables other work
-            
-            **Dependencies:**
-            - Needs: task A, data B
-            - Blocks: task C, task D
-        render: markdown
-    validations:
-        required: true
-
--   type: markdown
-    attributes:
-        value: |
-            ## Timeline & Planning
-            
-            Provide realistic time estimates and key milestones.
-
--   id: timeline
-    type: textarea
-    attributes:
-        label: Timeline
-        placeholder: |
-            **Estimate:**
-            - Start: when ready
-            - MVP: X weeks
-            - Full: Y weeks
-            
-            **Risks:**
-            - Complex integration
-            - External dependencies
-        render: markdown
-    validations:
-        required: true
-
--   id: resources
-    type: textarea
-    attributes:
-        label: Technical Resources & References
-        description: |
-            Provide links to relevant technical documentation, tools, and references.
-        placeholder: |
-            **Resources:**
-            - API docs: link
-            - Code repo: link
-            - Examples: link
-        render: markdown
-    validations:
-        required: false
-
--   type: markdown
-    attributes:
-        value: |
-            ## Risk Assessment
-            
-            Analyze potential impacts and mitigation strategies.
-
--   id: delay_consequences
-    type: textarea
-    attributes:
-        label: Consequences of Delay
-        description: |
-            Analyze the impact if this task is delayed or not completed, and identify mitigation strategies.
-        placeholder: |
-            **If delayed:**
-            - Blocks milestone completion
-            - Affects other tasks
-            
-            **Mitigation:**
-            - Reduce scope to MVP
-            - Get help from team
-        render: markdown
-    validations:
-        required: true
-""")
+    """Jinja2 template for task issues in WCRP-universe style."""
+    return get_environment().get_template(TASK_TEMPLATE)
 
 def create_discussion_template():
-    """Create Jinja2 template for discussion issues in WCRP-universe style."""
-    return Template("""name: 'CVsTT Discussion: {{ milestone }}'
-description: 'Start a {{ milestone }} discussion'
-title: '{{ milestone }} Discussion: <topic>'
-projects: ["WCRP-CMIP/4"]  # CVsTT project board
-labels:
-    - CVsTT
-    - discussion{% for label in milestone_labels %}
-    - {{ label }}{% endfor %}
-body:
-
--   type: markdown
-    attributes:
-        value: |
-            ## {{ milestone }} Discussion
-            
-            Use this template to start a discussion, gather community input, or propose ideas for {{ milestone }} work.
-
--   type: dropdown
-    id: urgency
-    attributes:
-        label: Timeline/Urgency
-        description: How quickly do you need input or resolution?
-        options:
-            - "Critical - Need resolution within days"
-            - "High - Need resolution within weeks"
-            - "Medium - Need resolution within 2-3 months"
-            - "Low - No specific timeline"
-        default: 2
-    validations:
-        required: true
+    """Jinja2 template for discussion issues in WCRP-universe style."""
+    return get_environment().get_template(DISCUSSION_TEMPLATE)
 
--   type: markdown
-    attributes:
-        value: |
-            ## Background & Context
-            
-            Provide sufficient context for others to understand and contribute to the discussion.
-
--   id: background
-    type: textarea
-    attributes:
-        label: Background/Context
-        description: |
-            Provide background information to help others understand the discussion topic.
-            
-            Include:
-            - Why this discussion is needed
-            - Current situation or problem
-            - Relevant history or previous discussions
-            - Relationship to {{ milestone }} work
-        placeholder: |
-            **Current situation:**
-            What's happening now with {{ milestone }}
-            
-            **Why discuss:**
-            What prompted this discussion
-        render: markdown
-    validations:
-        required: true
-
--   type: markdown
-    attributes:
-        value: |
-            ## Discussion Focus
-            
-            Define the key questions and areas for community input.
-
--   id: main_points
-    type: textarea
-    attributes:
-        label: Main Discussion Points
-        description: |
-            What are the key points or questions you'd like the community to address?
-            
-            Use bullet points or numbered lists for clarity.
-        placeholder: |
-            1. Should we approach this as X or Y?
-            2. What are the trade-offs?
-            3. How does this affect our direction?
-            4. What do we need to consider?
-        render: markdown
-    validations:
-        required: true
-
--   id: proposed_options
-    type: textarea
-    attributes:
-        label: Options/Proposals (if applicable)
-        description: |
-            If you have specific options or proposals to discuss, list them here.
-        placeholder: |
-            **Option A:** Approach description
-            - Pros: advantages
-            - Cons: disadvantages
-            
-            **Option B:** Alternative approach
-            - Pros: advantages
-            - Cons: disadvantages
-        render: markdown
-    validations:
-        required: false
-
--   type: markdown
-    attributes:
-        value: |
-            ## Desired Outcomes & Resources
-
--   id: desired_outcome
-    type: textarea
-    attributes:
-        label: Desired Outcome
-        description: |
-            What do you hope to achieve from this discussion?
-            
-            Be specific about the type of input or decisions needed.
-        placeholder: |
-            **Goal:**
-            - Reach consensus on approach
-            - Identify action items
-            - Clarify requirements
-        render: markdown
-    validations:
-        required: true
-
--   id: related_resources
-    type: textarea
-    attributes:
-        label: Related Resources
-        description: |
-            Link to any relevant documents, previous discussions, or external resources.
-        placeholder: |
-            - Related issue: #123
-            - Previous discussion: link
-            - Documentation: link
-        render: markdown
-    validations:
-        required: false
-
--   type: markdown
-    attributes:
-        value: |
-            ## Impact & Stakeholders (Optional)
-            
-            Additional context about stakeholders and consequences.
+def sanitize_filename(name):
+    """Convert milestone name to safe filename."""
+    return name.lower().replace(' ', '_').replace(',', '').replace('/', '_')
 
--   id: stakeholders
-    type: textarea
-    attributes:
-        label: Relevant Stakeholders
-        description: |
-            Who should be involved in this discussion? (Optional)
-        placeholder: |
-            **Key people:**
-            - @username (role)
-            - Team or group
-        render: markdown
-    validations:
-        required: false
+def is_generated(filename):
+    """Whether a file in ISSUE_TEMPLATE is owned by this script."""
+    return filename.endswith('.yml') and filename.startswith(('task_', 'discussion_'))
 
--   id: impact_consequences
-    type: textarea
-    attributes:
-        label: Impact & Consequences
-        description: |
-            What's affected by this discussion and what happens if no decision is made? (Optional)
-        placeholder: |
-            **What's affected:**
-            - {{ milestone }} timeline
-            - Other work or decisions
-            
-            **If no decision:**
-            - Default action
-            - Potential issues
-        render: markdown
-    validations:
-        required: false
+def input_hash(template_source, template_data):
+    """Hash of everything a rendered template depends on."""
+    payload = json.dumps([template_source, template_data], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
 
--   type: markdown
-    attributes:
-        value: |
-            ## How to Participate
-            
-            👋 **Everyone is welcome to contribute to this discussion!**
-            
-            Please:
-            - Keep comments constructive and focused on {{ milestone }} goals
-            - Consider all perspectives and provide reasoning for recommendations
-            - Include examples or evidence where helpful
-            - Be respectful of different viewpoints and approaches
-            - Tag relevant stakeholders when appropriate
+def output_hash(content):
+    """Hash of a generated file's content, to notice hand edits."""
+    return hashlib.sha256(content.encode()).hexdigest()
 
--   id: participation_type
-    type: checkboxes
-    attributes:
-        label: Participation Needed
-        description: What kind of participation are you looking for?
-        options:
-            - label: "General comments and feedback"
-            - label: "Technical expertise and review"
-            - label: "Use case examples and requirements"
-            - label: "Implementation recommendations"
-            - label: "Resource and timeline input"
-    validations:
-        required: false
-""")
+def file_hash(path):
+    """output_hash of the file at path, or None if it cannot be read."""
+    try:
+        return output_hash(Path(path).read_text())
+    except OSError:
+        return None
 
-def sanitize_filename(name):
-    """Convert milestone name to safe filename."""
-    return name.lower().replace(' ', '_').replace(',', '').replace('/', '_')
+def load_manifest():
+    """Last run's outputs, keyed by filename: input and output hashes plus the template's name and description."""
+    try:
+        with open(MANIFEST_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def write_atomic(path, content):
+    """Write a file via a temp file and rename, so readers never see a partial file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+def template_outputs(categories):
+    """Every file to generate: filename -> (template name, data).
+    
+    Label-only entries such as "ESGF," have no milestone and so no template.
+    """
+    outputs = {}
+    for milestone, milestone_labels in categories.labels_by_milestone.items():
+        template_data = {
+            'milestone': milestone,
+            'milestone_labels': milestone_labels
+        }
+        for prefix, name in TEMPLATES.items():
+            outputs[f"{prefix}_{sanitize_filename(milestone)}.yml"] = (name, template_data)
+    return outputs
+
+def generate_templates(categories, template_dir=TEMPLATE_DIR, workers=1):
+    """Bring the task and discussion templates in template_dir up to date with categories.
+    
+    Returns a dict with the metadata (filename, name, description) of every
+    generated template, for create_config, and the created/unchanged/removed counts.
+    """
+    template_dir.mkdir(parents=True, exist_ok=True)
+    sources = {name: template_source(name) for name in TEMPLATES.values()}
+    outputs = template_outputs(categories)
+    
+    # Re-render only files whose inputs changed, or that were edited or removed since
+    with tracing.span('hash template inputs', files=len(outputs)):
+        manifest = load_manifest()
+        new_manifest = {}
+        stale = []
+        for filename, (name, template_data) in outputs.items():
+            digest = input_hash(sources[name], template_data)
+            previous = manifest.get(filename)
+            if (isinstance(previous, dict) and previous.get('hash') == digest
+                    and previous.get('output') == file_hash(template_dir / filename)):
+                new_manifest[filename] = previous
+            else:
+                new_manifest[filename] = {'hash': digest}
+                stale.append(filename)
+    
+    created = 0
+    with tracing.span('render templates', 'render', files=len(stale), workers=workers):
+        rendered = render_all([outputs[filename] for filename in stale], workers)
+    for filename, content in zip(stale, rendered):
+        new_manifest[filename].update(read_header(content), output=output_hash(content))
+        path = template_dir / filename
+        if path.exists() and path.read_text() == content:
+            continue
+        
+        with tracing.span('write template', 'io', file=filename):
+            write_atomic(path, content)
+        print(f"✓ Created {filename}")
+        created += 1
+    
+    # Remove templates left over from milestones that no longer exist
+    removed = 0
+    for path in sorted(template_dir.glob("*.yml")):
+        if is_generated(path.name) and path.name not in outputs:
+            path.unlink()
+            print(f"✓ Removed {path.name}")
+            removed += 1
+    
+    with tracing.span('write manifest', 'io'):
+        write_atomic(MANIFEST_FILE, json.dumps(new_manifest, indent=2, sort_keys=True))
+    
+    templates = [{'filename': filename, 'name': entry['name'], 'description': entry['description']}
+                 for filename, entry in new_manifest.items()]
+    return {'templates': templates, 'created': created, 'unchanged': len(outputs) - created, 'removed': removed}
 
 def main():
+    parser = argparse.ArgumentParser(description="Create GitHub issue templates from categories.txt")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Render processes (default: 1, render in-process; 0 = one per CPU)")
+    parser.add_argument("--trace", metavar="FILE", help="Write a Chrome trace of the run's phases to FILE")
+    args = parser.parse_args()
+    if args.trace:
+        tracing.enable(args.trace)
+    
     print("Creating GitHub Issue Templates from categories.txt")
     print("=================================================")
     
     try:
         # Load categories
-        entries = load_categories()
-        print(f"Loaded {len(entries)} entries from categories.txt")
+        categories = load_categories()
+        print(f"Loaded {len(categories.entries)} entries from categories.txt")
         
-        # Get unique milestones and their labels
-        milestone_labels_map = get_unique_milestones(entries)
+        # Unique milestones and their labels
+        milestone_labels_map = categories.labels_by_milestone
         
         print(f"Found {len(milestone_labels_map)} unique milestones")
         
-        # Create template directory
-        template_dir = Path(__file__).parent.parent / ".github" / "ISSUE_TEMPLATE"
-        template_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Create Jinja2 templates
-        task_template = create_task_template()
-        discussion_template = create_discussion_template()
-        
-        # Generate files for each milestone
-        templates_created = 0
-        for milestone, milestone_labels in milestone_labels_map.items():
-            template_data = {
-                'milestone': milestone,
-                'milestone_labels': milestone_labels
-            }
-            
-            # Create task template file
-            task_filename = f"task_{sanitize_filename(milestone)}.yml"
-            task_content = task_template.render(**template_data)
-            
-            with open(template_dir / task_filename, 'w') as f:
-                f.write(task_content)
-            
-            print(f"✓ Created {task_filename}")
-            templates_created += 1
-            
-            # Create discussion template file
-            discussion_filename = f"discussion_{sanitize_filename(milestone)}.yml"
-            discussion_content = discussion_template.render(**template_data)
-            
-            with open(template_dir / discussion_filename, 'w') as f:
-                f.write(discussion_content)
-            
-            print(f"✓ Created {discussion_filename}")
-            templates_created += 1
+        result = generate_templates(categories, workers=args.workers or None)
         
-        print(f"\n✅ Created {templates_created} issue template files in .github/ISSUE_TEMPLATE/")
+        print(f"\n✅ Created {result['created']} issue template files in .github/ISSUE_TEMPLATE/")
+        print(f"   - {result['unchanged']} unchanged")
+        print(f"   - {result['removed']} removed")
         print(f"   - {len(milestone_labels_map)} task templates (one per milestone)")
         print(f"   - {len(milestone_labels_map)} discussion templates (one per milestone)")
         
@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+Task dependencies: the Needs:/Blocks: lines of task bodies as a graph
+
+The task template asks for dependencies as lines like `- Needs: #12, Form
+scripts for CMIP7` and `- Blocks: task C`. Every body is scanned for them in
+one regex pass (as analytics.py does for checkboxes); a reference is an
+issue number (#12) or a task title, matched case-insensitively. References
+to nothing known are kept as unresolved.
+
+The graph keeps both directions of every edge (needs and blocks index per
+task), finds cycles with Tarjan's algorithm and schedules the tasks against
+their dates:
+    earliest start  the later of its start date and the day after every
+                    task it needs finishes at the earliest
+    latest finish   the earlier of its end date and the day before every
+                    task it blocks has to start at the latest
+    slack           latest finish - earliest finish, in days; below zero
+                    the dates cannot be met
+The critical path is the chain of tasks with the least slack, each one
+held back by the previous. Tasks without dates pass the constraints
+through; tasks in a cycle are left unscheduled.
+
+When a task changes (update(), or refresh() with a new analytics.Tasks),
+earliest dates are recomputed only for the tasks downstream of it and
+latest dates only for those upstream, in topological order of that
+subgraph.
+
+Usage: python dependencies.py [CSV ...] [--mirror] [--repo OWNER/REPO] [--project ID] [--task TITLE_OR_NUMBER]
+
+    import dependencies
+    graph = dependencies.Graph.from_tasks(analytics.from_csv(paths))
+    graph.critical_path()
+    graph.update('Form scripts for CMIP7', end='2025-10-02')
+"""
+
+import re
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+import analytics
+import github_client
+import mirror
+import project_board
+import sync_categories
+import tracing
+from scheduler import to_day
+
+# A body separator, or a Needs:/Blocks: line (plain, as a list item or in bold): (separator, kind, references)
+DEPENDENCY = re.compile(r'^(?:(\x1e)|[ \t]*(?:[-*][ \t]+)?(?:\*\*)?(needs|blocks)(?:\*\*)?[ \t]*:'
+                        r'(?:\*\*)?[ \t]*(\S[^\n]*?)[ \t]*$)', re.M | re.I)
+ISSUE_REFERENCE = re.compile(r'#(\d+)')
+# References that mean no dependency
+NOTHING = {'none', 'n/a', 'na', '-', 'tbd', 'nothing'}
+
+def split_references(text):
+    """The references in the rest of a Needs:/Blocks: line: ints for #N, normalised titles otherwise."""
+    references = []
+    for item in re.split(r'[,;]', text):
+        item = item.strip().strip('`"\'*').rstrip('.').strip()
+        if not item or item.lower() in NOTHING:
+            continue
+        number = ISSUE_REFERENCE.fullmatch(item)
+        references.append(int(number.group(1)) if number else normalize(item))
+    return references
+
+def normalize(title):
+    return ' '.join(title.split()).casefold()
+
+def extract(bodies):
+    """[(needs, blocks)] references of every body, from one regex pass over all of them."""
+    found = [([], []) for _ in bodies]
+    with tracing.span('parse dependencies', tasks=len(bodies)):
+        task = 0
+        for separator, kind, text in DEPENDENCY.findall(analytics.BODY_SEPARATOR.join(bodies)):
+            if separator:
+                task += 1
+            else:
+                found[task][kind.lower() == 'blocks'].extend(split_references(text))
+    return found
+
+class Graph:
+    """Dependency graph of tasks, with earliest/latest dates and slack kept up to date.
+
+    Tasks are nodes 0..n-1, named by issue number (or title for CSV rows);
+    needs[i] and blocks[i] are the sets of nodes before and after node i.
+    Days are day numbers (datetime64[D] as integers), None when unknown.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.titles = []
+        self.start = []
+        self.end = []
+        self.references = []
+        self.needs = []
+        self.blocks = []
+        self.declared = []
+        self.unresolved = []
+        self.earliest_start = []
+        self.earliest_finish = []
+        self.latest_start = []
+        self.latest_finish = []
+        self.nodes = {}
+        self.by_title = {}
+        self.by_number = {}
+        self.referrers = {}
+        self.edge_count = {}
+        self.cycle_of = {}
+
+    @classmethod
+    def from_tasks(cls, tasks):
+        """Graph of an analytics.Tasks; issues are named by number, CSV rows by title."""
+        graph = cls()
+        graph.refresh(tasks)
+        return graph
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def node(self, name):
+        """Node of an issue number ('#12' or 12) or a title."""
+        if isinstance(name, str):
+            number = ISSUE_REFERENCE.fullmatch(name.strip())
+            name = int(number.group(1)) if number else name
+        if isinstance(name, int):
+            return self.by_number.get(name)
+        return self.nodes.get(name, self.titled(normalize(name)))
+
+    def titled(self, title):
+        """The first node with a normalised title (duplicates resolve to the earliest task)."""
+        nodes = self.by_title.get(title)
+        return min(nodes) if nodes else None
+
+    def label(self, node):
+        key = self.keys[node]
+        return f"#{key} {self.titles[node]}" if isinstance(key, int) else self.titles[node]
+
+    def refresh(self, tasks):
+        """Bring the graph in line with an analytics.Tasks; only changed tasks are recomputed.
+
+        Returns the nodes whose dates or slack were recomputed.
+        """
+        keys = [number if number else title for number, title in zip(tasks.numbers, tasks.titles)]
+        start = np.where(np.isnat(tasks.start), -1, tasks.start.astype(np.int64)).tolist()
+        end = np.where(np.isnat(tasks.end), -1, tasks.end.astype(np.int64)).tolist()
+        references = extract(tasks.bodies)
+        changes = {}
+        for i, key in enumerate(keys):
+            changes[key] = (tasks.titles[i], start[i] if start[i] >= 0 else None,
+                            end[i] if end[i] >= 0 else None, references[i])
+        for key in set(self.nodes) - set(changes):
+            changes[key] = None
+        return self._apply(changes)
+
+    def update(self, name, title=None, start=None, end=None, body=None):
+        """Add or change one task; None keeps what it had. Returns the nodes recomputed."""
+        node = self.node(name)
+        key = self.keys[node] if node is not None else name
+        if node is not None:
+            title = self.titles[node] if title is None else title
+            start = self.start[node] if start is None else to_day(start)
+            end = self.end[node] if end is None else to_day(end)
+            references = self.references[node] if body is None else extract([body])[0]
+        else:
+            start = None if start is None else to_day(start)
+            end = None if end is None else to_day(end)
+            references = extract([body or ''])[0]
+        return self._apply({key: (title if title is not None else str(key), start, end, references)})
+
+    def remove(self, name):
+        """Take a task out of the graph; tasks referring to it get an unresolved reference."""
+        node = self.node(name)
+        return self._apply({self.keys[node]: None}) if node is not None else set()
+
+    def _apply(self, changes):
+        """Apply {key: (title, start, end, (needs, blocks)) or None to remove}, then recompute."""
+        forward, backward, linked, resolve = set(), set(), set(), set()
+        for key, change in changes.items():
+            node = self.nodes.get(key)
+            if change is None:
+                if node is None:
+                    continue
+                change = (None, None, None, ([], []))
+            elif node is None:
+                node = self._add(key)
+                resolve |= self.referrers.get(key, set())
+            title, start, end, references = change
+            if start is not None and end is not None and end < start:
+                start, end = end, start
+            if title != self.titles[node]:
+                # Tasks naming the old or the new title may now point elsewhere
+                for old_or_new in (self.titles[node], title):
+                    if old_or_new is not None:
+                        resolve |= self.referrers.get(normalize(old_or_new), set())
+                self._rename(node, title)
+            if (start, end) != (self.start[node], self.end[node]):
+                self.start[node], self.end[node] = start, end
+                forward.add(node)
+                backward.add(node)
+            if references != self.references[node]:
+                self.references[node] = references
+                resolve.add(node)
+            if change[0] is None:
+                del self.nodes[key]
+                if isinstance(key, int):
+                    del self.by_number[key]
+                    resolve |= self.referrers.get(key, set())
+        for node in resolve:
+            self._resolve(node, linked, backward)
+        return self._recompute(forward, backward, linked)
+
+    def _add(self, key):
+        node = len(self.keys)
+        self.nodes[key] = node
+        if isinstance(key, int):
+            self.by_number[key] = node
+        for column in (self.keys, self.titles, self.start, self.end, self.earliest_start,
+                       self.earliest_finish, self.latest_start, self.latest_finish):
+            column.append(None)
+        self.keys[node] = key
+        self.references.append(([], []))
+        self.needs.append(set())
+        self.blocks.append(set())
+        self.declared.append(set())
+        self.unresolved.append([])
+        return node
+
+    def _rename(self, node, title):
+        old = self.titles[node]
+        if old is not None:
+            self.by_title[normalize(old)].discard(node)
+            if not self.by_title[normalize(old)]:
+                del self.by_title[normalize(old)]
+        self.titles[node] = title
+        if title is not None:
+            self.by_title.setdefault(normalize(title), set()).add(node)
+
+    def _resolve(self, node, linked, backward):
+        """Turn a node's references into edges, recording the nodes each side of any edge that changed."""
+        for reference in {r for side in self.references[node] for r in side}:
+            self.referrers.setdefault(reference, set()).add(node)
+        edges = set()
+        unresolved = []
+        if self.titles[node] is not None:
+            needs, blocks = self.references[node]
+            for reference, is_block in [(r, False) for r in needs] + [(r, True) for r in blocks]:
+                other = self.by_number.get(reference) if isinstance(reference, int) else self.titled(reference)
+                if other is None:
+                    unresolved.append(f"#{reference}" if isinstance(reference, int) else reference)
+                else:
+                    edges.add((node, other) if is_block else (other, node))
+        self.unresolved[node] = unresolved
+        # Both tasks may declare the same edge, so it goes when neither does any more
+        for before, after in edges - self.declared[node]:
+            self.edge_count[(before, after)] = self.edge_count.get((before, after), 0) + 1
+            if self.edge_count[(before, after)] == 1:
+                self.needs[after].add(before)
+                self.blocks[before].add(after)
+                linked.add(after)
+                backward.add(before)
+        for before, after in self.declared[node] - edges:
+            self.edge_count[(before, after)] -= 1
+            if not self.edge_count[(before, after)]:
+                del self.edge_count[(before, after)]
+                self.needs[after].discard(before)
+                self.blocks[before].discard(after)
+                linked.add(after)
+                backward.add(before)
+        self.declared[node] = edges
+
+    def _reach(self, seeds, adjacency, through_cycles=True):
+        """The seeds and every node reachable from them, optionally not past tasks in a cycle."""
+        seen = set(seeds)
+        pending = list(seeds)
+        while pending:
+            for other in adjacency[pending.pop()]:
+                if other not in seen:
+                    seen.add(other)
+                    # Tasks in a cycle are unscheduled, so they pass no dates on
+                    if through_cycles or other not in self.cycle_of:
+                        pending.append(other)
+        return seen
+
+    def _cycles(self, region):
+        """Strongly connected components of the region with more than one node or a self-loop (Tarjan)."""
+        index, low, on_stack, stack, cycles = {}, {}, set(), [], []
+        for root in region:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.blocks[root]))]
+            while work:
+                node, successors = work[-1]
+                for other in successors:
+                    if other not in region:
+                        continue
+                    if other not in index:
+                        index[other] = low[other] = len(index)
+                        stack.append(other)
+                        on_stack.add(other)
+                        work.append((other, iter(self.blocks[other])))
+                        break
+                    if other in on_stack:
+                        low[node] = min(low[node], index[other])
+                else:
+                    work.pop()
+                    if work:
+                        low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        if len(component) > 1 or node in self.blocks[node]:
+                            cycles.append(tuple(sorted(component)))
+        return cycles
+
+    def _order(self, region, before):
+        """The region's nodes outside cycles, each after those of its before-neighbours in the region (Kahn)."""
+        region = {node for node in region if node not in self.cycle_of}
+        waiting = {node: sum(other in region for other in before[node]) for node in region}
+        ready = [node for node, count in waiting.items() if not count]
+        after = self.blocks if before is self.needs else self.needs
+        order = []
+        while ready:
+            node = ready.pop()
+            order.append(node)
+            for other in after[node]:
+                if other in region:
+                    waiting[other] -= 1
+                    if not waiting[other]:
+                        ready.append(other)
+        return order
+
+    def _recompute(self, forward, backward, linked):
+        """Recompute earliest dates downstream of forward and latest dates upstream of backward.
+
+        linked holds the later task of every edge added or removed: cycles
+        can only appear or break downstream of those.
+        """
+        with tracing.span('recompute schedule', forward=len(forward), backward=len(backward), linked=len(linked)):
+            relinked = self._reach(linked, self.blocks)
+            # A removed edge may have broken a known cycle: look at the whole cycle again
+            while True:
+                more = {m for node in relinked if node in self.cycle_of for m in self.cycle_of[node]} - relinked
+                if not more:
+                    break
+                relinked |= self._reach(more, self.blocks)
+            was_in_cycle = {node for node in relinked if node in self.cycle_of}
+            for node in was_in_cycle:
+                del self.cycle_of[node]
+            for cycle in self._cycles(relinked):
+                for node in cycle:
+                    self.cycle_of[node] = cycle
+            now_in_cycle = {node for node in relinked if node in self.cycle_of}
+            down = self._reach(forward, self.blocks, through_cycles=False) | relinked
+            up = self._reach(backward | was_in_cycle | now_in_cycle, self.needs, through_cycles=False)
+
+            for node in down | up:
+                if node in self.cycle_of or self.titles[node] is None:
+                    self.earliest_start[node] = self.earliest_finish[node] = None
+                    self.latest_start[node] = self.latest_finish[node] = None
+            for node in self._order(down, self.needs):
+                self._forward(node)
+            for node in self._order(up, self.blocks):
+                self._backward(node)
+        return down | up
+
+    def _forward(self, node):
+        ready = max((self.earliest_finish[other] + 1 for other in self.needs[node]
+                     if other not in self.cycle_of and self.earliest_finish[other] is not None), default=None)
+        start, end = self.start[node], self.end[node]
+        if start is None or end is None:
+            # Undated: passes on when the tasks it needs are done
+            self.earliest_start[node] = None
+            self.earliest_finish[node] = None if ready is None else ready - 1
+        else:
+            self.earliest_start[node] = start if ready is None else max(start, ready)
+            self.earliest_finish[node] = self.earliest_start[node] + end - start
+
+    def _backward(self, node):
+        due = min((self.latest_start[other] - 1 for other in self.blocks[node]
+                   if other not in self.cycle_of and self.latest_start[other] is not None), default=None)
+        start, end = self.start[node], self.end[node]
+        if start is None or end is None:
+            self.latest_finish[node] = due
+            self.latest_start[node] = None if due is None else due + 1
+        else:
+            self.latest_finish[node] = end if due is None else min(end, due)
+            self.latest_start[node] = self.latest_finish[node] - (end - start)
+
+    def slack(self, node):
+        """Days a task can slip without missing its own or a later task's end date; None if unscheduled."""
+        if self.start[node] is None or self.end[node] is None or self.earliest_finish[node] is None:
+            return None
+        return self.latest_finish[node] - self.earliest_finish[node]
+
+    def cycles(self):
+        return sorted(set(self.cycle_of.values()))
+
+    def critical_path(self):
+        """The chain of tasks with the least slack, first to last; [] when nothing is scheduled."""
+        scheduled = [node for node in self.nodes.values() if self.slack(node) is not None]
+        if not scheduled:
+            return []
+        path = [min(scheduled, key=lambda node: (self.slack(node), -self.earliest_finish[node]))]
+        # Back through the tasks finishing the day before each one can start (no more slack than it)...
+        while True:
+            node = path[0]
+            ready = self.earliest_start[node] if self.slack(node) is not None else self.earliest_finish[node] + 1
+            held = sorted(other for other in self.needs[node] if other not in self.cycle_of
+                          and self.earliest_finish[other] is not None and self.earliest_finish[other] + 1 == ready)
+            if not held:
+                break
+            path.insert(0, held[0])
+        # ...and on through the tasks that have to start the day after it finishes
+        while True:
+            node = path[-1]
+            holding = sorted(other for other in self.blocks[node] if other not in self.cycle_of
+                             and self.latest_start[other] is not None
+                             and self.latest_start[other] - 1 == self.latest_finish[node])
+            if not holding:
+                break
+            path.append(holding[0])
+        # Undated tasks only pass the constraints on
+        return [node for node in path if self.slack(node) is not None]
+
+    def late(self):
+        """Tasks whose dependencies push their earliest finish past their end date."""
+        return [node for node in self.nodes.values()
+                if self.slack(node) is not None and self.earliest_finish[node] > self.end[node]]
+
+def to_date(day):
+    return '-' if day is None else str(np.datetime64(int(day), 'D'))
+
+def print_task(graph, node):
+    print(f"\n{graph.label(node)}")
+    print(f"   dates     {to_date(graph.start[node])} to {to_date(graph.end[node])}")
+    print(f"   earliest  {to_date(graph.earliest_start[node])} to {to_date(graph.earliest_finish[node])}")
+    print(f"   latest    {to_date(graph.latest_start[node])} to {to_date(graph.latest_finish[node])}")
+    slack = graph.slack(node)
+    print(f"   slack     {'-' if slack is None else f'{slack} days'}")
+    for heading, others in (("needs", graph.needs[node]), ("blocks", graph.blocks[node])):
+        for other in sorted(others):
+            print(f"   {heading:<9} {graph.label(other)}")
+    for reference in graph.unresolved[node]:
+        print(f"   ⚠️  unknown reference '{reference}'")
+
+def main():
+    parser = argparse.ArgumentParser(description="Check task dependencies and find the critical path")
+    parser.add_argument("csv", nargs="*", help="Task CSV files (default: ../src/*.csv)")
+    parser.add_argument("--mirror", action="store_true", help="Read the issues from the local mirror (mirror.py)")
+    parser.add_argument("--repo", help="GitHub repository (owner/repo) for --mirror - uses current repo if not specified")
+    parser.add_argument("--project", help="Project board whose dates are used with --mirror (default: the CVsTT board)")
+    parser.add_argument("--task", help="Show one task's dates, slack and dependencies (title or #number)")
+    parser.add_argument("--api-url", metavar="URL", help="API whose mirror is read with --mirror")
+    args = parser.parse_args()
+
+    print("Task dependencies")
+    print("=================")
+
+    try:
+        if args.mirror:
+            if args.api_url:
+                github_client.use_api(args.api_url)
+            repo = sync_categories.resolve_repo(args.repo)
+            if not repo:
+                print("❌ Error: could not determine the repository, use --repo OWNER/REPO")
+                return
+            tasks = analytics.from_mirror(mirror.connect(), repo, args.project or project_board.PROJECT_ID)
+            print(f"Loaded {len(tasks)} issues of {repo} from the local mirror")
+        else:
+            paths = args.csv or sorted((Path(__file__).parent.parent / "src").glob("*.csv"))
+            tasks = analytics.from_csv(paths)
+            print(f"Loaded {len(tasks)} tasks from {len(paths)} CSV files")
+
+        graph = Graph.from_tasks(tasks)
+        print(f"✓ {len(graph.edge_count)} dependencies between {len(graph)} tasks")
+
+        for node in sorted(graph.nodes.values()):
+            for reference in graph.unresolved[node]:
+                print(f"⚠️  {graph.label(node)}: unknown reference '{reference}'")
+        for cycle in graph.cycles():
+            if len(cycle) == 1:
+                print(f"❌ {graph.label(cycle[0])} depends on itself")
+            else:
+                print(f"❌ Dependency cycle between {', '.join(graph.label(node) for node in cycle)}")
+        for node in graph.late():
+            print(f"⚠️  {graph.label(node)} cannot finish before {to_date(graph.earliest_finish[node])} "
+                  f"(end date {to_date(graph.end[node])})")
+
+        if args.task:
+            node = graph.node(args.task)
+            if node is None:
+                print(f"❌ Error: no task '{args.task}'")
+                return
+            print_task(graph, node)
+            return
+
+        path = graph.critical_path()
+        if len(path) > 1:
+            print(f"\nCritical path ({graph.slack(path[0])} days of slack):")
+            for node in path:
+                print(f"   {to_date(graph.earliest_start[node])} to {to_date(graph.earliest_finish[node])}  "
+                      f"{graph.label(node)}")
+        else:
+            print("\nNo dependencies between dated tasks")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+if __name__ == "__main__":
+    main()
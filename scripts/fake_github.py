@@ -0,0 +1,1101 @@
+#!/usr/bin/env python3
+"""
+Local fake GitHub API for testing the scripts offline
+
+Serves, from memory, the subset of the REST and GraphQL APIs the scripts
+use: labels, milestones, issues, teams and ProjectV2 items and fields, with
+the same pagination (Link headers, GraphQL cursors), ETags and 304s,
+X-RateLimit-* headers and error bodies as api.github.com. Any OWNER/REPO,
+organisation or PVT_... project id exists on first use; each organisation
+starts with a CVsTT team holding --members fake users.
+
+GraphQL documents are parsed and executed for real (aliases, variables,
+inline fragments), but only the types and fields above exist.
+
+Faults can be injected to see how the scripts behave at scale:
+    --latency/--jitter   milliseconds added to every response
+    --max-per-page       smaller pages than requested, to force pagination
+    --rate-limit         points per resource and window; 403 when used up
+    --secondary-every    every Nth write gets a secondary rate-limit 403
+    --fail-rate          fraction of requests answered with a 502
+    --drop-rate          fraction of writes applied without any response
+
+Point the scripts at it with --api-url (or GITHUB_API_URL); no token is
+needed. GET /_state returns the current content, in the format --state
+loads and --dump writes on exit.
+
+Usage: python fake_github.py [--port 8000] [--state FILE] [--dump FILE] [--latency MS] ...
+       python sync_categories.py --api-url http://127.0.0.1:8000 --repo test/repo
+"""
+
+import re
+import sys
+import json
+import time
+import base64
+import random
+import signal
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote, urlencode
+
+DEFAULT_TEAM = 'CVsTT'
+DEFAULT_FIELDS = (('Title', 'TITLE'), ('Status', 'SINGLE_SELECT'), ('Start date', 'DATE'), ('End date', 'DATE'))
+MAX_PAGE = 100
+
+class GraphQLError(Exception):
+    """An error for one field of a GraphQL response; the rest of the document still runs."""
+
+    def __init__(self, message, type='UNPROCESSABLE'):
+        super().__init__(message)
+        self.type = type
+
+class QueryError(Exception):
+    """A document that cannot run at all (syntax, unknown field)."""
+
+def stable_id(prefix, *parts):
+    """Node id derived from names, so it survives a restart of the server."""
+    return f"{prefix}_{hashlib.sha256('/'.join(parts).lower().encode()).hexdigest()[:16]}"
+
+def timestamp():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def slugify(name):
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+# GraphQL: just enough of a parser for the documents the scripts send
+
+TOKEN = re.compile(r'\s+|,|#[^\n]*|(\.\.\.|[{}()\[\]:!$=@])|("(?:[^"\\]|\\.)*")|(-?\d+(?:\.\d+)?)|([A-Za-z_]\w*)')
+
+class Field:
+    __slots__ = ('alias', 'name', 'args', 'selections')
+
+    def __init__(self, alias, name, args, selections):
+        self.alias, self.name, self.args, self.selections = alias, name, args, selections
+
+class Fragment:
+    __slots__ = ('type', 'selections')
+
+    def __init__(self, type, selections):
+        self.type, self.selections = type, selections
+
+class Variable:
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+def tokenize(text):
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        match = TOKEN.match(text, pos)
+        if not match:
+            raise QueryError(f"Parse error on \"{text[pos:pos + 10]}\" at {pos}")
+        punct, string, number, name = match.groups()
+        if punct:
+            tokens.append(('punct', punct))
+        elif string:
+            tokens.append(('string', json.loads(string)))
+        elif number:
+            tokens.append(('number', float(number) if '.' in number else int(number)))
+        elif name:
+            tokens.append(('name', name))
+        pos = match.end()
+    return tokens
+
+class Parser:
+    """Recursive-descent parser for one operation: returns ('query' | 'mutation', selections)."""
+
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][1] if self.pos < len(self.tokens) else None
+
+    def take(self, expected=None):
+        if self.pos >= len(self.tokens):
+            raise QueryError("Parse error: unexpected end of document")
+        kind, value = self.tokens[self.pos]
+        if expected is not None and (value != expected or kind not in ('punct', 'name')):
+            raise QueryError(f"Parse error: expected {expected}, got {value}")
+        self.pos += 1
+        return value
+
+    def document(self):
+        operation = 'query'
+        if self.peek() in ('query', 'mutation'):
+            operation = self.take()
+            if self.peek() not in ('(', '{'):
+                self.take()
+            if self.peek() == '(':
+                # Variable definitions: types are not checked
+                depth = 0
+                while True:
+                    token = self.take()
+                    depth += token == '('
+                    depth -= token == ')'
+                    if depth == 0:
+                        break
+        return operation, self.selection_set()
+
+    def selection_set(self):
+        self.take('{')
+        selections = []
+        while self.peek() != '}':
+            selections.append(self.selection())
+        self.take('}')
+        return selections
+
+    def selection(self):
+        if self.peek() == '...':
+            self.take()
+            self.take('on')
+            return Fragment(self.take(), self.selection_set())
+        alias = name = self.take()
+        if self.peek() == ':':
+            self.take()
+            name = self.take()
+        args = self.arguments() if self.peek() == '(' else {}
+        selections = self.selection_set() if self.peek() == '{' else None
+        return Field(alias, name, args, selections)
+
+    def arguments(self):
+        self.take('(')
+        args = {}
+        while self.peek() != ')':
+            key = self.take()
+            self.take(':')
+            args[key] = self.value()
+        self.take(')')
+        return args
+
+    def value(self):
+        kind, token = self.tokens[self.pos]
+        self.pos += 1
+        if kind in ('string', 'number'):
+            return token
+        if token == '$':
+            return Variable(self.take())
+        if token == '[':
+            items = []
+            while self.peek() != ']':
+                items.append(self.value())
+            self.take(']')
+            return items
+        if token == '{':
+            fields = {}
+            while self.peek() != '}':
+                key = self.take()
+                self.take(':')
+                fields[key] = self.value()
+            self.take('}')
+            return fields
+        return {'true': True, 'false': False, 'null': None}.get(token, token)
+
+def resolve(value, variables):
+    """Replace variables in an argument value."""
+    if isinstance(value, Variable):
+        return variables.get(value.name)
+    if isinstance(value, list):
+        return [resolve(item, variables) for item in value]
+    if isinstance(value, dict):
+        return {key: resolve(item, variables) for key, item in value.items()}
+    return value
+
+def execute(value, selections, variables, path, errors):
+    """Select fields from a view: a dict whose values are plain data or callables taking the arguments."""
+    if value is None or selections is None:
+        return value
+    if isinstance(value, list):
+        return [execute(item, selections, variables, path, errors) for item in value]
+    result = {}
+    for selection in selections:
+        if isinstance(selection, Fragment):
+            if selection.type in (value.get('__typename'), *value.get('__interfaces', ())):
+                result.update(execute(value, selection.selections, variables, path, errors))
+            continue
+        if selection.name == '__typename':
+            result[selection.alias] = value['__typename']
+            continue
+        if selection.name not in value:
+            raise QueryError(f"Field '{selection.name}' doesn't exist on type '{value.get('__typename')}'")
+        field = value[selection.name]
+        if callable(field):
+            try:
+                field = field(resolve(selection.args, variables))
+            except GraphQLError as e:
+                errors.append({'type': e.type, 'path': path + [selection.alias], 'message': str(e)})
+                result[selection.alias] = None
+                continue
+        result[selection.alias] = execute(field, selection.selections, variables, path + [selection.alias], errors)
+    return result
+
+class FakeState:
+    """Repositories, teams and projects in memory, with REST and GraphQL views of them.
+
+    Not thread-safe by itself: FakeGitHub serialises every request.
+    """
+
+    def __init__(self, members=3):
+        self.members = members
+        self.max_page = MAX_PAGE
+        self.repos = {}
+        self.orgs = {}
+        self.projects = {}
+        self.nodes = {}
+        self.counter = 0
+
+    def next_id(self):
+        self.counter += 1
+        return self.counter
+
+    def register(self, kind, node_id, obj):
+        self.nodes[node_id] = (kind, obj)
+        return obj
+
+    # Model
+
+    def repo(self, full_name):
+        """A repository, created on first use."""
+        key = full_name.lower()
+        if key not in self.repos:
+            owner, name = full_name.split('/', 1)
+            self.org(owner)
+            self.repos[key] = self.register('repo', stable_id('R', full_name), {
+                'id': stable_id('R', full_name), 'full_name': full_name, 'name': name,
+                'labels': [], 'milestones': [], 'issues': [],
+            })
+        return self.repos[key]
+
+    def org(self, login):
+        """An organisation with its teams, created on first use with a CVsTT team of fake members."""
+        key = login.lower()
+        if key not in self.orgs:
+            self.orgs[key] = {'login': login, 'teams': {}, 'users': {}}
+            members = [f"fake-user-{i}" for i in range(1, self.members + 1)]
+            self.add_team(login, DEFAULT_TEAM, 'CVsTT task team', None, members)
+        return self.orgs[key]
+
+    def user(self, org, login):
+        users = self.org(org)['users']
+        if login not in users:
+            users[login] = self.register('user', stable_id('U', login), {
+                'id': stable_id('U', login), 'login': login, 'number': len(users) + 1})
+        return users[login]
+
+    def add_team(self, org, name, description=None, parent=None, members=()):
+        teams = self.org(org)['teams']
+        slug = slugify(name)
+        if slug in teams:
+            raise GraphQLError("Name must be unique for this org", 'already_exists')
+        if parent and parent not in teams:
+            raise GraphQLError(f"Parent team {parent} not found", 'NOT_FOUND')
+        team = self.register('team', stable_id('T', org, slug), {
+            'id': self.next_id(), 'node_id': stable_id('T', org, slug), 'slug': slug, 'name': name,
+            'description': description, 'parent': parent, 'members': [self.user(org, m)['login'] for m in members],
+        })
+        teams[slug] = team
+        return team
+
+    def add_label(self, repo, name, color='ededed', description=None):
+        repo = self.repo(repo) if isinstance(repo, str) else repo
+        if self.find_label(repo, name):
+            raise GraphQLError("Name has already been taken", 'already_exists')
+        label_id = self.next_id()
+        label = self.register('label', f"LA_{label_id}", {
+            'id': label_id, 'node_id': f"LA_{label_id}", 'repo': repo['full_name'],
+            'name': name, 'color': color, 'description': description,
+        })
+        repo['labels'].append(label)
+        return label
+
+    def find_label(self, repo, name):
+        return next((label for label in repo['labels'] if label['name'].lower() == name.lower()), None)
+
+    def add_milestone(self, repo, title, description=None, state='open'):
+        repo = self.repo(repo) if isinstance(repo, str) else repo
+        if any(m['title'] == title for m in repo['milestones']):
+            raise GraphQLError("Title has already been taken", 'already_exists')
+        number = max((m['number'] for m in repo['milestones']), default=0) + 1
+        milestone_id = self.next_id()
+        now = timestamp()
+        milestone = self.register('milestone', f"MI_{milestone_id}", {
+            'id': milestone_id, 'node_id': f"MI_{milestone_id}", 'repo': repo['full_name'], 'number': number,
+            'title': title, 'description': description, 'state': state, 'created_at': now, 'updated_at': now,
+        })
+        repo['milestones'].append(milestone)
+        return milestone
+
+    def add_issue(self, repo, title, body=None, labels=(), milestone=None, assignees=(), state='open'):
+        """labels, milestone and assignees are label, milestone and user objects."""
+        repo = self.repo(repo) if isinstance(repo, str) else repo
+        if not title:
+            raise GraphQLError("Title can't be blank")
+        issue_id = self.next_id()
+        number = len(repo['issues']) + 1
+        now = timestamp()
+        issue = self.register('issue', f"I_{issue_id}", {
+            'id': issue_id, 'node_id': f"I_{issue_id}", 'repo': repo['full_name'], 'number': number,
+            'title': title, 'body': body or '', 'state': state, 'labels': list(labels),
+            'milestone': milestone, 'assignees': list(assignees), 'created_at': now, 'updated_at': now,
+            'closed_at': now if state == 'closed' else None,
+        })
+        repo['issues'].append(issue)
+        return issue
+
+    def project(self, project_id):
+        """A ProjectV2, created on first use with Title, Status, Start date and End date fields."""
+        if project_id not in self.projects:
+            project = self.register('project', project_id, {
+                'id': project_id, 'title': f"Project {project_id}", 'fields': [], 'items': []})
+            self.projects[project_id] = project
+            for name, data_type in DEFAULT_FIELDS:
+                self.add_field(project, name, data_type)
+        return self.projects[project_id]
+
+    def add_field(self, project, name, data_type):
+        field_id = stable_id('PVTF', project['id'], name)
+        project['fields'].append(self.register('field', field_id, {'id': field_id, 'name': name,
+                                                                    'dataType': data_type}))
+
+    def add_item(self, project, issue):
+        """The issue's item on a project; adding an issue twice returns its existing item, as on GitHub."""
+        for item in project['items']:
+            if item['content'] is issue:
+                return item
+        item_id = f"PVTI_{self.next_id()}"
+        now = timestamp()
+        item = self.register('item', item_id, {'id': item_id, 'project': project, 'content': issue, 'values': {},
+                                               'created_at': now, 'updated_at': now})
+        project['items'].append(item)
+        return item
+
+    def lookup(self, node_id, kind):
+        """The object behind a node id, or a NOT_FOUND error if there is none of that kind."""
+        if kind == 'project' and isinstance(node_id, str) and node_id.startswith('PVT_'):
+            return self.project(node_id)
+        found = self.nodes.get(node_id)
+        if not found or found[0] != kind:
+            raise GraphQLError(f"Could not resolve to a node with the global id of '{node_id}'", 'NOT_FOUND')
+        return found[1]
+
+    # REST views
+
+    def rest_label(self, label):
+        return {'id': label['id'], 'node_id': label['node_id'], 'name': label['name'], 'color': label['color'],
+                'default': False, 'description': label['description']}
+
+    def milestone_counts(self, repo):
+        """{milestone node id: {'open': n, 'closed': n}} over a repository's issues."""
+        counts = {m['node_id']: {'open': 0, 'closed': 0} for m in repo['milestones']}
+        for issue in repo['issues']:
+            if issue['milestone']:
+                counts[issue['milestone']['node_id']][issue['state']] += 1
+        return counts
+
+    def rest_milestone(self, milestone, counts=None):
+        counts = (counts or self.milestone_counts(self.repo(milestone['repo'])))[milestone['node_id']]
+        return {'id': milestone['id'], 'node_id': milestone['node_id'], 'number': milestone['number'],
+                'title': milestone['title'], 'description': milestone['description'], 'state': milestone['state'],
+                'open_issues': counts['open'], 'closed_issues': counts['closed'],
+                'created_at': milestone['created_at'], 'updated_at': milestone['updated_at']}
+
+    def rest_user(self, user):
+        return {'login': user['login'], 'id': user['number'], 'node_id': user['id'], 'type': 'User'}
+
+    def rest_issue(self, issue, counts=None):
+        return {'id': issue['id'], 'node_id': issue['node_id'], 'number': issue['number'], 'title': issue['title'],
+                'body': issue['body'], 'state': issue['state'],
+                'html_url': f"https://github.com/{issue['repo']}/issues/{issue['number']}",
+                'labels': [self.rest_label(label) for label in issue['labels']],
+                'milestone': self.rest_milestone(issue['milestone'], counts) if issue['milestone'] else None,
+                'assignees': [self.rest_user(user) for user in issue['assignees']],
+                'created_at': issue['created_at'], 'updated_at': issue['updated_at'],
+                'closed_at': issue['closed_at']}
+
+    def rest_team(self, org, team):
+        parent = self.org(org)['teams'].get(team['parent']) if team['parent'] else None
+        return {'id': team['id'], 'node_id': team['node_id'], 'slug': team['slug'], 'name': team['name'],
+                'description': team['description'], 'privacy': 'closed',
+                'parent': self.rest_team(org, parent) if parent else None}
+
+    def team_members(self, org, slug):
+        """Members of a team and of its child teams, like GitHub's list-members endpoint."""
+        teams = self.org(org)['teams']
+        logins = list(teams[slug]['members'])
+        for child in teams.values():
+            if child['parent'] == slug:
+                logins.extend(login for login in self.team_members(org, child['slug']) if login not in logins)
+        return logins
+
+    # GraphQL views
+
+    def connection(self, items, args, view):
+        """A cursor-paginated connection over items."""
+        first = min(args.get('first') or MAX_PAGE, MAX_PAGE, self.max_page)
+        start = int(base64.b64decode(args['after']).decode().split(':')[1]) if args.get('after') else 0
+        page = items[start:start + first]
+        end = start + len(page)
+        cursor = lambda index: base64.b64encode(f"cursor:{index}".encode()).decode()
+        return {
+            'totalCount': len(items),
+            'nodes': lambda _: [view(item) for item in page],
+            'edges': lambda _: [{'cursor': cursor(start + i + 1), 'node': view(item)} for i, item in enumerate(page)],
+            'pageInfo': {'hasNextPage': end < len(items), 'endCursor': cursor(end) if page else None,
+                         'hasPreviousPage': start > 0, 'startCursor': cursor(start + 1) if page else None},
+        }
+
+    def repo_view(self, repo):
+        states = lambda args, default: {state.lower() for state in (args.get('states') or default)}
+        return {
+            '__typename': 'Repository', 'id': repo['id'], 'name': repo['name'], 'nameWithOwner': repo['full_name'],
+            'url': f"https://github.com/{repo['full_name']}",
+            'labels': lambda args: self.connection(repo['labels'], args, self.label_view),
+            'label': lambda args: self.label_view(self.find_label(repo, args['name'])),
+            'milestones': lambda args: self.connection(
+                [m for m in repo['milestones'] if m['state'] in states(args, ('OPEN', 'CLOSED'))],
+                args, self.milestone_view),
+            'issues': lambda args: self.connection(
+                [i for i in repo['issues'] if i['state'] in states(args, ('OPEN', 'CLOSED'))],
+                args, self.issue_view),
+            'issue': lambda args: self.issue_view(
+                next((i for i in repo['issues'] if i['number'] == args.get('number')), None)),
+        }
+
+    def label_view(self, label):
+        if label is None:
+            return None
+        return {'__typename': 'Label', 'id': label['node_id'], 'name': label['name'], 'color': label['color'],
+                'description': label['description']}
+
+    def milestone_view(self, milestone):
+        if milestone is None:
+            return None
+        return {'__typename': 'Milestone', 'id': milestone['node_id'], 'number': milestone['number'],
+                'title': milestone['title'], 'description': milestone['description'],
+                'state': milestone['state'].upper()}
+
+    def user_view(self, user):
+        return {'__typename': 'User', 'id': user['id'], 'login': user['login']}
+
+    def issue_view(self, issue):
+        if issue is None:
+            return None
+        return {
+            '__typename': 'Issue', 'id': issue['node_id'], 'number': issue['number'], 'title': issue['title'],
+            'body': issue['body'], 'state': issue['state'].upper(),
+            'url': f"https://github.com/{issue['repo']}/issues/{issue['number']}",
+            'createdAt': issue['created_at'], 'updatedAt': issue['updated_at'], 'closedAt': issue['closed_at'],
+            'repository': lambda _: self.repo_view(self.repo(issue['repo'])),
+            'milestone': lambda _: self.milestone_view(issue['milestone']),
+            'labels': lambda args: self.connection(issue['labels'], args, self.label_view),
+            'assignees': lambda args: self.connection(issue['assignees'], args, self.user_view),
+            'projectItems': lambda args: self.connection(
+                [item for project in self.projects.values() for item in project['items']
+                 if item['content'] is issue], args, self.item_view),
+        }
+
+    def project_view(self, project):
+        return {
+            '__typename': 'ProjectV2', 'id': project['id'], 'title': project['title'],
+            'fields': lambda args: self.connection(project['fields'], args, self.field_view),
+            'items': lambda args: self.connection(project['items'], args, self.item_view),
+        }
+
+    def field_view(self, field):
+        typename = 'ProjectV2SingleSelectField' if field['dataType'] == 'SINGLE_SELECT' else 'ProjectV2Field'
+        return {'__typename': typename, '__interfaces': ('ProjectV2FieldCommon',),
+                'id': field['id'], 'name': field['name'], 'dataType': field['dataType']}
+
+    def item_view(self, item):
+        return {
+            '__typename': 'ProjectV2Item', 'id': item['id'], 'type': 'ISSUE',
+            'createdAt': item['created_at'], 'updatedAt': item['updated_at'],
+            'project': lambda _: self.project_view(item['project']),
+            'content': lambda _: self.issue_view(item['content']),
+            'fieldValues': lambda args: self.connection(list(item['values'].items()), args, self.value_view),
+        }
+
+    def value_view(self, entry):
+        field_id, value = entry
+        field = self.nodes[field_id][1]
+        kind = {'DATE': 'Date', 'NUMBER': 'Number'}.get(field['dataType'], 'Text')
+        return {'__typename': f"ProjectV2ItemField{kind}Value", kind.lower(): value,
+                'field': lambda _: self.field_view(field)}
+
+    def node_view(self, node_id):
+        if isinstance(node_id, str) and node_id.startswith('PVT_'):
+            return self.project_view(self.project(node_id))
+        kind, obj = self.nodes.get(node_id, (None, None))
+        views = {'repo': self.repo_view, 'label': self.label_view, 'milestone': self.milestone_view,
+                 'issue': self.issue_view, 'user': self.user_view, 'item': self.item_view,
+                 'field': self.field_view}
+        if kind not in views:
+            raise GraphQLError(f"Could not resolve to a node with the global id of '{node_id}'", 'NOT_FOUND')
+        return views[kind](obj)
+
+    # GraphQL mutations
+
+    def create_label(self, args):
+        data = args.get('input') or {}
+        repo = self.lookup(data.get('repositoryId'), 'repo')
+        label = self.add_label(repo, data.get('name'), data.get('color') or 'ededed', data.get('description'))
+        return {'label': lambda _: self.label_view(label), 'clientMutationId': None}
+
+    def issue_fields(self, data):
+        """Label, milestone and assignee objects named by ids in a createIssue/updateIssue input."""
+        fields = {}
+        if 'labelIds' in data:
+            fields['labels'] = [self.lookup(node_id, 'label') for node_id in data['labelIds'] or []]
+        if 'milestoneId' in data:
+            fields['milestone'] = self.lookup(data['milestoneId'], 'milestone') if data['milestoneId'] else None
+        if 'assigneeIds' in data:
+            fields['assignees'] = [self.lookup(node_id, 'user') for node_id in data['assigneeIds'] or []]
+        return fields
+
+    def create_issue(self, args):
+        data = args.get('input') or {}
+        repo = self.lookup(data.get('repositoryId'), 'repo')
+        issue = self.add_issue(repo, data.get('title'), data.get('body'), **self.issue_fields(data))
+        return {'issue': lambda _: self.issue_view(issue), 'clientMutationId': None}
+
+    def update_issue(self, args):
+        data = args.get('input') or {}
+        issue = self.lookup(data.get('id'), 'issue')
+        fields = self.issue_fields(data)
+        for key in ('title', 'body'):
+            if data.get(key) is not None:
+                fields[key] = data[key]
+        if data.get('state'):
+            fields['state'] = data['state'].lower()
+            if fields['state'] != issue['state']:
+                fields['closed_at'] = timestamp() if fields['state'] == 'closed' else None
+        issue.update(fields)
+        issue['updated_at'] = timestamp()
+        return {'issue': lambda _: self.issue_view(issue), 'clientMutationId': None}
+
+    def add_assignees(self, args):
+        data = args.get('input') or {}
+        issue = self.lookup(data.get('assignableId'), 'issue')
+        for node_id in data.get('assigneeIds') or []:
+            user = self.lookup(node_id, 'user')
+            if user not in issue['assignees']:
+                issue['assignees'].append(user)
+        issue['updated_at'] = timestamp()
+        return {'assignable': lambda _: self.issue_view(issue), 'clientMutationId': None}
+
+    def add_project_item(self, args):
+        data = args.get('input') or {}
+        project = self.lookup(data.get('projectId'), 'project')
+        item = self.add_item(project, self.lookup(data.get('contentId'), 'issue'))
+        return {'item': lambda _: self.item_view(item), 'clientMutationId': None}
+
+    def update_project_field(self, args):
+        data = args.get('input') or {}
+        project = self.lookup(data.get('projectId'), 'project')
+        item = self.lookup(data.get('itemId'), 'item')
+        field = self.lookup(data.get('fieldId'), 'field')
+        if item['project'] is not project or field not in project['fields']:
+            raise GraphQLError("The item or field does not belong to the project")
+        value = data.get('value') or {}
+        key = {'DATE': 'date', 'NUMBER': 'number'}.get(field['dataType'], 'text')
+        if key not in value:
+            raise GraphQLError(f"A {field['dataType']} field needs a {key} value")
+        item['values'][field['id']] = value[key]
+        item['updated_at'] = timestamp()
+        return {'projectV2Item': lambda _: self.item_view(item), 'clientMutationId': None}
+
+    def graphql_root(self, operation, rate):
+        if operation == 'mutation':
+            return {
+                '__typename': 'Mutation',
+                'createLabel': self.create_label,
+                'createIssue': self.create_issue,
+                'updateIssue': self.update_issue,
+                'addAssigneesToAssignable': self.add_assignees,
+                'addProjectV2ItemById': self.add_project_item,
+                'updateProjectV2ItemFieldValue': self.update_project_field,
+            }
+        return {
+            '__typename': 'Query',
+            'repository': lambda args: self.repo_view(self.repo(f"{args['owner']}/{args['name']}")),
+            'node': lambda args: self.node_view(args.get('id')),
+            'nodes': lambda args: [self.node_view(node_id) for node_id in args.get('ids') or []],
+            'viewer': {'__typename': 'User', 'login': 'fake-viewer', 'id': stable_id('U', 'fake-viewer')},
+            'rateLimit': {'__typename': 'RateLimit', 'cost': 1, 'limit': rate['limit'],
+                          'remaining': rate['remaining'] - 1, 'used': rate['limit'] - rate['remaining'] + 1,
+                          'resetAt': datetime.fromtimestamp(rate['reset'], timezone.utc)
+                          .strftime('%Y-%m-%dT%H:%M:%SZ'), 'nodeCount': 0},
+        }
+
+    # Snapshots
+
+    def snapshot(self):
+        """Everything in the server, in the format load() reads."""
+        return {
+            'repos': {repo['full_name']: {
+                'labels': [{'name': l['name'], 'color': l['color'], 'description': l['description']}
+                           for l in repo['labels']],
+                'milestones': [{'title': m['title'], 'description': m['description'], 'state': m['state']}
+                               for m in repo['milestones']],
+                'issues': [{'title': i['title'], 'body': i['body'], 'state': i['state'],
+                            'labels': [l['name'] for l in i['labels']],
+                            'milestone': i['milestone']['title'] if i['milestone'] else None,
+                            'assignees': [u['login'] for u in i['assignees']]} for i in repo['issues']],
+            } for repo in self.repos.values()},
+            'orgs': {org['login']: {'teams': [
+                {'name': t['name'], 'description': t['description'], 'parent': t['parent'], 'members': t['members']}
+                for t in org['teams'].values()]} for org in self.orgs.values()},
+            'projects': {project['id']: {
+                'fields': [{'name': f['name'], 'dataType': f['dataType']} for f in project['fields']],
+                'items': [{'repo': item['content']['repo'], 'issue': item['content']['number'],
+                           'values': {self.nodes[field_id][1]['name']: value
+                                      for field_id, value in item['values'].items()}}
+                          for item in project['items']],
+            } for project in self.projects.values()},
+        }
+
+    def load(self, snapshot):
+        """Add the content of a snapshot (see snapshot())."""
+        for login, org in snapshot.get('orgs', {}).items():
+            self.orgs[login.lower()] = {'login': login, 'teams': {}, 'users': {}}
+            for team in org.get('teams', []):
+                self.add_team(login, team['name'], team.get('description'), team.get('parent'),
+                              team.get('members', ()))
+        for full_name, content in snapshot.get('repos', {}).items():
+            repo = self.repo(full_name)
+            owner = full_name.split('/', 1)[0]
+            for label in content.get('labels', []):
+                self.add_label(repo, label['name'], label.get('color') or 'ededed', label.get('description'))
+            milestones = {}
+            for milestone in content.get('milestones', []):
+                milestones[milestone['title']] = self.add_milestone(
+                    repo, milestone['title'], milestone.get('description'), milestone.get('state', 'open'))
+            for issue in content.get('issues', []):
+                self.add_issue(repo, issue['title'], issue.get('body'),
+                               [self.find_label(repo, name) for name in issue.get('labels', [])
+                                if self.find_label(repo, name)],
+                               milestones.get(issue.get('milestone')),
+                               [self.user(owner, login) for login in issue.get('assignees', [])],
+                               issue.get('state', 'open'))
+        for project_id, content in snapshot.get('projects', {}).items():
+            project = self.register('project', project_id, {
+                'id': project_id, 'title': f"Project {project_id}", 'fields': [], 'items': []})
+            self.projects[project_id] = project
+            for field in content.get('fields') or [{'name': n, 'dataType': t} for n, t in DEFAULT_FIELDS]:
+                self.add_field(project, field['name'], field['dataType'])
+            by_name = {field['name']: field for field in project['fields']}
+            for entry in content.get('items', []):
+                issue = self.repo(entry['repo'])['issues'][entry['issue'] - 1]
+                item = self.add_item(project, issue)
+                for name, value in entry.get('values', {}).items():
+                    item['values'][by_name[name]['id']] = value
+
+class FakeGitHub:
+    """The fake API on a local port, served from a background thread.
+
+    Fault options are the command-line ones: latency and jitter in seconds,
+    max_page, rate_limit (points per window), window (seconds),
+    secondary_every, retry_after (seconds), fail_rate, drop_rate, etags.
+    """
+
+    def __init__(self, state=None, port=0, latency=0.0, jitter=0.0, max_page=MAX_PAGE, rate_limit=5000,
+                 window=3600, secondary_every=0, retry_after=1, fail_rate=0.0, drop_rate=0.0, etags=True, seed=None):
+        self.state = state or FakeState()
+        self.state.max_page = max_page
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.window = window
+        self.secondary_every = secondary_every
+        self.retry_after = retry_after
+        self.fail_rate = fail_rate
+        self.drop_rate = drop_rate
+        self.etags = etags
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.stats = {}
+        self.rates = {}
+        self.routes = [
+            ('GET', r'/rate_limit', self.get_rate_limit),
+            ('GET', r'/repos/([^/]+/[^/]+)/labels', self.list_labels),
+            ('POST', r'/repos/([^/]+/[^/]+)/labels', self.create_label),
+            ('PATCH', r'/repos/([^/]+/[^/]+)/labels/([^/]+)', self.update_label),
+            ('DELETE', r'/repos/([^/]+/[^/]+)/labels/([^/]+)', self.delete_label),
+            ('GET', r'/repos/([^/]+/[^/]+)/milestones', self.list_milestones),
+            ('POST', r'/repos/([^/]+/[^/]+)/milestones', self.create_milestone),
+            ('PATCH', r'/repos/([^/]+/[^/]+)/milestones/(\d+)', self.update_milestone),
+            ('DELETE', r'/repos/([^/]+/[^/]+)/milestones/(\d+)', self.delete_milestone),
+            ('GET', r'/repos/([^/]+/[^/]+)/issues', self.list_issues),
+            ('POST', r'/repos/([^/]+/[^/]+)/issues', self.create_issue),
+            ('GET', r'/orgs/([^/]+)/repos', self.list_repos),
+            ('GET', r'/users/([^/]+)/repos', self.list_repos),
+            ('POST', r'/orgs/([^/]+)/teams', self.create_team),
+            ('GET', r'/orgs/([^/]+)/teams/([^/]+)', self.get_team),
+            ('GET', r'/orgs/([^/]+)/teams/([^/]+)/teams', self.list_child_teams),
+            ('GET', r'/orgs/([^/]+)/teams/([^/]+)/members', self.list_members),
+            ('POST', r'/graphql', self.graphql),
+        ]
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; without this, delayed ACKs add ~40ms each
+            disable_nagle_algorithm = True
+
+            def handle_method(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                status, headers, data, drop = fake.handle(self.command, self.path, body, self.headers)
+                if drop:
+                    self.close_connection = True
+                    return
+                payload = json.dumps(data).encode() if data is not None else b''
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if payload:
+                    self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = do_PUT = handle_method
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            # Many workers connect at once; the default backlog of 5 drops connections
+            request_queue_size = 128
+            daemon_threads = True
+
+        self.server = Server(('127.0.0.1', port), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self):
+        """Serve from a daemon thread; returns self."""
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    # Request handling
+
+    def rate(self, resource):
+        """The rate-limit window of a resource, reset once it has elapsed."""
+        now = int(time.time())
+        rate = self.rates.get(resource)
+        if rate is None or now >= rate['reset']:
+            rate = self.rates[resource] = {'limit': self.rate_limit, 'remaining': self.rate_limit,
+                                           'reset': now + self.window}
+        return rate
+
+    def rate_headers(self, resource):
+        rate = self.rate(resource)
+        return {'X-RateLimit-Limit': str(rate['limit']), 'X-RateLimit-Remaining': str(rate['remaining']),
+                'X-RateLimit-Used': str(rate['limit'] - rate['remaining']),
+                'X-RateLimit-Reset': str(rate['reset']), 'X-RateLimit-Resource': resource}
+
+    def handle(self, method, target, body, request_headers):
+        """Answer one request; returns (status, headers, JSON data, drop the response)."""
+        delay = self.latency + self.random.uniform(0, self.jitter) if self.latency or self.jitter else 0
+        if delay:
+            time.sleep(delay)
+        parts = urlsplit(target)
+        if parts.path == '/_state':
+            with self.lock:
+                return 200, {}, self.state.snapshot(), False
+
+        try:
+            payload = json.loads(body) if body else {}
+        except json.JSONDecodeError:
+            return 400, {}, {'message': 'Problems parsing JSON'}, False
+        resource = 'graphql' if parts.path == '/graphql' else 'core'
+        is_write = method != 'GET' and not (resource == 'graphql' and
+                                           not str(payload.get('query', '')).lstrip().startswith('mutation'))
+
+        with self.lock:
+            status, headers, data = self.respond(method, parts, payload, resource, is_write, request_headers)
+            self.stats[status] = self.stats.get(status, 0) + 1
+            drop = is_write and status < 400 and self.drop_rate and self.random.random() < self.drop_rate
+        return status, headers, data, drop
+
+    def respond(self, method, parts, payload, resource, is_write, request_headers):
+        """Apply faults and rate limits around the route for a request; returns (status, headers, data)."""
+        if self.fail_rate and self.random.random() < self.fail_rate:
+            return 502, {}, {'message': 'Server Error'}
+        rate = self.rate(resource)
+        if rate['remaining'] <= 0 and parts.path != '/rate_limit':
+            return 403, self.rate_headers(resource), {
+                'message': f"API rate limit exceeded for user ID 1. (fake_github, {resource})",
+                'documentation_url': 'https://docs.github.com/rest/overview/rate-limits-for-the-rest-api'}
+        if is_write:
+            self.writes += 1
+            if self.secondary_every and self.writes % self.secondary_every == 0:
+                headers = dict(self.rate_headers(resource), **{'Retry-After': str(self.retry_after)})
+                return 403, headers, {
+                    'message': 'You have exceeded a secondary rate limit. Please wait a few minutes before you try '
+                               'again. (fake_github)',
+                    'documentation_url': 'https://docs.github.com/rest/overview/rate-limits-for-the-rest-api'}
+
+        for route_method, pattern, handler in self.routes:
+            match = re.fullmatch(pattern, parts.path)
+            if route_method == method and match:
+                query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+                status, data, headers = handler(*map(unquote, match.groups()), query=query, payload=payload,
+                                                host=request_headers.get('Host'), path=parts.path)
+                break
+        else:
+            status, data, headers = 404, {'message': 'Not Found'}, {}
+
+        if method == 'GET' and status == 200 and self.etags:
+            etag = f'W/"{hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()[:32]}"'
+            headers['ETag'] = etag
+            if request_headers.get('If-None-Match') == etag:
+                return 304, dict(self.rate_headers(resource), ETag=etag), None
+        if parts.path != '/rate_limit':
+            rate['remaining'] -= 1
+        return status, dict(self.rate_headers(resource), **headers), data
+
+    def page(self, items, query, host, path):
+        """One REST page of items and its Link header."""
+        per_page = min(int(query.get('per_page', 30)), MAX_PAGE, self.state.max_page)
+        page = int(query.get('page', 1))
+        last = max(1, -(-len(items) // per_page))
+        link = lambda number: f'<http://{host}{path}?{urlencode(dict(query, per_page=per_page, page=number))}>'
+        links = []
+        if page < last:
+            links += [f'{link(page + 1)}; rel="next"', f'{link(last)}; rel="last"']
+        if page > 1:
+            links += [f'{link(1)}; rel="first"', f'{link(page - 1)}; rel="prev"']
+        headers = {'Link': ', '.join(links)} if links else {}
+        return 200, items[(page - 1) * per_page:page * per_page], headers
+
+    @staticmethod
+    def validation_failed(resource, field, code):
+        return 422, {'message': 'Validation Failed',
+                     'errors': [{'resource': resource, 'field': field, 'code': code}]}, {}
+
+    # REST routes: each returns (status, data, headers)
+
+    def get_rate_limit(self, **_):
+        resources = {name: {'limit': rate['limit'], 'remaining': rate['remaining'],
+                            'used': rate['limit'] - rate['remaining'], 'reset': rate['reset']}
+                     for name, rate in ((name, self.rate(name)) for name in ('core', 'graphql'))}
+        return 200, {'resources': resources, 'rate': resources['core']}, {}
+
+    def list_labels(self, repo, query, host, path, **_):
+        labels = self.state.repo(repo)['labels']
+        return self.page([self.state.rest_label(label) for label in labels], query, host, path)
+
+    def create_label(self, repo, payload, **_):
+        if not payload.get('name'):
+            return self.validation_failed('Label', 'name', 'missing_field')
+        try:
+            label = self.state.add_label(repo, payload['name'], payload.get('color') or 'ededed',
+                                         payload.get('description'))
+        except GraphQLError:
+            return self.validation_failed('Label', 'name', 'already_exists')
+        return 201, self.state.rest_label(label), {}
+
+    def update_label(self, repo, name, payload, **_):
+        label = self.state.find_label(self.state.repo(repo), name)
+        if not label:
+            return 404, {'message': 'Not Found'}, {}
+        if payload.get('new_name'):
+            label['name'] = payload['new_name']
+        for key in ('color', 'description'):
+            if key in payload:
+                label[key] = payload[key]
+        return 200, self.state.rest_label(label), {}
+
+    def delete_label(self, repo, name, **_):
+        repo = self.state.repo(repo)
+        label = self.state.find_label(repo, name)
+        if not label:
+            return 404, {'message': 'Not Found'}, {}
+        repo['labels'].remove(label)
+        for issue in repo['issues']:
+            if label in issue['labels']:
+                issue['labels'].remove(label)
+        del self.state.nodes[label['node_id']]
+        return 204, None, {}
+
+    def list_milestones(self, repo, query, host, path, **_):
+        state = query.get('state', 'open')
+        repo = self.state.repo(repo)
+        counts = self.state.milestone_counts(repo)
+        milestones = [m for m in repo['milestones'] if state == 'all' or m['state'] == state]
+        return self.page([self.state.rest_milestone(m, counts) for m in milestones], query, host, path)
+
+    def create_milestone(self, repo, payload, **_):
+        if not payload.get('title'):
+            return self.validation_failed('Milestone', 'title', 'missing_field')
+        try:
+            milestone = self.state.add_milestone(repo, payload['title'], payload.get('description'),
+                                                 payload.get('state', 'open'))
+        except GraphQLError:
+            return self.validation_failed('Milestone', 'title', 'already_exists')
+        return 201, self.state.rest_milestone(milestone), {}
+
+    def find_milestone(self, repo, number):
+        return next((m for m in self.state.repo(repo)['milestones'] if m['number'] == int(number)), None)
+
+    def update_milestone(self, repo, number, payload, **_):
+        milestone = self.find_milestone(repo, number)
+        if not milestone:
+            return 404, {'message': 'Not Found'}, {}
+        for key in ('title', 'description', 'state'):
+            if key in payload:
+                milestone[key] = payload[key]
+        milestone['updated_at'] = timestamp()
+        return 200, self.state.rest_milestone(milestone), {}
+
+    def delete_milestone(self, repo, number, **_):
+        milestone = self.find_milestone(repo, number)
+        if not milestone:
+            return 404, {'message': 'Not Found'}, {}
+        repo = self.state.repo(repo)
+        repo['milestones'].remove(milestone)
+        for issue in repo['issues']:
+            if issue['milestone'] is milestone:
+                issue['milestone'] = None
+        del self.state.nodes[milestone['node_id']]
+        return 204, None, {}
+
+    def list_issues(self, repo, query, host, path, **_):
+        state = query.get('state', 'open')
+        since = query.get('since')
+        repo = self.state.repo(repo)
+        counts = self.state.milestone_counts(repo)
+        issues = [i for i in reversed(repo['issues'])
+                  if (state == 'all' or i['state'] == state) and (not since or i['updated_at'] >= since)]
+        return self.page([self.state.rest_issue(i, counts) for i in issues], query, host, path)
+
+    def create_issue(self, repo, payload, **_):
+        if not payload.get('title'):
+            return self.validation_failed('Issue', 'title', 'missing_field')
+        full_name = repo
+        repo = self.state.repo(full_name)
+        owner = full_name.split('/', 1)[0]
+        labels = [self.state.find_label(repo, name) or self.state.add_label(repo, name)
+                  for name in payload.get('labels', [])]
+        milestone = self.find_milestone(full_name, payload['milestone']) if payload.get('milestone') else None
+        assignees = [self.state.user(owner, login) for login in payload.get('assignees', [])]
+        issue = self.state.add_issue(repo, payload['title'], payload.get('body'), labels, milestone, assignees)
+        return 201, self.state.rest_issue(issue), {}
+
+    def list_repos(self, owner, query, host, path, **_):
+        repos = [{'id': i, 'node_id': repo['id'], 'name': repo['name'], 'full_name': repo['full_name'],
+                  'private': False, 'archived': False}
+                 for i, repo in enumerate(self.state.repos.values(), 1)
+                 if repo['full_name'].split('/', 1)[0].lower() == owner.lower()]
+        return self.page(repos, query, host, path)
+
+    def create_team(self, org, payload, **_):
+        teams = self.state.org(org)['teams']
+        parent = next((t['slug'] for t in teams.values() if t['id'] == payload.get('parent_team_id')), None)
+        if payload.get('parent_team_id') and not parent:
+            return self.validation_failed('Team', 'parent_team_id', 'invalid')
+        try:
+            team = self.state.add_team(org, payload.get('name', ''), payload.get('description'), parent,
+                                       payload.get('maintainers', ()))
+        except GraphQLError:
+            return self.validation_failed('Team', 'name', 'already_exists')
+        return 201, self.state.rest_team(org, team), {}
+
+    def get_team(self, org, slug, **_):
+        team = self.state.org(org)['teams'].get(slug)
+        if not team:
+            return 404, {'message': 'Not Found'}, {}
+        return 200, self.state.rest_team(org, team), {}
+
+    def list_child_teams(self, org, slug, query, host, path, **_):
+        teams = self.state.org(org)['teams']
+        if slug not in teams:
+            return 404, {'message': 'Not Found'}, {}
+        children = [self.state.rest_team(org, t) for t in teams.values() if t['parent'] == slug]
+        return self.page(children, query, host, path)
+
+    def list_members(self, org, slug, query, host, path, **_):
+        if slug not in self.state.org(org)['teams']:
+            return 404, {'message': 'Not Found'}, {}
+        users = self.state.org(org)['users']
+        members = [self.state.rest_user(users[login]) for login in self.state.team_members(org, slug)]
+        return self.page(members, query, host, path)
+
+    def graphql(self, payload, **_):
+        try:
+            operation, selections = Parser(str(payload.get('query', ''))).document()
+            errors = []
+            root = self.state.graphql_root(operation, self.rate('graphql'))
+            data = execute(root, selections, payload.get('variables') or {}, [], errors)
+        except QueryError as e:
+            return 200, {'errors': [{'message': str(e)}]}, {}
+        response = {'data': data}
+        if errors:
+            response['errors'] = errors
+        return 200, response, {}
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake GitHub API on localhost")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument("--state", help="JSON file with the initial repositories, teams and projects")
+    parser.add_argument("--dump", help="Write the final state to this JSON file on exit")
+    parser.add_argument("--members", type=int, default=3,
+                        help="Fake users in each organisation's CVsTT team (default: 3)")
+    parser.add_argument("--latency", type=float, default=0, help="Milliseconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0, help="Up to this many random extra milliseconds")
+    parser.add_argument("--max-per-page", type=int, default=MAX_PAGE,
+                        help=f"Largest page served, whatever was asked for (default: {MAX_PAGE})")
+    parser.add_argument("--rate-limit", type=int, default=5000,
+                        help="Points per resource (core, graphql) and window (default: 5000)")
+    parser.add_argument("--window", type=int, default=3600, help="Rate-limit window in seconds (default: 3600)")
+    parser.add_argument("--secondary-every", type=int, default=0,
+                        help="Answer every Nth write with a secondary rate-limit 403 (default: never)")
+    parser.add_argument("--retry-after", type=int, default=1,
+                        help="Retry-After seconds of secondary rate-limit responses (default: 1)")
+    parser.add_argument("--fail-rate", type=float, default=0, help="Fraction of requests answered with a 502")
+    parser.add_argument("--drop-rate", type=float, default=0,
+                        help="Fraction of writes applied but answered by closing the connection")
+    parser.add_argument("--no-etags", action="store_true", help="Do not send ETags or answer 304")
+    parser.add_argument("--seed", type=int, help="Random seed for jitter and injected faults")
+    args = parser.parse_args()
+
+    state = FakeState(members=args.members)
+    if args.state:
+        with open(args.state, 'r') as f:
+            state.load(json.load(f))
+    fake = FakeGitHub(state, args.port, args.latency / 1000, args.jitter / 1000, args.max_per_page,
+                      args.rate_limit, args.window, args.secondary_every, args.retry_after, args.fail_rate,
+                      args.drop_rate, not args.no_etags, args.seed)
+
+    print(f"Fake GitHub API on {fake.url}")
+    print(f"   Use it with: --api-url {fake.url}  (or GITHUB_API_URL={fake.url})")
+    # Stop cleanly (and --dump) on kill as well as Ctrl-C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.server.server_close()
+        served = ', '.join(f"{count} x {status}" for status, count in sorted(fake.stats.items()))
+        print(f"\nServed {sum(fake.stats.values())} requests ({served or 'none'})")
+        if args.dump:
+            with open(args.dump, 'w') as f:
+                json.dump(state.snapshot(), f, indent=2)
+            print(f"✓ State written to {args.dump}")
+
+if __name__ == "__main__":
+    sys.exit(main())
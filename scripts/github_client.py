@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+"""
+Pooled GitHub API client shared by the scripts
+
+One GitHubClient keeps a pool of keep-alive HTTP connections, reads the token
+once and exposes REST and GraphQL calls with timeouts and retries, so a run
+pays for a single TLS handshake per worker instead of one `gh` process per call.
+
+The token is read from GITHUB_TOKEN or GH_TOKEN, falling back to `gh auth token`.
+Set GITHUB_API_URL (e.g. http://127.0.0.1:8000), or pass a script's --api-url,
+to point the scripts at a local fake server (fake_github.py) instead of
+https://api.github.com.
+
+Requests share one RateLimiter: when any call hits a primary or secondary rate
+limit, every worker thread pauses until GitHub says it is safe to continue.
+
+List reads page through every result and are cached on disk (../.cache/github,
+or GITHUB_CACHE_DIR) with their ETags, so a repeat read is a conditional
+request that comes back 304 and does not cost rate-limit budget.
+
+Every HTTP call is recorded in `usage` (endpoint, latency, status, cost in
+rate-limit points and the quota left); `usage.report()` prints a summary and
+`check_budget()` compares an estimated cost with the budget left.
+
+Usage:
+    import github_client
+    status, headers, data = github_client.request('GET', 'repos/OWNER/REPO/labels')
+    status, labels = github_client.paginate('repos/OWNER/REPO/labels')
+    response = github_client.graphql('query { viewer { login } }')
+"""
+
+import os
+import re
+import json
+import time
+import queue
+import hashlib
+import contextlib
+import threading
+import subprocess
+import http.client
+from pathlib import Path
+from urllib.parse import urlsplit, urlencode
+
+import tracing
+
+DEFAULT_API_URL = "https://api.github.com"
+
+# Wait before retrying a secondary rate limit that came without Retry-After
+SECONDARY_BACKOFF = float(os.environ.get("GITHUB_SECONDARY_BACKOFF", 60))
+MAX_BACKOFF = 900
+
+# Server-side hiccups worth retrying with a short backoff
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# Roughly what GitHub's secondary rate limit allows for requests that create content
+CONTENT_CREATION_PER_HOUR = 500
+
+# Methods that are safe to resend when the outcome of a request is unknown
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'PATCH', 'DELETE')
+
+# A top-level "fragment Name on Type" definition in a GraphQL document
+FRAGMENT_DEFINITION = re.compile(r'(^|})\s*fragment\s+\w+\s+on\s')
+
+# How a pooled keep-alive connection the server closed while it was idle fails
+STALE_CONNECTION_ERRORS = (BrokenPipeError, ConnectionResetError, http.client.RemoteDisconnected)
+
+class _Clock:
+    """A time shared by the threads of one process; the stand-in for a multiprocessing.Value('d')."""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def get_lock(self):
+        return self._lock
+
+class RateLimiter:
+    """Shared pause gate driven by GitHub's X-RateLimit-* and Retry-After headers.
+
+    resume_at and slots may be a multiprocessing.Value('d') and semaphore, so
+    that worker processes pause together and share a cap on the requests in
+    flight; by default the pause is shared by the threads of one process and
+    the number of requests is not capped.
+    """
+
+    def __init__(self, secondary_backoff=SECONDARY_BACKOFF, resume_at=None, slots=None):
+        self.secondary_backoff = secondary_backoff
+        self._resume_at = resume_at if resume_at is not None else _Clock()
+        self._slots = slots
+
+    def wait(self):
+        """Block until no pause is in effect."""
+        while True:
+            with self._resume_at.get_lock():
+                delay = self._resume_at.value - time.time()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """Hold back every caller for the given number of seconds."""
+        with self._resume_at.get_lock():
+            self._resume_at.value = max(self._resume_at.value, time.time() + seconds)
+
+    def slot(self):
+        """Context manager holding one of the request slots while a request is in flight."""
+        return self._slots if self._slots is not None else contextlib.nullcontext()
+
+    def check(self, status, headers, data, attempt):
+        """Inspect a response; return seconds to wait before a retry, or None if it should not be retried."""
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        retry_after = headers.get('Retry-After')
+
+        if status not in (403, 429):
+            # Out of primary budget: let this call through, hold the next ones until reset
+            if remaining == '0' and reset:
+                self.pause(max(0, int(reset) - time.time()) + 1)
+            return None
+
+        if retry_after:
+            return float(retry_after)
+        if remaining == '0' and reset:
+            return max(0, int(reset) - time.time()) + 1
+        message = json.dumps(data).lower() if data else ''
+        if status == 429 or 'secondary rate limit' in message or 'abuse' in message:
+            return min(self.secondary_backoff * 2 ** attempt, MAX_BACKOFF)
+        return None
+
+rate_limiter = RateLimiter()
+
+class UsageLog:
+    """Every API call of a run: endpoint, latency, status, cost in points and the quota left."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = []
+        self.quota = {}
+
+    def record(self, endpoint, status, seconds, cost, headers):
+        """Record one HTTP round trip (each retry counts)."""
+        remaining = headers.get('X-RateLimit-Remaining')
+        with self._lock:
+            self.calls.append({'endpoint': endpoint, 'status': status, 'seconds': seconds, 'cost': cost})
+            if remaining is not None:
+                resource = headers.get('X-RateLimit-Resource') or 'core'
+                self.quota[resource] = {'remaining': int(remaining),
+                                        'limit': int(headers.get('X-RateLimit-Limit') or 0),
+                                        'reset': int(headers.get('X-RateLimit-Reset') or 0)}
+
+    def take(self):
+        """Remove and return (calls, quota) recorded so far, e.g. to hand them from a worker process to its parent."""
+        with self._lock:
+            calls, self.calls = self.calls, []
+            return calls, dict(self.quota)
+
+    def add(self, calls, quota):
+        """Add calls and quota taken from another UsageLog."""
+        with self._lock:
+            self.calls.extend(calls)
+            self.quota.update(quota)
+
+    def summary(self):
+        """Totals per endpoint: {endpoint: {'calls', 'errors', 'seconds', 'cost'}}."""
+        totals = {}
+        with self._lock:
+            calls = list(self.calls)
+        for call in calls:
+            total = totals.setdefault(call['endpoint'], {'calls': 0, 'errors': 0, 'seconds': 0.0, 'cost': 0})
+            total['calls'] += 1
+            total['errors'] += call['status'] == 0 or call['status'] >= 400
+            total['seconds'] += call['seconds']
+            total['cost'] += call['cost']
+        return totals
+
+    def report(self):
+        """Print the calls made so far, per endpoint, and the quota left."""
+        totals = self.summary()
+        if not totals:
+            return
+        calls = sum(t['calls'] for t in totals.values())
+        seconds = sum(t['seconds'] for t in totals.values())
+        cost = sum(t['cost'] for t in totals.values())
+        width = max(len(endpoint) for endpoint in totals)
+        print(f"\n📊 GitHub API usage: {calls} calls, {seconds:.1f}s, {cost} points")
+        for endpoint, t in sorted(totals.items(), key=lambda item: -item[1]['seconds']):
+            print(f"   {endpoint:<{width}}  {t['calls']:>5} calls  {t['errors']:>3} errors  "
+                  f"{t['seconds']:>7.2f}s  {t['cost']:>5} points")
+        for resource, quota in sorted(self.quota.items()):
+            resets = time.strftime('%H:%M', time.localtime(quota['reset'])) if quota['reset'] else '?'
+            print(f"   Quota left ({resource}): {quota['remaining']}/{quota['limit']}, resets at {resets}")
+
+usage = UsageLog()
+
+def endpoint_name(method, target, body=None):
+    """Label a call for the usage report: the path without ids, or the GraphQL operation."""
+    path = urlsplit(target).path
+    if path.endswith('/graphql') and isinstance(body, dict):
+        match = re.search(r'^\s*(query|mutation)\b[^{]*\{\s*(?:\w+\s*:\s*)?(\w+)', body.get('query', ''))
+        return f"graphql {match.group(1)} {match.group(2)}" if match else 'graphql'
+    parts = path.strip('/').split('/')
+    if parts[:1] == ['repos'] and len(parts) >= 3:
+        parts[1:3] = ['{owner}', '{repo}']
+    elif parts[:1] == ['orgs'] and len(parts) >= 2:
+        parts[1] = '{org}'
+        if parts[2:3] == ['teams'] and len(parts) >= 4:
+            parts[3] = '{team}'
+    return f"{method} " + '/'.join('{n}' if part.isdigit() else part for part in parts)
+
+def call_cost(target, body, status, data):
+    """Rate-limit points a call used: GraphQL queries report their own cost, other calls cost one.
+
+    Conditional requests answered with 304 and rate_limit reads are free.
+    """
+    if status in (0, 304) or urlsplit(target).path.endswith('/rate_limit'):
+        return 0
+    if urlsplit(target).path.endswith('/graphql'):
+        rate = ((data or {}).get('data') or {}).get('rateLimit') if isinstance(data, dict) else None
+        if rate and 'cost' in rate:
+            return rate['cost']
+    return 1
+
+class EtagCache:
+    """On-disk store of GET responses keyed by URL and revalidated with ETags."""
+
+    def __init__(self, directory=None):
+        default = Path(__file__).parent.parent / ".cache" / "github"
+        self.directory = Path(directory or os.environ.get("GITHUB_CACHE_DIR", default))
+
+    def _path(self, key):
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def get(self, key):
+        """Cached entry ({'etag', 'data', 'next'}) for a key, or None."""
+        try:
+            with open(self._path(key), 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, key, etag, data, next_url):
+        """Store a response; written via a temp file so concurrent readers never see half an entry."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'etag': etag, 'data': data, 'next': next_url}, f)
+        os.replace(tmp, path)
+
+def next_link(headers):
+    """URL of the next page from a Link header, or None."""
+    match = re.search(r'<([^>]+)>;\s*rel="next"', headers.get('Link') or '')
+    return match.group(1) if match else None
+
+def api_url():
+    """Base URL of the GitHub API."""
+    return os.environ.get("GITHUB_API_URL", DEFAULT_API_URL).rstrip('/')
+
+def cache_key(key):
+    """Key for an entry of a long-lived cache (team lists, project fields).
+
+    Prefixed with the API URL when it is not GitHub's, so ids from a fake
+    server never end up being used against the real one.
+    """
+    url = api_url()
+    return key if url == DEFAULT_API_URL else f"{url} {key}"
+
+def read_token():
+    """Read a GitHub token from the environment or the gh CLI."""
+    token = os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN")
+    if token:
+        return token
+    try:
+        result = subprocess.run(['gh', 'auth', 'token'], capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+class GitHubClient:
+    """REST and GraphQL client over a pool of keep-alive connections."""
+
+    def __init__(self, base_url=None, token=None, timeout=30, max_retries=5, pool_size=8,
+                 limiter=None, cache=None):
+        self.base_url = (base_url or api_url()).rstrip('/')
+        self.token = read_token() if token is None else token
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.limiter = limiter or rate_limiter
+        self.cache = cache or EtagCache()
+
+        parts = urlsplit(self.base_url)
+        self._scheme = parts.scheme
+        self._host = parts.netloc
+        self._prefix = parts.path.rstrip('/')
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    def _connect(self):
+        """(connection, reused): an idle connection from the pool, or a new one."""
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            return self._open(), False
+
+    def _open(self):
+        """Open a new connection to the API host."""
+        if self._scheme == 'http':
+            return http.client.HTTPConnection(self._host, timeout=self.timeout)
+        return http.client.HTTPSConnection(self._host, timeout=self.timeout)
+
+    def _release(self, conn):
+        """Return a connection to the pool, closing it if the pool is full."""
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def url_for(self, path, params=None):
+        """Request target for an API path, absolute API URL or path with query string."""
+        if path.startswith('http') or path.startswith(self._prefix + '/'):
+            parts = urlsplit(path)
+            target = parts.path + (f'?{parts.query}' if parts.query else '')
+        else:
+            target = f"{self._prefix}/{path.lstrip('/')}"
+        if params:
+            target += ('&' if '?' in target else '?') + urlencode(params)
+        return target
+
+    def _send(self, method, target, body=None, headers=None):
+        """Send one HTTP request on a pooled connection; returns (status, headers, decoded JSON body)."""
+        payload = json.dumps(body).encode() if body is not None else None
+        request_headers = {
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "CVsTT-Project-Planning",
+        }
+        if payload is not None:
+            request_headers["Content-Type"] = "application/json"
+        if self.token:
+            request_headers["Authorization"] = f"bearer {self.token}"
+        request_headers.update(headers or {})
+
+        conn, reused = self._connect()
+        try:
+            try:
+                conn.request(method, target, body=payload, headers=request_headers)
+                response = conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # The server closed the idle connection before reading the request,
+                # so it is safe to resend once on a fresh one, whatever the method
+                conn.close()
+                conn = self._open()
+                conn.request(method, target, body=payload, headers=request_headers)
+                response = conn.getresponse()
+            raw = response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            raise
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+
+        text = raw.decode(errors='replace')
+        try:
+            data = json.loads(text) if text else None
+        except json.JSONDecodeError:
+            data = {"message": text}
+        return response.status, response.headers, data
+
+    def request(self, method, path, body=None, params=None, headers=None, idempotent=None):
+        """Call the REST API with retries, waiting out rate limits; returns (status, headers, data).
+
+        Connection failures and 5xx responses are only retried for idempotent
+        requests (by default: every method but POST), since the server may
+        have applied a request whose response was lost. A pooled connection
+        the server closed while idle is replaced and the request resent first. They come back as
+        status 0 or the 5xx status once retries are exhausted.
+        """
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        target = self.url_for(path, params)
+        for attempt in range(self.max_retries + 1):
+            self.limiter.wait()
+            endpoint = endpoint_name(method, target, body)
+            started = time.perf_counter()
+            with tracing.span(endpoint, 'http', attempt=attempt) as span:
+                try:
+                    with self.limiter.slot():
+                        status, response_headers, data = self._send(method, target, body, headers)
+                except (OSError, http.client.HTTPException) as e:
+                    status, response_headers, data = 0, {}, {"message": str(e)}
+                span.set(status=status)
+            usage.record(endpoint, status, time.perf_counter() - started,
+                         call_cost(target, body, status, data), response_headers)
+
+            if status == 0 or status in RETRY_STATUSES:
+                delay = min(0.5 * 2 ** attempt, 30) if idempotent else None
+            else:
+                delay = self.limiter.check(status, response_headers, data, attempt)
+                if delay is not None:
+                    print(f"Rate limited on {method} {path}, retrying in {delay:.0f}s")
+                    self.limiter.pause(delay)
+                    delay = 0
+
+            if delay is None or attempt == self.max_retries:
+                break
+            time.sleep(delay)
+        return status, response_headers, data
+
+    def paginate(self, path, params=None, use_cache=True):
+        """GET every page of a list endpoint; returns (status, items) or (status, error body).
+
+        Each page is revalidated against the on-disk cache with If-None-Match,
+        so unchanged pages come back as 304 without using rate-limit budget.
+        """
+        target = self.url_for(path, dict({'per_page': 100}, **(params or {})))
+        items = []
+        while target:
+            key = f"{self.base_url}{target}"
+            cached = self.cache.get(key) if use_cache else None
+            headers = {'If-None-Match': cached['etag']} if cached else None
+
+            status, response_headers, data = self.request('GET', target, headers=headers)
+            if status == 304 and cached:
+                data, next_url = cached['data'], cached['next']
+            elif status == 200:
+                next_url = next_link(response_headers)
+                if use_cache and response_headers.get('ETag'):
+                    self.cache.put(key, response_headers['ETag'], data, next_url)
+            else:
+                return status, data
+
+            items.extend(data)
+            target = self.url_for(next_url) if next_url else None
+        return 200, items
+
+    def cached(self, path, params=None):
+        """Every item of a list endpoint as paginate() last read it, from the disk cache alone; None if not cached."""
+        target = self.url_for(path, dict({'per_page': 100}, **(params or {})))
+        items = []
+        while target:
+            entry = self.cache.get(f"{self.base_url}{target}")
+            if entry is None:
+                return None
+            items.extend(entry['data'])
+            target = self.url_for(entry['next']) if entry['next'] else None
+        return items
+
+    def graphql(self, query, variables=None, headers=None):
+        """Send a GraphQL request and return the decoded response (with 'data' and/or 'errors').
+
+        Queries are retried like any idempotent request, mutations are not.
+        Queries also ask for their rateLimit cost, which is recorded in the
+        usage log and removed from the response; not those with fragment
+        definitions, which may follow the operation's closing brace.
+        """
+        is_mutation = query.lstrip().startswith('mutation')
+        if not is_mutation and 'rateLimit' not in query and not FRAGMENT_DEFINITION.search(query):
+            query = query.rstrip()[:-1] + "  rateLimit { cost remaining }\n}"
+        status, _, data = self.request('POST', 'graphql', {"query": query, "variables": variables or {}},
+                                       headers=headers, idempotent=not is_mutation)
+        if isinstance(data, dict) and ('data' in data or 'errors' in data):
+            if not is_mutation and isinstance(data.get('data'), dict):
+                data['data'].pop('rateLimit', None)
+            return data
+        message = (data or {}).get('message', '') if isinstance(data, dict) else data
+        return {"errors": [{"message": f"HTTP {status}: {message}"}]}
+
+    def close(self):
+        """Close every pooled connection."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Shared client for the current process, created on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GitHubClient()
+        return _client
+
+def share_limits(resume_at, slots):
+    """Pause and cap requests together with other processes (see RateLimiter); call in each worker."""
+    global rate_limiter, _client
+    rate_limiter = RateLimiter(resume_at=resume_at, slots=slots)
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+def use_api(url):
+    """Point the shared client, and any process started from this one, at another API URL."""
+    global _client
+    os.environ["GITHUB_API_URL"] = url
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+def request(method, path, body=None, params=None, headers=None, idempotent=None):
+    """Call the REST API through the shared client; returns (status, headers, data)."""
+    return get_client().request(method, path, body, params, headers, idempotent)
+
+def paginate(path, params=None, use_cache=True):
+    """GET every page of a list endpoint through the shared client; returns (status, items)."""
+    return get_client().paginate(path, params, use_cache)
+
+def cached_list(path, params=None):
+    """A list endpoint's items from the disk cache of earlier paginate() calls, without a request; None if not cached."""
+    return get_client().cached(path, params)
+
+def graphql(query, variables=None, headers=None):
+    """Send a GraphQL request through the shared client."""
+    return get_client().graphql(query, variables, headers)
+
+def iter_issues(repo, fields='id number title url', states=('OPEN', 'CLOSED'), page_size=100):
+    """Stream every issue of a repository through GraphQL cursor pagination.
+
+    fields is the GraphQL selection for each issue. Raises RuntimeError if a
+    page cannot be read, so a partial listing is never mistaken for a full one.
+    """
+    owner, name = repo.split('/', 1)
+    query = f"""query($owner: String!, $name: String!, $states: [IssueState!], $first: Int!, $after: String) {{
+  repository(owner: $owner, name: $name) {{
+    issues(first: $first, after: $after, states: $states) {{
+      nodes {{ {fields} }}
+      pageInfo {{ hasNextPage endCursor }}
+    }}
+  }}
+}}"""
+    after = None
+    while True:
+        response = graphql(query, {'owner': owner, 'name': name, 'states': list(states),
+                                   'first': page_size, 'after': after})
+        repository = (response.get('data') or {}).get('repository')
+        if not repository:
+            messages = '; '.join(error.get('message', '') for error in response.get('errors', []))
+            raise RuntimeError(f"Could not list issues of {repo}: {messages}")
+        page = repository['issues']
+        yield from page['nodes']
+        if not page['pageInfo']['hasNextPage']:
+            return
+        after = page['pageInfo']['endCursor']
+
+def rate_limits():
+    """Budget left per resource ({'core': {'remaining', 'limit', 'reset'}, 'graphql': ...}), or None."""
+    status, _, data = request('GET', 'rate_limit')
+    if status != 200 or not isinstance(data, dict):
+        print(f"Error: {error_message(data)}")
+        return None
+    return data.get('resources', {})
+
+def check_budget(estimate):
+    """Print an estimated cost next to the budget left; True if it fits.
+
+    estimate has 'core' and 'graphql' points and 'creates', the number of
+    issues, labels and other objects the run would create. GitHub's secondary
+    limit allows about CONTENT_CREATION_PER_HOUR of those an hour; more does
+    not fail a run, it just gets paused, so it is only reported.
+    """
+    limits = rate_limits()
+    if limits is None:
+        return False
+    fits = True
+    print("\nEstimated cost:")
+    for resource in ('core', 'graphql'):
+        need = estimate.get(resource, 0)
+        left = limits.get(resource, {}).get('remaining', 0)
+        ok = need <= left
+        fits = fits and ok
+        print(f"   {'✓' if ok else '✗'} {resource}: {need} points of {left} left")
+    creates = estimate.get('creates', 0)
+    print(f"   • {creates} objects created")
+    if creates > CONTENT_CREATION_PER_HOUR:
+        hours = creates / CONTENT_CREATION_PER_HOUR
+        print(f"   ⚠️  Over GitHub's ~{CONTENT_CREATION_PER_HOUR}/hour creation limit: "
+              f"expect secondary rate-limit pauses, about {hours:.1f} hours in total")
+    return fits
+
+def error_message(data):
+    """Extract a readable message from a REST error body."""
+    if not isinstance(data, dict):
+        return str(data)
+    details = [e.get('code') or e.get('message', '') for e in data.get('errors', []) if isinstance(e, dict)]
+    message = data.get('message', '')
+    return f"{message} ({', '.join(details)})" if details else message
+
+def current_repo():
+    """OWNER/REPO of the git checkout the scripts are run from, or None."""
+    try:
+        result = subprocess.run(['git', 'remote', 'get-url', 'origin'], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    url = result.stdout.strip()
+    if url.endswith('.git'):
+        url = url[:-4]
+    # git@github.com:OWNER/REPO or https://github.com/OWNER/REPO
+    path = url.split(':', 1)[1] if url.startswith('git@') else urlsplit(url).path
+    parts = path.strip('/').split('/')
+    return '/'.join(parts[-2:]) if len(parts) >= 2 else None
@@ -0,0 +1,751 @@
+#!/usr/bin/env python3
+"""
+Bulk-import tasks from the src/*.csv files as GitHub issues
+
+Reads CSVs with the columns title,start_date,end_date,milestone,labels,
+assignees,content and an optional id. The import is an upsert: every issue
+body ends with a hidden marker holding the task's key and a hash of each
+imported field (body, labels, milestone, dates, and the title when keyed by
+id). The key is the row's id, or its title when there is no id column, so
+without ids renaming a task in the CSV creates a new issue. The existing
+issues are indexed once (one paginated GraphQL query) by key, so each row is
+then either created, updated in only the fields whose hash changed, or
+skipped. A re-run over unchanged rows makes no writes. Issues created before
+the marker existed, or keyed by title before the row got an id, are matched
+by title and adopted: their body is kept and the marker rewritten.
+
+Rows are streamed and written in batches of aliased createIssue/updateIssue
+GraphQL mutations. Every create batch is recorded in an append-only journal
+(../.cache/import/<csv>.jsonl): a 'pending' record before it is sent and a
+'created' record for each issue afterwards. If no response comes back the
+keys are looked up in the markers on GitHub straight away, so issues are never
+created twice.
+
+The assignees column names CVsTT child teams. Once the issues exist, rows are
+indexed by key, issues are grouped by team and assigned in bulk (see
+teams.py); an 'assigned' record marks each issue that is done. Only teams
+that already exist are assigned; the others are reported, and their issues
+assigned on a later run once they exist, unless --create-teams creates them.
+
+Finally issues are put on the project board with their start and end dates
+(see project_board.py). The index also reads each issue's board item, so only
+missing items and dates that differ are written.
+
+--estimate reads the repository, works out the writes an import would make
+and checks them against the rate-limit budget left, without writing.
+
+Before anything is written, every row is checked (see validate_tasks.py) and
+the import does not start if one has an error, unless --no-validate is given.
+Labels, milestones and teams that do not exist yet are errors, unless
+--allow-new (labels, milestones) or --create-teams lets the import create them.
+Assignees given more than --max-concurrent tasks at once by the CSVs are
+reported too (see scheduler.py), as warnings only.
+
+Usage: python import_tasks.py CSV [CSV ...] [--repo OWNER/REPO] [--batch-size N]
+                              [--project ID | --no-project] [--no-teams | --create-teams] [--dry-run | --estimate]
+                              [--no-validate] [--max-concurrent N] [--trace FILE]
+"""
+
+import os
+import re
+import csv
+import json
+import hashlib
+import argparse
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import github_client
+import project_board
+import scheduler
+import sync_categories
+import teams
+import tracing
+from validate_tasks import split_list, validate_files, print_problems
+
+JOURNAL_DIR = Path(__file__).parent.parent / ".cache" / "import"
+
+MARKER = 'cvstt-task'
+MARKER_PATTERN = re.compile(r'\s*<!-- cvstt-task: (\{.*?\}) -->\s*$', re.S)
+ISSUE_FIELDS = ('id number url title body milestone { title } '
+                'labels(first: 100) { nodes { name } pageInfo { hasNextPage endCursor } }')
+# The labels after an issue's first page
+LABELS_QUERY = """query($id: ID!, $after: String) {
+  node(id: $id) { ... on Issue { labels(first: 100, after: $after) { nodes { name } pageInfo { hasNextPage endCursor } } } }
+}"""
+
+def read_tasks(path):
+    """Stream the tasks of a CSV file one row at a time."""
+    with open(path, newline='') as f:
+        for row_number, row in enumerate(csv.DictReader(f), 1):
+            yield task_from_row(row, row_number)
+
+def task_from_row(row, row_number=None):
+    """The task a CSV row describes."""
+    milestones = split_list(row.get('milestone'))
+    return {
+        'row': row_number,
+        'id': (row.get('id') or '').strip(),
+        'title': (row.get('title') or '').strip(),
+        'body': row.get('content') or '',
+        'labels': split_list(row.get('labels')),
+        # Issues take a single milestone; the first one listed wins
+        'milestone': milestones[0] if milestones else '',
+        'start_date': (row.get('start_date') or '').strip(),
+        'end_date': (row.get('end_date') or '').strip(),
+        'assignees': split_list(row.get('assignees')),
+    }
+
+def task_key(task):
+    """Identity of a task across runs: its id, or its title for CSVs without ids."""
+    return task['id'] or task['title']
+
+def field_hashes(task):
+    """Short hash of each imported field of a task; the title is only one when it is not the key."""
+    fields = {
+        'body': task['body'],
+        'labels': sorted(task['labels']),
+        'milestone': task['milestone'],
+        'dates': [task['start_date'], task['end_date']],
+    }
+    if task['id']:
+        fields['title'] = task['title']
+    return {name: hashlib.sha256(json.dumps(value).encode()).hexdigest()[:12] for name, value in fields.items()}
+
+def render_marker(task):
+    """The hidden comment identifying an imported issue and the fields it was written from."""
+    marker = json.dumps({'key': task_key(task), **field_hashes(task)}, sort_keys=True)
+    # Keep '-->' in a title from closing the comment early
+    marker = marker.replace('>', '\\u003e')
+    return f"<!-- {MARKER}: {marker} -->"
+
+def split_marker(body):
+    """(body without the marker, marker dict or None)."""
+    body = body or ''
+    match = MARKER_PATTERN.search(body)
+    if not match:
+        return body, None
+    try:
+        return body[:match.start()], json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return body, None
+
+def with_marker(body, task):
+    """The issue body sent for a task: body followed by the task's marker."""
+    return f"{body.rstrip()}\n\n{render_marker(task)}"
+
+class Journal:
+    """Append-only JSON-lines record of an import, one file per CSV."""
+
+    def __init__(self, csv_path, directory=JOURNAL_DIR):
+        self.path = Path(directory) / f"{Path(csv_path).stem}.jsonl"
+
+    def load(self):
+        """Created issues by task key, pending keys with the time their batch was sent,
+        and the keys whose issues have been assigned to their teams."""
+        created = {}
+        pending = {}
+        assigned = set()
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn last line from a crash mid-write
+                        continue
+                    if record['event'] == 'pending':
+                        for key in record['keys']:
+                            pending[key] = record['time']
+                    elif record['event'] == 'created':
+                        created[record['key']] = record
+                        pending.pop(record['key'], None)
+                    elif record['event'] == 'failed':
+                        pending.pop(record['key'], None)
+                    elif record['event'] == 'assigned':
+                        assigned.update(record['keys'])
+        except FileNotFoundError:
+            pass
+        return created, pending, assigned
+
+    def append(self, *records):
+        """Durably append records before the caller moves on."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+def now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def fetch_nodes(repo, connection, fields):
+    """Every node of a repository connection (labels, milestones, ...) via paginated GraphQL."""
+    owner, name = repo.split('/', 1)
+    query = f"""query($owner: String!, $name: String!, $after: String) {{
+  repository(owner: $owner, name: $name) {{
+    id
+    {connection}(first: 100, after: $after) {{ nodes {{ {fields} }} pageInfo {{ hasNextPage endCursor }} }}
+  }}
+}}"""
+    nodes = []
+    after = None
+    while True:
+        response = github_client.graphql(query, {'owner': owner, 'name': name, 'after': after})
+        repository = (response.get('data') or {}).get('repository')
+        if not repository:
+            for error in response.get('errors', []):
+                print(f"Error: {error.get('message')}")
+            return None, None
+        page = repository[connection]
+        nodes.extend(page['nodes'])
+        if not page['pageInfo']['hasNextPage']:
+            return repository['id'], nodes
+        after = page['pageInfo']['endCursor']
+
+def fetch_ids(repo):
+    """Repository node id plus label and milestone ids by name, or None on failure."""
+    repo_id, labels = fetch_nodes(repo, 'labels', 'id name')
+    if repo_id is None:
+        return None
+    _, milestones = fetch_nodes(repo, 'milestones', 'id title')
+    if milestones is None:
+        return None
+    return {
+        'repo': repo_id,
+        'labels': {label['name']: label['id'] for label in labels},
+        'milestones': {milestone['title']: milestone['id'] for milestone in milestones},
+    }
+
+def ensure_ids(repo, ids, tasks):
+    """Create labels and milestones the tasks use that the repository lacks; returns refreshed ids."""
+    labels = sorted({label for task in tasks for label in task['labels']} - set(ids['labels']))
+    milestones = sorted({task['milestone'] for task in tasks if task['milestone']} - set(ids['milestones']))
+    if not labels and not milestones:
+        return ids
+    sync_categories.run_concurrently(sync_categories.create_label, labels, repo)
+    sync_categories.run_concurrently(sync_categories.create_milestone, milestones, repo)
+    return fetch_ids(repo) or ids
+
+def issue_labels(issue):
+    """Every label name of an issue read with ISSUE_FIELDS, reading the pages after the first."""
+    page = issue['labels']
+    names = [label['name'] for label in page['nodes']]
+    while page['pageInfo']['hasNextPage']:
+        response = github_client.graphql(LABELS_QUERY, {'id': issue['id'], 'after': page['pageInfo']['endCursor']})
+        node = (response.get('data') or {}).get('node')
+        if not node:
+            raise RuntimeError(f"could not read all labels of issue #{issue['number']}")
+        page = node['labels']
+        names += [label['name'] for label in page['nodes']]
+    return names
+
+def build_index(repo, project_id=None):
+    """Existing issues keyed by marker key, or by title for issues without a marker; None on failure.
+
+    With a project id, each entry also holds the issue's board item and its dates.
+    """
+    fields = f"{ISSUE_FIELDS} {project_board.ITEM_FIELDS}" if project_id else ISSUE_FIELDS
+    index = {}
+    try:
+        for issue in github_client.iter_issues(repo, fields):
+            body, marker = split_marker(issue['body'])
+            key = marker['key'] if marker else issue['title']
+            if key in index and not marker:
+                continue
+            index[key] = {
+                'id': issue['id'], 'number': issue['number'], 'url': issue['url'], 'title': issue['title'],
+                'body': body, 'marker': marker,
+                'labels': issue_labels(issue),
+                'milestone': (issue['milestone'] or {}).get('title', ''),
+            }
+            if project_id:
+                index[key]['item'], index[key]['dates'] = project_board.item_state(issue, project_id)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        return None
+    return index
+
+def find_issue(index, task):
+    """The indexed issue of a task; a row with an id also adopts the issue its title was imported as."""
+    issue = index.get(task_key(task))
+    if issue is None and task['id']:
+        issue = index.get(task['title'])
+        if issue and issue['marker'] and issue['marker'].get('key') != task['title']:
+            # Keyed by another id: a different task with the same title
+            return None
+    return issue
+
+def changed_fields(task, issue):
+    """Fields of an existing issue to rewrite for its CSV row; empty when it is up to date."""
+    marker = issue['marker']
+    if marker:
+        changed = [name for name, value in field_hashes(task).items() if marker.get(name) != value]
+        if marker.get('key') != task_key(task):
+            changed.append('marker')
+        # A label that could not be created with the issue is attached once it exists
+        if 'labels' not in changed and set(task['labels']) - set(issue['labels']):
+            changed.append('labels')
+        return changed
+    # Created before markers existed: keep its body, fix labels and milestone, add the marker
+    changed = ['marker']
+    if sorted(issue['labels']) != sorted(task['labels']):
+        changed.append('labels')
+    if issue['milestone'] != task['milestone']:
+        changed.append('milestone')
+    return changed
+
+def mutation_results(response, prefix, count):
+    """(data, error) per alias prefix0..prefixN of an aliased mutation, or None without a response."""
+    if response.get('data') is None:
+        for error in response.get('errors', []):
+            print(f"Error: {error.get('message')}")
+        return None
+    data = response['data']
+
+    # Errors carry the alias of the mutation that failed in their path
+    failed = {}
+    for error in response.get('errors', []):
+        path = error.get('path') or []
+        failed[path[0] if path else None] = error.get('message')
+
+    results = []
+    for i in range(count):
+        alias = f'{prefix}{i}'
+        if data.get(alias) and alias not in failed:
+            results.append((data[alias], None))
+        else:
+            results.append((None, failed.get(alias) or failed.get(None) or 'no result'))
+    return results
+
+def build_issue_mutation(repo_id, tasks, ids):
+    """One aliased createIssue mutation for a batch of tasks."""
+    params = ['$repo: ID!']
+    fields = []
+    variables = {'repo': repo_id}
+    for i, task in enumerate(tasks):
+        params.append(f'$t{i}: String!, $b{i}: String, $l{i}: [ID!], $m{i}: ID')
+        fields.append(f'  i{i}: createIssue(input: {{repositoryId: $repo, title: $t{i}, body: $b{i}, '
+                      f'labelIds: $l{i}, milestoneId: $m{i}}}) {{ issue {{ id number url }} }}')
+        variables[f't{i}'] = task['title']
+        variables[f'b{i}'] = with_marker(task['body'], task)
+        variables[f'l{i}'] = [ids['labels'][label] for label in task['labels'] if label in ids['labels']]
+        variables[f'm{i}'] = ids['milestones'].get(task['milestone'])
+    query = f"mutation({', '.join(params)}) {{\n" + '\n'.join(fields) + '\n}'
+    return query, variables
+
+def create_issues(repo_id, tasks, ids):
+    """Create a batch of issues in one request.
+
+    Returns a list of (issue or None, error) per task, or None when no
+    response came back and the outcome of the batch is unknown.
+    """
+    query, variables = build_issue_mutation(repo_id, tasks, ids)
+    results = mutation_results(github_client.graphql(query, variables), 'i', len(tasks))
+    if results is None:
+        return None
+    return [((data or {}).get('issue'), error) for data, error in results]
+
+def build_update_mutation(updates, ids):
+    """One aliased updateIssue mutation for (task, issue, changed fields); only changed fields are sent."""
+    params = []
+    fields = []
+    variables = {}
+    for i, (task, issue, changed) in enumerate(updates):
+        # The body is always rewritten to refresh the marker; its text only if the CSV changed it
+        body = task['body'] if 'body' in changed else issue['body']
+        params.append(f'$id{i}: ID!, $b{i}: String')
+        inputs = [f'id: $id{i}', f'body: $b{i}']
+        variables[f'id{i}'] = issue['id']
+        variables[f'b{i}'] = with_marker(body, task)
+        if 'title' in changed:
+            params.append(f'$t{i}: String')
+            inputs.append(f'title: $t{i}')
+            variables[f't{i}'] = task['title']
+        if 'labels' in changed:
+            params.append(f'$l{i}: [ID!]')
+            inputs.append(f'labelIds: $l{i}')
+            variables[f'l{i}'] = [ids['labels'][label] for label in task['labels'] if label in ids['labels']]
+        if 'milestone' in changed:
+            params.append(f'$m{i}: ID')
+            inputs.append(f'milestoneId: $m{i}')
+            variables[f'm{i}'] = ids['milestones'].get(task['milestone'])
+        fields.append(f"  u{i}: updateIssue(input: {{{', '.join(inputs)}}}) {{ issue {{ id }} }}")
+    query = f"mutation({', '.join(params)}) {{\n" + '\n'.join(fields) + '\n}'
+    return query, variables
+
+def update_issues(updates, ids):
+    """Update a batch of issues in one request; returns an error or None per update, or None if no response."""
+    query, variables = build_update_mutation(updates, ids)
+    results = mutation_results(github_client.graphql(query, variables), 'u', len(updates))
+    if results is None:
+        return None
+    return [error for _, error in results]
+
+def find_issues(repo, keys, since):
+    """Issues whose marker key is in keys, created or updated since an ISO time; keyed by it."""
+    since_time = datetime.strptime(since, '%Y-%m-%dT%H:%M:%SZ') - timedelta(minutes=5)
+    status, issues = github_client.paginate(f'repos/{repo}/issues', {
+        'state': 'all', 'since': since_time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+    }, use_cache=False)
+    if status != 200:
+        print(f"Error: {github_client.error_message(issues)}")
+        return None
+    found = {}
+    for issue in issues:
+        if 'pull_request' in issue:
+            continue
+        _, marker = split_marker(issue.get('body'))
+        key = marker['key'] if marker else issue['title']
+        if key in keys:
+            found[key] = {'id': issue['node_id'], 'number': issue['number'], 'url': issue['html_url']}
+    return found
+
+def recover_pending(repo, journal, pending):
+    """Journal issues that an interrupted batch did create; returns their records or None on failure."""
+    if not pending:
+        return {}
+    found = find_issues(repo, set(pending), min(pending.values()))
+    if found is None:
+        return None
+    records = [{'event': 'created', 'key': key, 'time': now(), 'recovered': True, **found[key]}
+               for key in pending if key in found]
+    if records:
+        journal.append(*records)
+        print(f"✓ Recovered {len(records)} issues created by an interrupted run")
+    return {record['key']: record for record in records}
+
+def assign_teams(repo, journal, created, assigned, teams_by_key, workers=4, create_teams=False):
+    """Assign created issues to the teams of their rows; returns the number of issues assigned.
+
+    teams_by_key is the key index of the CSV rows, so each issue's row is a
+    dict lookup. Issues are grouped by team and every team is assigned in bulk.
+    Teams that do not exist are reported and skipped, unless create_teams.
+    """
+    todo = {key: teams_by_key[key] for key in created
+            if key not in assigned and teams_by_key.get(key)}
+    if not todo:
+        return 0
+    org = repo.split('/', 1)[0]
+    names = sorted({team for team_names in todo.values() for team in team_names})
+    existing = teams.ensure_child_teams(org, names, create=create_teams)
+    for team in names:
+        if teams.team_slug(team) not in existing:
+            count = sum(team in team_names for team_names in todo.values())
+            print(f"⚠️  Team '{team}' does not exist under {teams.PARENT_TEAM}, {count} issues not assigned to it "
+                  f"(create it, or use --create-teams)")
+
+    issues_by_team = {}
+    for key, team_names in todo.items():
+        for team in team_names:
+            if teams.team_slug(team) in existing:
+                issues_by_team.setdefault(team, []).append(created[key]['id'])
+    done = teams.assign_to_teams(org, issues_by_team, workers=workers)
+
+    # An issue is done once every one of its teams has been assigned
+    finished = [key for key, team_names in todo.items()
+                if all(created[key]['id'] in done.get(team, ()) for team in team_names)]
+    if finished:
+        journal.append({'event': 'assigned', 'keys': finished, 'time': now()})
+    return len(finished)
+
+def place_tasks(project_id, created, dates_by_key):
+    """Put created issues on the board with their CSV dates; returns the number placed."""
+    start_field, end_field = project_board.date_field_ids(project_id)
+    placements = []
+    for key, (start, end) in dates_by_key.items():
+        issue = created.get(key)
+        if issue:
+            placements.append(project_board.placement(issue['id'], {start_field: start, end_field: end},
+                                                      issue.get('item'), issue.get('dates')))
+    placements = [p for p in placements if p]
+    if not placements:
+        return 0
+    done = project_board.place_items(project_id, placements)
+    print(f"✓ Placed {len(done)} of {len(placements)} issues on the project board")
+    return len(done)
+
+def import_csv(path, repo, batch_size=20, dry_run=False, journal=None, assign=True, project_id=None,
+               create_teams=False):
+    """Upsert one CSV; returns a dict of created/updated/unchanged/failed/assigned/placed counts,
+    or None if it could not start."""
+    journal = journal or Journal(path)
+    _, pending, assigned = journal.load()
+    with tracing.span('index issues') as span:
+        index = build_index(repo, project_id)
+        span.set(issues=len(index or ()))
+    if index is None:
+        print("❌ Error: could not read the existing issues, not importing to avoid duplicates")
+        return None
+    # The index is read after any interrupted run, so it settles what that run created
+    settled = [{'event': 'created', 'key': key, 'time': now(), 'recovered': True,
+                **{field: index[key][field] for field in ('id', 'number', 'url')}}
+               for key in pending if key in index]
+    if settled and not dry_run:
+        journal.append(*settled)
+        print(f"✓ Found {len(settled)} issues created by an interrupted run")
+
+    counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'failed': 0, 'assigned': 0, 'placed': 0}
+    created = dict(index)
+    teams_by_key = {}
+    dates_by_key = {}
+    creates = []
+    updates = []
+    ids = None
+
+    def ready(tasks):
+        """Label and milestone ids for a batch, read only once something is written."""
+        nonlocal ids
+        ids = ids or fetch_ids(repo)
+        if ids is None:
+            print("✗ Could not read repository labels and milestones")
+            counts['failed'] += len(tasks)
+            return False
+        ids = ensure_ids(repo, ids, tasks)
+        return True
+
+    def flush_creates():
+        batch = creates[:]
+        creates.clear()
+        if not ready(batch):
+            return
+        sent = {'event': 'pending', 'keys': [task_key(task) for task in batch], 'time': now()}
+        journal.append(sent)
+        with tracing.span('create issues', issues=len(batch)):
+            results = create_issues(ids['repo'], batch, ids)
+        if results is None:
+            # Some issues may exist anyway: journal those, leave the rest pending for the next run
+            recovered = recover_pending(repo, journal, dict.fromkeys(sent['keys'], sent['time'])) or {}
+            created.update(recovered)
+            counts['created'] += len(recovered)
+            unknown = len(batch) - len(recovered)
+            counts['failed'] += unknown
+            if unknown:
+                print(f"✗ No response for {unknown} issues; they are checked again on the next run")
+            return
+
+        records = []
+        for task, (issue, error) in zip(batch, results):
+            if issue:
+                records.append({'event': 'created', 'key': task_key(task), 'row': task['row'],
+                                'time': now(), **issue})
+                created[task_key(task)] = records[-1]
+                print(f"✓ Created #{issue['number']}: {task['title']}")
+                counts['created'] += 1
+            else:
+                records.append({'event': 'failed', 'key': task_key(task), 'row': task['row'],
+                                'time': now(), 'error': error})
+                print(f"Error: {error}")
+                print(f"✗ Failed to create: {task['title']}")
+                counts['failed'] += 1
+        journal.append(*records)
+
+    def flush_updates():
+        batch = updates[:]
+        updates.clear()
+        if not ready([task for task, _, _ in batch]):
+            return
+        # Updates are idempotent, so an unanswered batch is simply retried on the next run
+        with tracing.span('update issues', issues=len(batch)):
+            errors = update_issues(batch, ids) or ['no response'] * len(batch)
+        for (task, issue, changed), error in zip(batch, errors):
+            if error:
+                print(f"Error: {error}")
+                print(f"✗ Failed to update #{issue['number']}: {task['title']}")
+                counts['failed'] += 1
+            else:
+                print(f"✓ Updated #{issue['number']} ({', '.join(changed)}): {task['title']}")
+                counts['updated'] += 1
+
+    for task in read_tasks(path):
+        key = task_key(task)
+        teams_by_key[key] = task['assignees']
+        dates_by_key[key] = (task['start_date'], task['end_date'])
+        issue = find_issue(index, task)
+        if issue:
+            created[key] = issue
+        changed = changed_fields(task, issue) if issue else None
+
+        if issue and not changed:
+            counts['unchanged'] += 1
+        elif dry_run:
+            if issue:
+                print(f"   ~ would update #{issue['number']} ({', '.join(changed)}): {task['title']}")
+                counts['updated'] += 1
+            else:
+                print(f"   + would create: {task['title']} ({task['milestone'] or 'no milestone'})")
+                counts['created'] += 1
+        elif issue:
+            updates.append((task, issue, changed))
+            if len(updates) >= batch_size:
+                flush_updates()
+        else:
+            creates.append(task)
+            if len(creates) >= batch_size:
+                flush_creates()
+    if creates:
+        flush_creates()
+    if updates:
+        flush_updates()
+
+    if assign and not dry_run:
+        with tracing.span('assign teams'):
+            counts['assigned'] = assign_teams(repo, journal, created, assigned, teams_by_key,
+                                              create_teams=create_teams)
+    if project_id and not dry_run:
+        with tracing.span('place on board'):
+            counts['placed'] = place_tasks(project_id, created, dates_by_key)
+    return counts
+
+def estimate_csv(path, repo, batch_size=20, journal=None, assign=True, project_id=None, create_teams=False):
+    """Rate-limit points ('core', 'graphql') and objects created ('creates') an import would use.
+
+    Returns None if the repository could not be read.
+    """
+    journal = journal or Journal(path)
+    _, _, assigned = journal.load()
+    index = build_index(repo, project_id)
+    ids = fetch_ids(repo) if index is not None else None
+    if ids is None:
+        return None
+    start_field, end_field = project_board.date_field_ids(project_id) if project_id else (None, None)
+
+    creates = updates = placements = 0
+    labels, milestones = set(), set()
+    issues_by_team = {}
+    for task in read_tasks(path):
+        key = task_key(task)
+        issue = find_issue(index, task)
+        changed = changed_fields(task, issue) if issue else None
+        if issue is None:
+            creates += 1
+        elif changed:
+            updates += 1
+        if issue is None or changed:
+            labels.update(task['labels'])
+            milestones.add(task['milestone'])
+        if assign and key not in assigned:
+            for team in task['assignees']:
+                issues_by_team[team] = issues_by_team.get(team, 0) + 1
+        if project_id and project_board.placement(key, {start_field: task['start_date'], end_field: task['end_date']},
+                                                  issue and issue.get('item'), issue and issue.get('dates')):
+            placements += 1
+
+    batches = lambda count, size: -(-count // size)
+    new_labels = labels - set(ids['labels'])
+    new_milestones = milestones - {''} - set(ids['milestones'])
+    org = repo.split('/', 1)[0]
+    known_teams = set(teams.load_team_cache().get(f"{org}/{teams.team_slug(teams.PARENT_TEAM)}", []))
+    known_teams.add(teams.team_slug(teams.PARENT_TEAM))
+    new_teams = {team for team in issues_by_team if teams.team_slug(team) not in known_teams}
+    if not create_teams:
+        # Issues of missing teams are left unassigned
+        for team in new_teams:
+            del issues_by_team[team]
+        new_teams = set()
+
+    writes = batches(creates, batch_size) + batches(updates, batch_size)
+    graphql = writes + sum(batches(count, 50) for count in issues_by_team.values())
+    if new_labels or new_milestones:
+        # Label and milestone ids are re-read after each batch that created some
+        graphql += 2 * writes
+    if placements:
+        graphql += batches(placements, 25) + 1
+    core = len(new_labels) + len(new_milestones) + len(issues_by_team)
+    if new_teams:
+        # One listing, then a parent lookup and a create per team
+        core += 1 + 2 * len(new_teams)
+    print(f"   {creates} to create, {updates} to update, {placements} to place on the board, "
+          f"{len(new_labels)} labels, {len(new_milestones)} milestones and {len(new_teams)} teams to create")
+    return {'core': core, 'graphql': graphql,
+            'creates': creates + len(new_labels) + len(new_milestones) + len(new_teams)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import tasks from CSV files as GitHub issues")
+    parser.add_argument("csv", nargs="+", help="Task CSV files (e.g. ../src/framework_tasks.csv)")
+    parser.add_argument("--repo", help="GitHub repository (owner/repo) - uses current repo if not specified")
+    parser.add_argument("--batch-size", type=int, default=20, help="Issues per GraphQL request (default: 20)")
+    parser.add_argument("--project", default=project_board.PROJECT_ID,
+                        help=f"Project board the issues are added to (default: {project_board.PROJECT_ID})")
+    parser.add_argument("--no-project", action="store_true", help="Do not add issues to the project board")
+    team_mode = parser.add_mutually_exclusive_group()
+    team_mode.add_argument("--no-teams", action="store_true", help="Do not assign issues to their teams")
+    team_mode.add_argument("--create-teams", action="store_true",
+                           help=f"Create assignee teams missing under {teams.PARENT_TEAM} instead of skipping them")
+    parser.add_argument("--allow-new", action="store_true",
+                        help="Create labels and milestones in neither categories.txt nor the repository "
+                             "instead of refusing to import")
+    parser.add_argument("--no-validate", action="store_true",
+                        help="Import even if the CSVs have problems (see validate_tasks.py)")
+    parser.add_argument("--max-concurrent", type=int, default=scheduler.MAX_CONCURRENT,
+                        help=f"Warn about assignees with more tasks at once than this "
+                             f"(default: {scheduler.MAX_CONCURRENT}, 0 to skip)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--dry-run", action="store_true", help="List the issues that would be created or updated")
+    mode.add_argument("--estimate", action="store_true",
+                      help="Check whether the import fits in the rate-limit budget left, without writing")
+    parser.add_argument("--api-url", metavar="URL",
+                        help="GitHub API to use, e.g. http://127.0.0.1:8000 for fake_github.py")
+    parser.add_argument("--trace", metavar="FILE", help="Write a Chrome trace of the run's phases to FILE")
+    args = parser.parse_args()
+    if args.api_url:
+        github_client.use_api(args.api_url)
+    if args.trace:
+        tracing.enable(args.trace)
+
+    print("Importing tasks as GitHub issues")
+    print("================================")
+
+    repo = sync_categories.resolve_repo(args.repo)
+    if not repo:
+        print("❌ Error: could not determine the repository, use --repo OWNER/REPO")
+        return
+    print(f"Using repository: {repo}")
+
+    with tracing.span('validate csv'):
+        errors, warnings = validate_files(args.csv, repo, check_teams=not args.no_teams,
+                                          allow_new=args.allow_new, create_teams=args.create_teams)
+    print_problems(errors, warnings)
+    if errors and not args.no_validate:
+        print(f"\n❌ {len(errors)} problems in the task CSVs, nothing was imported (or use --no-validate)")
+        return
+    if args.max_concurrent:
+        with tracing.span('check workload'):
+            scheduler.check_csvs(args.csv, args.max_concurrent)
+
+    project_id = None if args.no_project else args.project
+    if args.estimate:
+        total = {'core': 0, 'graphql': 0, 'creates': 0}
+        for path in args.csv:
+            print(f"\n--- {Path(path).name} ---")
+            estimate = estimate_csv(path, repo, args.batch_size, assign=not args.no_teams, project_id=project_id,
+                                    create_teams=args.create_teams)
+            if estimate is None:
+                print("❌ Error: could not read the repository")
+                return
+            total = {key: total[key] + estimate[key] for key in total}
+        if github_client.check_budget(total):
+            print("\n✅ The import fits in the current rate-limit budget")
+        else:
+            print("\n❌ The import does not fit in the current rate-limit budget")
+        github_client.usage.report()
+        return
+
+    for path in args.csv:
+        print(f"\n--- {Path(path).name} ---")
+        counts = import_csv(path, repo, args.batch_size, args.dry_run, assign=not args.no_teams,
+                            project_id=project_id, create_teams=args.create_teams)
+        if counts is None:
+            continue
+        print(f"\n✅ {Path(path).name}:")
+        print(f"   Issues created: {counts['created']}")
+        print(f"   Issues updated: {counts['updated']}")
+        print(f"   Unchanged: {counts['unchanged']}")
+        print(f"   Failed: {counts['failed']}")
+        print(f"   Assigned to teams: {counts['assigned']}")
+        print(f"   Placed on the board: {counts['placed']}")
+    github_client.usage.report()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Local SQLite mirror of the planning repository
+
+Keeps the repository's issues, labels and milestones, the CVsTT child teams
+and their members, and the items of the project board in
+../.cache/mirror.sqlite, so analyses can query indexed tables instead of
+pulling everything from GitHub again.
+
+After the first run a refresh only transfers what changed:
+    issues         REST issues list with since=<latest updated_at seen>
+    labels,        ETag-cached list reads (github_client.paginate), which
+    milestones,    come back 304 and cost no budget when nothing changed
+    teams
+    project items  one light listing of item ids and updatedAt, then the
+                   field values of new or changed items only
+Issues deleted or transferred on GitHub are not noticed by a since query;
+--full drops the repository's rows and reads everything again.
+
+Tables (see SCHEMA): issues, issue_labels, issue_assignees, labels,
+milestones, teams, team_members, project_items, project_values, cursors.
+Each API URL gets its own database file, so a run against fake_github.py
+never mixes into the real mirror.
+
+Usage: python mirror.py [--repo OWNER/REPO] [--project ID] [--no-project] [--no-teams] [--full] [--api-url URL]
+
+    import mirror
+    db = mirror.connect()
+    mirror.issues(db, 'WCRP-CMIP/CVsTT-Project-Planning', state='open', label='EMD')
+    db.execute("SELECT login, COUNT(*) FROM issue_assignees GROUP BY login").fetchall()
+"""
+
+import sqlite3
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import github_client
+import project_board
+import sync_categories
+import teams
+import tracing
+
+DB_FILE = Path(__file__).parent.parent / ".cache" / "mirror.sqlite"
+
+# Bump when SCHEMA changes; an older database is dropped and rebuilt
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE cursors (
+    repo TEXT NOT NULL, resource TEXT NOT NULL, cursor TEXT, synced_at TEXT,
+    PRIMARY KEY (repo, resource));
+CREATE TABLE issues (
+    repo TEXT NOT NULL, number INTEGER NOT NULL, node_id TEXT NOT NULL, title TEXT, body TEXT,
+    state TEXT, url TEXT, milestone TEXT, created_at TEXT, updated_at TEXT, closed_at TEXT,
+    PRIMARY KEY (repo, number));
+CREATE UNIQUE INDEX issues_node_id ON issues (node_id);
+CREATE INDEX issues_state ON issues (repo, state);
+CREATE INDEX issues_milestone ON issues (repo, milestone);
+CREATE TABLE issue_labels (
+    repo TEXT NOT NULL, number INTEGER NOT NULL, label TEXT NOT NULL,
+    PRIMARY KEY (repo, number, label)) WITHOUT ROWID;
+CREATE INDEX issue_labels_label ON issue_labels (repo, label);
+CREATE TABLE issue_assignees (
+    repo TEXT NOT NULL, number INTEGER NOT NULL, login TEXT NOT NULL,
+    PRIMARY KEY (repo, number, login)) WITHOUT ROWID;
+CREATE INDEX issue_assignees_login ON issue_assignees (login);
+CREATE TABLE labels (
+    repo TEXT NOT NULL, name TEXT NOT NULL, node_id TEXT, color TEXT, description TEXT,
+    PRIMARY KEY (repo, name));
+CREATE TABLE milestones (
+    repo TEXT NOT NULL, number INTEGER NOT NULL, node_id TEXT, title TEXT, description TEXT, state TEXT,
+    due_on TEXT, open_issues INTEGER, closed_issues INTEGER, updated_at TEXT,
+    PRIMARY KEY (repo, number));
+CREATE INDEX milestones_title ON milestones (repo, title);
+CREATE TABLE teams (
+    org TEXT NOT NULL, slug TEXT NOT NULL, name TEXT, parent TEXT, description TEXT,
+    PRIMARY KEY (org, slug));
+CREATE TABLE team_members (
+    org TEXT NOT NULL, slug TEXT NOT NULL, login TEXT NOT NULL,
+    PRIMARY KEY (org, slug, login)) WITHOUT ROWID;
+CREATE INDEX team_members_login ON team_members (login);
+CREATE TABLE project_items (
+    project TEXT NOT NULL, item_id TEXT NOT NULL, updated_at TEXT, issue_node_id TEXT, repo TEXT, number INTEGER,
+    PRIMARY KEY (project, item_id));
+CREATE INDEX project_items_issue ON project_items (repo, number);
+CREATE TABLE project_values (
+    project TEXT NOT NULL, item_id TEXT NOT NULL, field TEXT NOT NULL, value TEXT,
+    PRIMARY KEY (project, item_id, field)) WITHOUT ROWID;
+"""
+
+# Item details fetched per nodes() request
+ITEM_BATCH = 50
+
+ITEM_IDS_QUERY = """query($project: ID!, $after: String) {
+  node(id: $project) {
+    ... on ProjectV2 {
+      items(first: 100, after: $after) {
+        nodes { id updatedAt }
+        pageInfo { hasNextPage endCursor }
+      }
+    }
+  }
+}"""
+
+ITEM_DETAILS_QUERY = """query($ids: [ID!]!) {
+  nodes(ids: $ids) {
+    ... on ProjectV2Item {
+      id updatedAt
+      content { ... on Issue { id number repository { nameWithOwner } } }
+      fieldValues(first: 30) {
+        nodes {
+          ... on ProjectV2ItemFieldDateValue { date field { ... on ProjectV2FieldCommon { name } } }
+          ... on ProjectV2ItemFieldTextValue { text field { ... on ProjectV2FieldCommon { name } } }
+          ... on ProjectV2ItemFieldNumberValue { number field { ... on ProjectV2FieldCommon { name } } }
+          ... on ProjectV2ItemFieldSingleSelectValue { name field { ... on ProjectV2FieldCommon { name } } }
+        }
+      }
+    }
+  }
+}"""
+
+def db_path():
+    """The mirror file for the current API: DB_FILE for GitHub, one per URL otherwise."""
+    url = github_client.api_url()
+    if url == github_client.DEFAULT_API_URL:
+        return DB_FILE
+    return DB_FILE.with_name(f"mirror-{hashlib.sha256(url.encode()).hexdigest()[:12]}.sqlite")
+
+def connect(path=None):
+    """Open the mirror database, creating (or rebuilding an outdated) schema; rows are sqlite3.Row."""
+    path = Path(path or db_path())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    if db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        with db:
+            for (table,) in db.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall():
+                db.execute(f"DROP TABLE {table}")
+            db.executescript(SCHEMA)
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return db
+
+def now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def get_cursor(db, repo, resource):
+    row = db.execute("SELECT cursor FROM cursors WHERE repo = ? AND resource = ?", (repo, resource)).fetchone()
+    return row['cursor'] if row else None
+
+def set_cursor(db, repo, resource, cursor):
+    db.execute("INSERT OR REPLACE INTO cursors VALUES (?, ?, ?, ?)", (repo, resource, cursor, now()))
+
+# Fetching: each returns plain data, or None if GitHub could not be read
+
+def fetch_issues(repo, since=None):
+    """Issues (not pull requests) updated since a timestamp, or all of them."""
+    params = {'state': 'all', 'sort': 'updated', 'direction': 'asc'}
+    if since:
+        params['since'] = since
+    # since changes every run, so these pages are not worth caching
+    status, data = github_client.paginate(f'repos/{repo}/issues', params, use_cache=False)
+    if status != 200:
+        print(f"Error: {github_client.error_message(data)}")
+        return None
+    return [issue for issue in data if 'pull_request' not in issue]
+
+def fetch_list(path, params=None):
+    status, data = github_client.paginate(path, params)
+    if status != 200:
+        print(f"Error: {github_client.error_message(data)}")
+        return None
+    return data
+
+def fetch_teams(org, parent=teams.PARENT_TEAM):
+    """(teams, {slug: [logins]}) of a parent team and its child teams, or None."""
+    children = fetch_list(f'orgs/{org}/teams/{teams.team_slug(parent)}/teams')
+    if children is None:
+        return None
+    found = [{'slug': teams.team_slug(parent), 'name': parent, 'parent': None, 'description': None}]
+    found += [{'slug': team['slug'], 'name': team['name'], 'parent': teams.team_slug(parent),
+               'description': team.get('description')} for team in children]
+    members = {}
+    for team in found:
+        logins = fetch_list(f"orgs/{org}/teams/{team['slug']}/members")
+        if logins is None:
+            return None
+        members[team['slug']] = [member['login'] for member in logins]
+    return found, members
+
+def fetch_item_stamps(project_id):
+    """{item id: updatedAt} of every item on a project, or None."""
+    stamps = {}
+    after = None
+    while True:
+        response = github_client.graphql(ITEM_IDS_QUERY, {'project': project_id, 'after': after})
+        project = (response.get('data') or {}).get('node')
+        if not project or 'items' not in project:
+            for error in response.get('errors', []):
+                print(f"Error: {error.get('message')}")
+            return None
+        page = project['items']
+        stamps.update((item['id'], item['updatedAt']) for item in page['nodes'] if item)
+        if not page['pageInfo']['hasNextPage']:
+            return stamps
+        after = page['pageInfo']['endCursor']
+
+def fetch_item_details(item_ids, workers=4):
+    """Content and {field name: value} of project items, in batches fetched concurrently; None on failure."""
+    batches = [item_ids[start:start + ITEM_BATCH] for start in range(0, len(item_ids), ITEM_BATCH)]
+
+    def fetch(batch):
+        response = github_client.graphql(ITEM_DETAILS_QUERY, {'ids': batch})
+        nodes = (response.get('data') or {}).get('nodes')
+        if nodes is None:
+            for error in response.get('errors', []):
+                print(f"Error: {error.get('message')}")
+        return nodes
+
+    items = []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches)))) as pool:
+        for nodes in pool.map(fetch, batches):
+            if nodes is None:
+                return None
+            items.extend(node for node in nodes if node)
+    return items
+
+def field_value(value):
+    for key in ('date', 'text', 'number', 'name'):
+        if key in value:
+            return value[key]
+    return None
+
+# Storing
+
+def store_issues(db, repo, issues):
+    rows = [(repo, issue['number'], issue['node_id'], issue['title'], issue.get('body') or '', issue['state'],
+             issue.get('html_url'), (issue.get('milestone') or {}).get('title'),
+             issue.get('created_at'), issue.get('updated_at'), issue.get('closed_at')) for issue in issues]
+    numbers = [(repo, issue['number']) for issue in issues]
+    db.executemany("INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    db.executemany("DELETE FROM issue_labels WHERE repo = ? AND number = ?", numbers)
+    db.executemany("DELETE FROM issue_assignees WHERE repo = ? AND number = ?", numbers)
+    db.executemany("INSERT OR IGNORE INTO issue_labels VALUES (?, ?, ?)",
+                   [(repo, issue['number'], label['name']) for issue in issues for label in issue['labels']])
+    db.executemany("INSERT OR IGNORE INTO issue_assignees VALUES (?, ?, ?)",
+                   [(repo, issue['number'], user['login']) for issue in issues for user in issue['assignees']])
+
+def store_labels(db, repo, labels):
+    db.execute("DELETE FROM labels WHERE repo = ?", (repo,))
+    db.executemany("INSERT OR REPLACE INTO labels VALUES (?, ?, ?, ?, ?)",
+                   [(repo, label['name'], label.get('node_id'), label.get('color'), label.get('description'))
+                    for label in labels])
+
+def store_milestones(db, repo, milestones):
+    db.execute("DELETE FROM milestones WHERE repo = ?", (repo,))
+    db.executemany("INSERT OR REPLACE INTO milestones VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                   [(repo, m['number'], m.get('node_id'), m['title'], m.get('description'), m['state'],
+                     m.get('due_on'), m.get('open_issues'), m.get('closed_issues'), m.get('updated_at'))
+                    for m in milestones])
+
+def store_teams(db, org, found, members):
+    db.execute("DELETE FROM teams WHERE org = ?", (org,))
+    db.execute("DELETE FROM team_members WHERE org = ?", (org,))
+    db.executemany("INSERT OR REPLACE INTO teams VALUES (?, ?, ?, ?, ?)",
+                   [(org, team['slug'], team['name'], team['parent'], team['description']) for team in found])
+    db.executemany("INSERT OR IGNORE INTO team_members VALUES (?, ?, ?)",
+                   [(org, slug, login) for slug, logins in members.items() for login in logins])
+
+def store_items(db, project_id, stamps, items):
+    """Store changed items and forget those no longer on the project."""
+    gone = [(project_id, item_id) for (item_id,) in
+            db.execute("SELECT item_id FROM project_items WHERE project = ?", (project_id,)).fetchall()
+            if item_id not in stamps]
+    db.executemany("DELETE FROM project_items WHERE project = ? AND item_id = ?", gone)
+    db.executemany("DELETE FROM project_values WHERE project = ? AND item_id = ?",
+                   gone + [(project_id, item['id']) for item in items])
+    for item in items:
+        content = item.get('content') or {}
+        db.execute("INSERT OR REPLACE INTO project_items VALUES (?, ?, ?, ?, ?, ?)",
+                   (project_id, item['id'], item['updatedAt'], content.get('id'),
+                    (content.get('repository') or {}).get('nameWithOwner'), content.get('number')))
+        db.executemany("INSERT OR REPLACE INTO project_values VALUES (?, ?, ?, ?)",
+                       [(project_id, item['id'], value['field']['name'], str(field_value(value)))
+                        for value in item['fieldValues']['nodes'] if value and value.get('field')])
+    return len(gone)
+
+def sync(db, repo, project_id=None, with_teams=True, full=False):
+    """Bring the mirror of a repository (and a project board) up to date; returns counts per table."""
+    org = repo.split('/', 1)[0]
+    if full:
+        with db:
+            for table in ('issues', 'issue_labels', 'issue_assignees', 'labels', 'milestones', 'cursors'):
+                db.execute(f"DELETE FROM {table} WHERE repo = ?", (repo,))
+            if project_id:
+                db.execute("DELETE FROM project_items WHERE project = ?", (project_id,))
+                db.execute("DELETE FROM project_values WHERE project = ?", (project_id,))
+
+    since = get_cursor(db, repo, 'issues')
+    known_items = {}
+    if project_id:
+        known_items = dict(db.execute("SELECT item_id, updated_at FROM project_items WHERE project = ?",
+                                      (project_id,)).fetchall())
+
+    # The reads are independent, so they run concurrently; rows are written afterwards on this thread
+    with ThreadPoolExecutor(max_workers=5) as pool, tracing.span('fetch', repo=repo):
+        futures = {
+            'issues': pool.submit(fetch_issues, repo, since),
+            'labels': pool.submit(fetch_list, f'repos/{repo}/labels'),
+            'milestones': pool.submit(fetch_list, f'repos/{repo}/milestones', {'state': 'all'}),
+        }
+        if with_teams:
+            futures['teams'] = pool.submit(fetch_teams, org)
+        if project_id:
+            futures['items'] = pool.submit(fetch_item_stamps, project_id)
+        fetched = {name: future.result() for name, future in futures.items()}
+
+    details = None
+    if fetched.get('items') is not None:
+        changed = [item_id for item_id, stamp in fetched['items'].items() if known_items.get(item_id) != stamp]
+        with tracing.span('fetch items', items=len(changed)):
+            details = fetch_item_details(changed) if changed else []
+
+    counts = {}
+    with db, tracing.span('store', repo=repo):
+        issues = fetched['issues']
+        if issues is not None:
+            # since is inclusive, so the issues updated last time come back; skip those unchanged
+            stored = dict(db.execute("SELECT number, updated_at FROM issues WHERE repo = ? AND updated_at >= ?",
+                                     (repo, since or '')).fetchall())
+            issues = [issue for issue in issues if stored.get(issue['number']) != issue['updated_at']]
+            store_issues(db, repo, issues)
+            if issues:
+                set_cursor(db, repo, 'issues', max([issue['updated_at'] for issue in issues] + [since or '']))
+            counts['issues'] = len(issues)
+        if fetched['labels'] is not None:
+            store_labels(db, repo, fetched['labels'])
+            counts['labels'] = len(fetched['labels'])
+        if fetched['milestones'] is not None:
+            store_milestones(db, repo, fetched['milestones'])
+            counts['milestones'] = len(fetched['milestones'])
+        if fetched.get('teams') is not None:
+            store_teams(db, org, *fetched['teams'])
+            counts['teams'] = len(fetched['teams'][0])
+        if details is not None:
+            removed = store_items(db, project_id, fetched['items'], details)
+            counts['project items'] = len(details)
+            counts['project items removed'] = removed
+    return counts
+
+# Queries
+
+def issues(db, repo, state=None, label=None, milestone=None, assignee=None):
+    """Issues of a repository as dicts with 'labels' and 'assignees' lists, optionally filtered."""
+    where = ["i.repo = ?"]
+    args = [repo]
+    if state:
+        where.append("i.state = ?")
+        args.append(state.lower())
+    if milestone:
+        where.append("i.milestone = ?")
+        args.append(milestone)
+    if label:
+        where.append("EXISTS (SELECT 1 FROM issue_labels l WHERE l.repo = i.repo AND l.number = i.number "
+                     "AND l.label = ?)")
+        args.append(label)
+    if assignee:
+        where.append("EXISTS (SELECT 1 FROM issue_assignees a WHERE a.repo = i.repo AND a.number = i.number "
+                     "AND a.login = ?)")
+        args.append(assignee)
+    rows = db.execute(f"SELECT * FROM issues i WHERE {' AND '.join(where)} ORDER BY i.number", args).fetchall()
+
+    labels = {}
+    assignees = {}
+    for row in db.execute("SELECT number, label FROM issue_labels WHERE repo = ?", (repo,)):
+        labels.setdefault(row['number'], []).append(row['label'])
+    for row in db.execute("SELECT number, login FROM issue_assignees WHERE repo = ?", (repo,)):
+        assignees.setdefault(row['number'], []).append(row['login'])
+    return [dict(row, labels=labels.get(row['number'], []), assignees=assignees.get(row['number'], []))
+            for row in rows]
+
+def project_values(db, project_id, repo=None):
+    """{(repo, number): {field name: value}} of the issues on a project board."""
+    query = ("SELECT i.repo, i.number, v.field, v.value FROM project_items i "
+             "JOIN project_values v ON v.project = i.project AND v.item_id = i.item_id WHERE i.project = ?")
+    args = [project_id]
+    if repo:
+        query += " AND i.repo = ?"
+        args.append(repo)
+    values = {}
+    for row in db.execute(query, args):
+        values.setdefault((row['repo'], row['number']), {})[row['field']] = row['value']
+    return values
+
+def main():
+    parser = argparse.ArgumentParser(description="Mirror a repository's planning data into a local SQLite file")
+    parser.add_argument("--repo", help="GitHub repository (owner/repo) - uses current repo if not specified")
+    parser.add_argument("--project", default=project_board.PROJECT_ID,
+                        help=f"ProjectV2 node id (default: {project_board.PROJECT_ID})")
+    parser.add_argument("--no-project", action="store_true", help="Do not mirror the project board")
+    parser.add_argument("--no-teams", action="store_true", help="Do not mirror the CVsTT teams")
+    parser.add_argument("--full", action="store_true", help="Drop the repository's rows and read everything again")
+    parser.add_argument("--api-url", metavar="URL",
+                        help="GitHub API to use, e.g. http://127.0.0.1:8000 for fake_github.py")
+    args = parser.parse_args()
+    if args.api_url:
+        github_client.use_api(args.api_url)
+
+    print("Mirroring planning data")
+    print("=======================")
+
+    repo = sync_categories.resolve_repo(args.repo)
+    if not repo:
+        print("❌ Error: could not determine the repository, use --repo OWNER/REPO")
+        return
+
+    try:
+        db = connect()
+        project_id = None if args.no_project else args.project
+        since = get_cursor(db, repo, 'issues')
+        print(f"Repository: {repo}" + (f" (issues changed since {since})" if since and not args.full else ""))
+        counts = sync(db, repo, project_id, not args.no_teams, args.full)
+        totals = {
+            'issues': db.execute("SELECT COUNT(*) FROM issues WHERE repo = ?", (repo,)).fetchone()[0],
+            'labels': db.execute("SELECT COUNT(*) FROM labels WHERE repo = ?", (repo,)).fetchone()[0],
+            'milestones': db.execute("SELECT COUNT(*) FROM milestones WHERE repo = ?", (repo,)).fetchone()[0],
+            'teams': db.execute("SELECT COUNT(*) FROM teams WHERE org = ?",
+                                (repo.split('/', 1)[0],)).fetchone()[0],
+            'project items': db.execute("SELECT COUNT(*) FROM project_items WHERE project = ?",
+                                        (project_id,)).fetchone()[0],
+        }
+        for name, total in totals.items():
+            if name not in counts:
+                if name == 'teams' and args.no_teams or name == 'project items' and not project_id:
+                    continue
+                print(f"✗ {name}: could not be read, {total} kept from the last run")
+            elif name == 'issues' or name == 'project items':
+                removed = counts.get(f"{name} removed")
+                print(f"✓ {name}: {counts[name]} changed" + (f", {removed} removed" if removed else "")
+                      + f", {total} in the mirror")
+            else:
+                print(f"✓ {name}: {total}")
+        print(f"\n✅ Mirror written to {db_path()}")
+        db.close()
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    github_client.usage.report()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Put issues on the CVsTT ProjectV2 board and set their start/end dates
+
+Adding an item (addProjectV2ItemById) and setting each date field
+(updateProjectV2ItemFieldValue) are batched as aliased mutations, dozens of
+items per request. A date can only be set once the item id is known, so the
+requests are pipelined: each one sets the dates of the items added by the
+previous request and adds the next batch.
+
+The project's field ids are resolved once per project and cached in
+../.cache/project_fields.json; the cache is only refreshed when a field name
+is missing from it.
+
+Usage: python project_board.py [--project ID] [--refresh]
+       (lists the project's fields and the date fields used by the importer)
+"""
+
+import os
+import json
+import argparse
+from pathlib import Path
+
+import github_client
+
+PROJECT_ID = 'PVT_kwDOATRwu84A60Fm'
+FIELD_CACHE_FILE = Path(__file__).parent.parent / ".cache" / "project_fields.json"
+START_FIELD = 'Start date'
+END_FIELD = 'End date'
+
+# Selection for an issue's project items and their date values, for github_client.iter_issues
+ITEM_FIELDS = ('projectItems(first: 10) { nodes { id project { id } fieldValues(first: 30) { nodes { '
+               '... on ProjectV2ItemFieldDateValue { date field { ... on ProjectV2FieldCommon { id } } } } } } }')
+
+_fields = {}
+
+def load_field_cache():
+    try:
+        with open(FIELD_CACHE_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def save_field_cache(cache):
+    FIELD_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = FIELD_CACHE_FILE.with_name(f".{FIELD_CACHE_FILE.name}.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp, FIELD_CACHE_FILE)
+
+def fetch_fields(project_id):
+    """Fields of a project as {name: {'id', 'type'}}, or None on failure."""
+    query = """query($project: ID!, $after: String) {
+  node(id: $project) {
+    ... on ProjectV2 {
+      fields(first: 100, after: $after) {
+        nodes { ... on ProjectV2FieldCommon { id name dataType } }
+        pageInfo { hasNextPage endCursor }
+      }
+    }
+  }
+}"""
+    fields = {}
+    after = None
+    while True:
+        response = github_client.graphql(query, {'project': project_id, 'after': after})
+        project = (response.get('data') or {}).get('node')
+        if not project or 'fields' not in project:
+            for error in response.get('errors', []):
+                print(f"Error: {error.get('message')}")
+            return None
+        page = project['fields']
+        for field in page['nodes']:
+            if field:
+                fields[field['name']] = {'id': field['id'], 'type': field['dataType']}
+        if not page['pageInfo']['hasNextPage']:
+            return fields
+        after = page['pageInfo']['endCursor']
+
+def project_fields(project_id, names=(), refresh=False):
+    """Fields of a project, from memory or the cache unless one of names is missing from it."""
+    fields = _fields.get(project_id)
+    if fields is None and not refresh:
+        fields = load_field_cache().get(github_client.cache_key(project_id))
+    known = {name.lower() for name in fields or ()}
+    if refresh or fields is None or any(name.lower() not in known for name in names):
+        fields = fetch_fields(project_id)
+        if fields is None:
+            return {}
+        cache = load_field_cache()
+        cache[github_client.cache_key(project_id)] = fields
+        save_field_cache(cache)
+    _fields[project_id] = fields
+    return fields
+
+def date_field_ids(project_id, start=START_FIELD, end=END_FIELD):
+    """(start field id, end field id) of a project; None for a date field it does not have."""
+    fields = project_fields(project_id, (start, end))
+    by_name = {name.lower(): field for name, field in fields.items()}
+    ids = []
+    for name in (start, end):
+        field = by_name.get(name.lower())
+        if not field or field['type'] != 'DATE':
+            print(f"⚠️  Project has no date field '{name}', it is not set")
+            ids.append(None)
+        else:
+            ids.append(field['id'])
+    return tuple(ids)
+
+def item_state(issue, project_id):
+    """(item id, {field id: date}) of an issue node queried with ITEM_FIELDS; (None, {}) if not on the board."""
+    for item in (issue.get('projectItems') or {}).get('nodes', []):
+        if item['project']['id'] == project_id:
+            dates = {value['field']['id']: value['date']
+                     for value in item['fieldValues']['nodes'] if value and 'date' in value}
+            return item['id'], dates
+    return None, {}
+
+def placement(content_id, dates, item=None, current=None):
+    """What to do to give an issue these {field id: date} values, or None if nothing is needed."""
+    current = current or {}
+    todo = {field: date for field, date in dates.items() if field and date and current.get(field) != date}
+    if item and not todo:
+        return None
+    return {'content': content_id, 'item': item, 'dates': todo}
+
+def build_board_mutation(project_id, adds, updates):
+    """One aliased mutation adding content ids (a0..) and setting (item, field, date) values (s0..)."""
+    params = ['$project: ID!']
+    fields = []
+    variables = {'project': project_id}
+    for i, content_id in enumerate(adds):
+        params.append(f'$c{i}: ID!')
+        fields.append(f'  a{i}: addProjectV2ItemById(input: {{projectId: $project, contentId: $c{i}}}) '
+                      f'{{ item {{ id }} }}')
+        variables[f'c{i}'] = content_id
+    for i, (item, field, date) in enumerate(updates):
+        params.append(f'$it{i}: ID!, $f{i}: ID!, $d{i}: Date!')
+        fields.append(f'  s{i}: updateProjectV2ItemFieldValue(input: {{projectId: $project, itemId: $it{i}, '
+                      f'fieldId: $f{i}, value: {{date: $d{i}}}}}) {{ projectV2Item {{ id }} }}')
+        variables.update({f'it{i}': item, f'f{i}': field, f'd{i}': date})
+    query = f"mutation({', '.join(params)}) {{\n" + '\n'.join(fields) + '\n}'
+    return query, variables
+
+def place_items(project_id, placements, batch_size=25):
+    """Add issues to the project and set their dates; returns the content ids that are fully done.
+
+    Each request adds up to batch_size items and sets the dates of the
+    items added by the request before it, so n items take about
+    n / batch_size + 1 requests.
+    """
+    placements = [p for p in placements if p]
+    done = {p['content'] for p in placements}
+    carried = []  # (content id, item id, field id, date) waiting for their item from the previous request
+
+    def send(adds, updates):
+        query, variables = build_board_mutation(project_id, [p['content'] for p in adds],
+                                                [(item, field, date) for _, item, field, date in updates])
+        response = github_client.graphql(query, variables)
+        data = response.get('data') or {}
+        failed = {(error.get('path') or [None])[0] for error in response.get('errors', [])}
+        for error in response.get('errors', []):
+            print(f"Error: {error.get('message')}")
+        ok = lambda alias: data.get(alias) and alias not in failed and None not in failed
+        for i, (content, _, _, _) in enumerate(updates):
+            if not ok(f's{i}'):
+                done.discard(content)
+        added = []
+        for i, p in enumerate(adds):
+            if ok(f'a{i}'):
+                added.extend((p['content'], data[f'a{i}']['item']['id'], field, date)
+                             for field, date in p['dates'].items())
+            else:
+                done.discard(p['content'])
+        return added
+
+    for start in range(0, len(placements), batch_size):
+        batch = placements[start:start + batch_size]
+        adds = [p for p in batch if not p['item']]
+        updates = carried + [(p['content'], p['item'], field, date)
+                             for p in batch if p['item'] for field, date in p['dates'].items()]
+        carried = send(adds, updates)
+    if carried:
+        send([], carried)
+    return done
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the fields of the project board")
+    parser.add_argument("--project", default=PROJECT_ID, help=f"ProjectV2 node id (default: {PROJECT_ID})")
+    parser.add_argument("--refresh", action="store_true", help="Re-read the fields instead of using the cache")
+    parser.add_argument("--api-url", metavar="URL",
+                        help="GitHub API to use, e.g. http://127.0.0.1:8000 for fake_github.py")
+    args = parser.parse_args()
+    if args.api_url:
+        github_client.use_api(args.api_url)
+
+    fields = project_fields(args.project, refresh=args.refresh)
+    if not fields:
+        print(f"❌ Error: could not read the fields of project {args.project}")
+        return
+    print(f"Fields of {args.project}:")
+    for name, field in sorted(fields.items()):
+        print(f"   • {name} ({field['type']}): {field['id']}")
+    start, end = date_field_ids(args.project)
+    print(f"\nStart date field: {start or 'missing'}")
+    print(f"End date field: {end or 'missing'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Who is busy when: a per-assignee interval index over task dates
+
+Each assignee's tasks are kept in an IntervalTree: the intervals sorted by
+start date form an implicit balanced binary tree (the middle of every range
+is its root), and every node also stores the latest end date below it.
+Building one is a sort, O(n log n); finding the k tasks that overlap a date
+range is O(log n + k), and whether any does is O(log n).
+
+A sweep over each assignee's sorted start and end dates gives the number of
+tasks running at once on every day, so the peak and the overload windows
+(days with more than a limit of tasks at once), with the tasks involved,
+take O(n log n) too.
+
+Dates are inclusive day numbers (datetime64[D] as integers); tasks without
+both a start and an end date are left out. import_tasks.py uses this to
+warn about overloaded assignees before it writes anything.
+
+Usage: python scheduler.py [CSV ...] [--mirror] [--repo OWNER/REPO] [--max-concurrent N]
+                           [--free FROM TO] [--today YYYY-MM-DD]
+
+    import scheduler
+    schedule = scheduler.Schedule.from_tasks(analytics.from_csv(paths))
+    schedule.overloads(5)
+    schedule.free('2025-07-01', '2025-07-31')
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+import analytics
+import github_client
+import mirror
+import project_board
+import sync_categories
+
+# More tasks than this at once is reported as an overload
+MAX_CONCURRENT = 5
+
+def to_day(value):
+    """Day number of a YYYY-MM-DD string, date or datetime64."""
+    return int(np.datetime64(value, 'D').astype(np.int64))
+
+def to_date(day):
+    return str(np.datetime64(int(day), 'D'))
+
+class IntervalTree:
+    """Static tree of (start, end, value) intervals with inclusive integer bounds."""
+
+    def __init__(self, intervals):
+        intervals = sorted(intervals, key=lambda interval: (interval[0], interval[1]))
+        self.starts = [interval[0] for interval in intervals]
+        self.ends = [interval[1] for interval in intervals]
+        self.values = [interval[2] for interval in intervals]
+        self.max_end = list(self.ends)
+        self._augment(0, len(intervals))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _augment(self, lo, hi):
+        if lo >= hi:
+            return float('-inf')
+        mid = (lo + hi) // 2
+        self.max_end[mid] = max(self.ends[mid], self._augment(lo, mid), self._augment(mid + 1, hi))
+        return self.max_end[mid]
+
+    def overlapping(self, start, end):
+        """Values of the intervals sharing at least one day with [start, end], in start order."""
+        found = []
+        self._search(0, len(self.starts), start, end, found)
+        return found
+
+    def _search(self, lo, hi, start, end, found):
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self.max_end[mid] < start:
+            # Everything in this range ends before the query starts
+            return
+        self._search(lo, mid, start, end, found)
+        if self.starts[mid] > end:
+            # mid and everything after it start after the query ends
+            return
+        if self.ends[mid] >= start:
+            found.append(self.values[mid])
+        self._search(mid + 1, hi, start, end, found)
+
+    def overlaps(self, start, end):
+        """Whether any interval shares a day with [start, end]."""
+        lo, hi = 0, len(self.starts)
+        pending = [(lo, hi)]
+        while pending:
+            lo, hi = pending.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self.max_end[mid] < start:
+                continue
+            if self.starts[mid] <= end and self.ends[mid] >= start:
+                return True
+            pending.append((lo, mid))
+            if self.starts[mid] <= end:
+                pending.append((mid + 1, hi))
+        return False
+
+    def concurrency(self):
+        """[(day, count)]: from each day on, count intervals are open at once, until the next step."""
+        events = sorted([(start, 1) for start in self.starts] + [(end + 1, -1) for end in self.ends])
+        steps = []
+        count = 0
+        for day, change in events:
+            count += change
+            if steps and steps[-1][0] == day:
+                steps[-1] = (day, count)
+            else:
+                steps.append((day, count))
+        return steps
+
+class Schedule:
+    """An IntervalTree of tasks per assignee."""
+
+    def __init__(self, assignments):
+        """assignments: (assignee, start day, end day, task) tuples."""
+        by_assignee = {}
+        for assignee, start, end, task in assignments:
+            if end < start:
+                start, end = end, start
+            by_assignee.setdefault(assignee, []).append((start, end, task))
+        self.trees = {assignee: IntervalTree(intervals) for assignee, intervals in by_assignee.items()}
+
+    @classmethod
+    def from_tasks(cls, tasks):
+        """Schedule of an analytics.Tasks; tasks are identified by title (with '#number' for issues)."""
+        dated = ~np.isnat(tasks.start) & ~np.isnat(tasks.end)
+        starts = tasks.start.astype(np.int64)
+        ends = tasks.end.astype(np.int64)
+        labels = [f"#{number} {title}" if number else title for number, title in zip(tasks.numbers, tasks.titles)]
+        rows, columns = np.nonzero(tasks.assigned & dated[:, None])
+        return cls((tasks.assignee_names[column], int(starts[row]), int(ends[row]), labels[row])
+                   for row, column in zip(rows, columns))
+
+    @property
+    def assignees(self):
+        return sorted(self.trees)
+
+    def peak(self, assignee):
+        """(most tasks at once, first day it happens) for an assignee."""
+        steps = self.trees[assignee].concurrency()
+        if not steps:
+            return 0, None
+        day, count = max(steps, key=lambda step: (step[1], -step[0]))
+        return count, day
+
+    def overloads(self, limit=MAX_CONCURRENT, since=None):
+        """Windows where an assignee has more than limit tasks at once, ending on or after since.
+
+        Returns dicts with 'assignee', 'start', 'end' (day numbers), 'peak' and
+        'tasks' (every task overlapping the window), by assignee and date.
+        """
+        windows = []
+        for assignee in self.assignees:
+            tree = self.trees[assignee]
+            steps = tree.concurrency()
+            window = None
+            # The last step always drops to 0 tasks, so every window is closed
+            for (day, count), (next_day, _) in zip(steps, steps[1:] + [(None, 0)]):
+                if count > limit:
+                    if window is None:
+                        window = {'assignee': assignee, 'start': day, 'peak': count}
+                    window['peak'] = max(window['peak'], count)
+                    window['end'] = next_day - 1
+                elif window is not None:
+                    if since is None or window['end'] >= since:
+                        window['tasks'] = tree.overlapping(window['start'], window['end'])
+                        windows.append(window)
+                    window = None
+        return windows
+
+    def busy(self, start, end):
+        """{assignee: [tasks]} of everyone with a task between two dates (inclusive)."""
+        start, end = to_day(start), to_day(end)
+        found = {}
+        for assignee in self.assignees:
+            tasks = self.trees[assignee].overlapping(start, end)
+            if tasks:
+                found[assignee] = tasks
+        return found
+
+    def free(self, start, end, assignees=None):
+        """Assignees without any task between two dates (inclusive)."""
+        start, end = to_day(start), to_day(end)
+        return [assignee for assignee in (assignees or self.assignees)
+                if assignee not in self.trees or not self.trees[assignee].overlaps(start, end)]
+
+def print_overloads(windows, limit, most=5):
+    """Print overload windows as warnings, naming at most `most` tasks of each."""
+    for window in windows:
+        print(f"⚠️  {window['assignee']} has {window['peak']} tasks at once between "
+              f"{to_date(window['start'])} and {to_date(window['end'])} (more than {limit})")
+        for task in window['tasks'][:most]:
+            print(f"      - {task}")
+        if len(window['tasks']) > most:
+            print(f"      ... and {len(window['tasks']) - most} more")
+
+def check_csvs(paths, limit=MAX_CONCURRENT):
+    """Warn about assignees the CSVs give more than limit tasks at once; returns the number of windows."""
+    windows = Schedule.from_tasks(analytics.from_csv(paths)).overloads(limit)
+    print_overloads(windows, limit, most=3)
+    return len(windows)
+
+def main():
+    parser = argparse.ArgumentParser(description="Find over-allocated assignees and who is free when")
+    parser.add_argument("csv", nargs="*", help="Task CSV files (default: ../src/*.csv)")
+    parser.add_argument("--mirror", action="store_true", help="Read the issues from the local mirror (mirror.py)")
+    parser.add_argument("--repo", help="GitHub repository (owner/repo) for --mirror - uses current repo if not specified")
+    parser.add_argument("--project", help="Project board whose dates are used with --mirror (default: the CVsTT board)")
+    parser.add_argument("--max-concurrent", type=int, default=MAX_CONCURRENT,
+                        help=f"Tasks at once above which an assignee is overloaded (default: {MAX_CONCURRENT})")
+    parser.add_argument("--free", nargs=2, metavar=("FROM", "TO"),
+                        help="List who has no task between two dates (YYYY-MM-DD)")
+    parser.add_argument("--today", help="Only report overloads ending on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--api-url", metavar="URL", help="API whose mirror is read with --mirror")
+    args = parser.parse_args()
+
+    print("Assignee workload")
+    print("=================")
+
+    try:
+        if args.mirror:
+            if args.api_url:
+                github_client.use_api(args.api_url)
+            repo = sync_categories.resolve_repo(args.repo)
+            if not repo:
+                print("❌ Error: could not determine the repository, use --repo OWNER/REPO")
+                return
+            tasks = analytics.from_mirror(mirror.connect(), repo, args.project or project_board.PROJECT_ID)
+            print(f"Loaded {len(tasks)} issues of {repo} from the local mirror")
+        else:
+            paths = args.csv or sorted((Path(__file__).parent.parent / "src").glob("*.csv"))
+            tasks = analytics.from_csv(paths)
+            print(f"Loaded {len(tasks)} tasks from {len(paths)} CSV files")
+
+        schedule = Schedule.from_tasks(tasks)
+        print(f"\n   {'Assignee':<12}  Tasks  Peak  First at peak")
+        for assignee in schedule.assignees:
+            count, day = schedule.peak(assignee)
+            print(f"   {assignee:<12}  {len(schedule.trees[assignee]):5d}  {count:4d}  {to_date(day)}")
+
+        since = to_day(args.today) if args.today else None
+        windows = schedule.overloads(args.max_concurrent, since)
+        print()
+        print_overloads(windows, args.max_concurrent)
+        if not windows:
+            print(f"✅ Nobody has more than {args.max_concurrent} tasks at once")
+
+        if args.free:
+            start, end = args.free
+            free = schedule.free(start, end)
+            print(f"\nFree between {start} and {end}: {', '.join(free) or 'nobody'}")
+            for assignee, found in schedule.busy(start, end).items():
+                print(f"   {assignee}: {len(found)} tasks")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -5,79 +5,68 @@ Simple script to sync categories with GitHub labels and milestones
 Reads ../categories.txt with one category per line.
 Each category creates both a label and milestone with the same name.
 
-Usage: python sync_categories.py [--repo OWNER/REPO]
+The desired state from categories.txt is diffed against the repository and
+only the difference is written: --plan prints the creates, updates and
+deletes without touching GitHub, --apply (the default) executes them, and
+--estimate checks the plan's cost against the rate-limit budget left.
+Existing labels and milestones are left alone unless asked: --update-descriptions
+resets descriptions that differ from the generated ones (hand-edited ones
+included), and --prune deletes those not in categories.txt.
+
+Several repositories (--repo A/B C/D, or a selector such as 'WCRP-CMIP/CMIP7-*')
+are synced at the same time, each in its own process; the processes share
+one rate-limit pause and a cap on requests in flight (--max-requests), and a
+table of the results per repository is printed at the end.
+
+Usage: python sync_categories.py [--repo OWNER/REPO ...] [--plan | --apply | --estimate]
+                                 [--update-descriptions] [--prune]
+                                 [--workers N] [--jobs N] [--max-requests N] [--graphql]
+                                 [--batch-size N] [--trace FILE]
 """
 
-import subprocess
-import json
+import io
+import time
 import random
+import fnmatch
 import argparse
-from pathlib import Path
+import threading
+import contextlib
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from urllib.parse import quote
 
-def load_categories():
-    """Load categories from categories.txt file with format: label,milestone per line."""
-    categories_file = Path(__file__).parent.parent / "categories.txt"
-    entries = []
-    
-    with open(categories_file, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#'):
-                parts = line.split(',', 1)  # Split on first comma only
-                if len(parts) == 2:
-                    label = parts[0].strip()
-                    milestone = parts[1].strip()
-                    entries.append({
-                        'label': label,
-                        'milestone': milestone
-                    })
-                elif len(parts) == 1:
-                    # Single entry - use as both label and milestone
-                    category = parts[0].strip()
-                    entries.append({
-                        'label': category,
-                        'milestone': category
-                    })
-    
-    return entries
-
-def run_gh_command(cmd, repo=None):
-    """Run GitHub CLI command."""
-    full_cmd = ['gh'] + cmd
-    # Don't add --repo if not specified, use current directory's repo
-    if repo:
-        full_cmd.extend(['--repo', repo])
-    
-    try:
-        result = subprocess.run(full_cmd, capture_output=True, text=True, check=True)
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        print(f"Error: {e.stderr}")
-        return None
+import github_client
+import tracing
+from categories import load_categories
 
-def get_existing_labels(repo=None):
-    """Get existing labels from GitHub."""
-    output = run_gh_command(['label', 'list', '--json', 'name'], repo)
-    if output:
-        try:
-            labels = json.loads(output)
-            return [label['name'] for label in labels]
-        except json.JSONDecodeError:
-            return []
-    return []
-
-def get_existing_milestones(repo=None):
-    """Get existing milestones from GitHub using issues API."""
-    # Use gh api since milestone command doesn't exist in older versions
-    if repo:
-        api_path = f'repos/{repo}/milestones'
-    else:
-        api_path = 'repos/{owner}/{repo}/milestones'
+_print_lock = threading.Lock()
+
+# Labels every repository needs regardless of categories.txt
+ESSENTIAL_LABELS = ['CVsTT', 'task', 'discussion', 'general']
+
+# createLabel is still served under the labels preview on some GitHub versions
+LABELS_PREVIEW = {"Accept": "application/vnd.github.bane-preview+json"}
+
+def label_description(name):
+    return f'{name} related tasks'
+
+def milestone_description(name):
+    return f'{name} tasks and deliverables'
+
+def report(ok, success, failure, data=None):
+    """Print the outcome of a single write and pass it through.
     
-    output = run_gh_command(['api', api_path, '--jq', '.[].title'], repo)
-    if output:
-        return output.split('\n') if output else []
-    return []
+    Writes run on worker threads, so the lines are printed under a lock to
+    keep them from interleaving.
+    """
+    with _print_lock:
+        if ok:
+            print(f"✓ {success}")
+        else:
+            if data is not None:
+                print(f"Error: {github_client.error_message(data)}")
+            print(f"✗ {failure}")
+    return ok
 
 def random_hex_color():
     """Generate a random hex color (6 digit hex)."""
@@ -92,97 +81,437 @@ def random_hex_color():
 def create_label(name, repo=None):
     """Create a GitHub label with random hex color."""
     color = random_hex_color()
-    description = f'{name} related tasks'
+    description = label_description(name)
     
-    cmd = ['label', 'create', name, '--color', color, '--description', description]
-    result = run_gh_command(cmd, repo)
+    repo = resolve_repo(repo)
+    status, _, data = github_client.request('POST', f'repos/{repo}/labels',
+                                            {'name': name, 'color': color, 'description': description})
     
-    if result is not None:
-        print(f"✓ Created label: {name} (#{color})")
-        return True
-    else:
-        print(f"✗ Failed to create label: {name}")
-        return False
+    return report(status == 201, f"Created label: {name} (#{color})", f"Failed to create label: {name}", data)
 
 def create_milestone(name, repo=None):
     """Create a GitHub milestone using API."""
-    description = f'{name} tasks and deliverables'
+    description = milestone_description(name)
     
-    # Use gh api to create milestone
-    if repo:
-        api_path = f'repos/{repo}/milestones'
+    repo = resolve_repo(repo)
+    status, _, data = github_client.request('POST', f'repos/{repo}/milestones',
+                                            {'title': name, 'description': description})
+    
+    return report(status == 201, f"Created milestone: {name}", f"Failed to create milestone: {name}", data)
+
+def run_concurrently(func, items, repo=None, workers=4):
+    """Run func(item, repo) for every item on a bounded thread pool.
+
+    Rate limits are handled inside github_client, which pauses all workers
+    together and retries, so a throttled call is not reported as failed.
+    Returns a dict of item -> result.
+    """
+    if not items:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items)))) as pool:
+        return dict(zip(items, pool.map(lambda item: func(item, repo), items)))
+
+def resolve_repo(repo=None):
+    """Return OWNER/REPO, taken from the git remote if not specified."""
+    return repo or github_client.current_repo()
+
+def expand_repos(selectors):
+    """OWNER/REPO names for --repo arguments, or None if an owner's repositories cannot be listed.
+
+    A selector with a wildcard (WCRP-CMIP/*, WCRP-CMIP/CMIP7-*) stands for
+    every matching, non-archived repository of that organisation or user.
+    """
+    repos = []
+    for selector in selectors:
+        owner, _, pattern = selector.partition('/')
+        if not any(char in pattern for char in '*?['):
+            repos.append(selector)
+            continue
+        status, data = github_client.paginate(f'orgs/{owner}/repos', {'type': 'all'})
+        if status == 404:
+            status, data = github_client.paginate(f'users/{owner}/repos')
+        if status != 200:
+            print(f"Error: {github_client.error_message(data)}")
+            return None
+        matched = sorted(repo['full_name'] for repo in data
+                         if fnmatch.fnmatch(repo['name'], pattern) and not repo.get('archived'))
+        if not matched:
+            print(f"⚠️  No repository matches {selector}")
+        repos.extend(matched)
+    return list(dict.fromkeys(repos))
+
+def get_repository_id(repo):
+    """Get the GraphQL node id of a repository."""
+    owner, name = repo.split('/', 1)
+    query = """query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) { id }
+}"""
+    response = github_client.graphql(query, {'owner': owner, 'name': name})
+    repository = (response.get('data') or {}).get('repository')
+    if not repository:
+        for error in response.get('errors', []):
+            print(f"Error: {error.get('message')}")
+        return None
+    return repository['id']
+
+def build_label_mutation(repo_id, labels):
+    """Build one aliased createLabel mutation for a batch of (name, color, description) tuples."""
+    params = ['$repo: ID!']
+    fields = []
+    variables = {'repo': repo_id}
+    for i, (name, color, description) in enumerate(labels):
+        params.append(f'$n{i}: String!, $c{i}: String!, $d{i}: String')
+        fields.append(f'  l{i}: createLabel(input: {{repositoryId: $repo, name: $n{i}, '
+                      f'color: $c{i}, description: $d{i}}}) {{ label {{ name }} }}')
+        variables[f'n{i}'] = name
+        variables[f'c{i}'] = color
+        variables[f'd{i}'] = description
+    query = f"mutation({', '.join(params)}) {{\n" + '\n'.join(fields) + '\n}'
+    return query, variables
+
+def create_labels_batched(names, repo=None, batch_size=50):
+    """Create labels through aliased GraphQL mutations, batch_size labels per request.
+
+    Returns a dict of label name -> True/False, one entry per requested label.
+    """
+    results = {name: False for name in names}
+    if not names:
+        return results
+
+    repo = resolve_repo(repo)
+    repo_id = get_repository_id(repo) if repo else None
+    if not repo_id:
+        for name in names:
+            print(f"✗ Failed to create label: {name}")
+        return results
+
+    for start in range(0, len(names), batch_size):
+        batch = [(name, random_hex_color(), label_description(name))
+                 for name in names[start:start + batch_size]]
+        query, variables = build_label_mutation(repo_id, batch)
+        response = github_client.graphql(query, variables, headers=LABELS_PREVIEW)
+        data = response.get('data') or {}
+
+        # Errors carry the alias of the mutation that failed in their path
+        failed = {}
+        for error in response.get('errors', []):
+            path = error.get('path') or []
+            failed[path[0] if path else None] = error.get('message')
+
+        for i, (name, color, _) in enumerate(batch):
+            alias = f'l{i}'
+            ok = bool(data.get(alias)) and alias not in failed
+            message = failed.get(alias) or failed.get(None)
+            results[name] = report(ok, f"Created label: {name} (#{color})", f"Failed to create label: {name}",
+                                   {'message': message} if message else None)
+
+    return results
+
+def create_milestones_batched(names, repo=None, workers=4):
+    """Create milestones for the batched backend.
+
+    GitHub's GraphQL schema has no milestone mutation, so these still go
+    through the REST endpoint, one request per milestone.
+    """
+    return run_concurrently(create_milestone, names, repo, workers)
+
+def desired_state(categories):
+    """Labels and milestones categories.txt asks for, as name -> description dicts."""
+    labels = {name: label_description(name) for name in ESSENTIAL_LABELS + categories.labels}
+    milestones = {name: milestone_description(name) for name in categories.milestones}
+    return {'labels': labels, 'milestones': milestones}
+
+def read_state(repo):
+    """Labels and milestones currently in the repository, or None if they could not be read.
+
+    Both lists are fetched at the same time, so this costs one round trip
+    (two 304s when nothing changed since the last run).
+    """
+    with tracing.span('read labels and milestones'), ThreadPoolExecutor(max_workers=2) as pool:
+        labels = pool.submit(github_client.paginate, f'repos/{repo}/labels')
+        milestones = pool.submit(github_client.paginate, f'repos/{repo}/milestones', {'state': 'all'})
+        (label_status, label_data), (milestone_status, milestone_data) = labels.result(), milestones.result()
+
+    for status, data in ((label_status, label_data), (milestone_status, milestone_data)):
+        if status != 200:
+            print(f"Error: {github_client.error_message(data)}")
+            return None
+    return {
+        'labels': {label['name']: label for label in label_data},
+        'milestones': {milestone['title']: milestone for milestone in milestone_data},
+    }
+
+def build_plan(desired, actual, prune=False, update_descriptions=False):
+    """Diff desired against actual state into create/update/delete lists.
+
+    Updates are only planned with update_descriptions=True, and only
+    descriptions are compared: label colors are picked at random and never
+    updated. Deletes are only planned with prune=True.
+    """
+    plan = {}
+    for kind in ('labels', 'milestones'):
+        want, have = desired[kind], actual[kind]
+        plan[f'create_{kind}'] = sorted(set(want) - set(have))
+        stale = [name for name in set(want) & set(have) if (have[name].get('description') or '') != want[name]]
+        plan[f'update_{kind}'] = sorted(stale) if update_descriptions else []
+        plan[f'delete_{kind}'] = sorted(set(have) - set(want)) if prune else []
+    return plan
+
+def plan_size(plan):
+    return sum(len(items) for items in plan.values())
+
+def estimate_plan(plan, graphql=False, batch_size=50):
+    """Rate-limit points ('core', 'graphql') and objects created ('creates') if the plan is applied."""
+    labels = len(plan['create_labels'])
+    batches = -(-labels // batch_size)
+    return {
+        'core': plan_size(plan) - (labels if graphql else 0),
+        # One query for the repository id, then one mutation per batch
+        'graphql': 1 + batches if graphql and labels else 0,
+        'creates': labels + len(plan['create_milestones']),
+    }
+
+def print_plan(plan):
+    """Print every change the plan would make."""
+    symbols = {'create': '+', 'update': '~', 'delete': '-'}
+    for kind in ('labels', 'milestones'):
+        for action in ('create', 'update', 'delete'):
+            for name in plan[f'{action}_{kind}']:
+                print(f"   {symbols[action]} {action} {kind[:-1]}: {name}")
+    if not plan_size(plan):
+        print("   Nothing to do, repository is in sync")
+
+def update_label(name, repo):
+    """Reset a label's description."""
+    status, _, data = github_client.request('PATCH', f'repos/{repo}/labels/{quote(name, safe="")}',
+                                            {'description': label_description(name)})
+    return report(status == 200, f"Updated label: {name}", f"Failed to update label: {name}", data)
+
+def delete_label(name, repo):
+    """Delete a label."""
+    status, _, data = github_client.request('DELETE', f'repos/{repo}/labels/{quote(name, safe="")}')
+    return report(status == 204, f"Deleted label: {name}", f"Failed to delete label: {name}", data)
+
+def update_milestone(milestone, repo):
+    """Reset a milestone's description; takes the milestone as read from GitHub."""
+    name = milestone['title']
+    status, _, data = github_client.request('PATCH', f"repos/{repo}/milestones/{milestone['number']}",
+                                            {'description': milestone_description(name)})
+    return report(status == 200, f"Updated milestone: {name}", f"Failed to update milestone: {name}", data)
+
+def delete_milestone(milestone, repo):
+    """Delete a milestone; takes the milestone as read from GitHub."""
+    name = milestone['title']
+    status, _, data = github_client.request('DELETE', f"repos/{repo}/milestones/{milestone['number']}")
+    return report(status == 204, f"Deleted milestone: {name}", f"Failed to delete milestone: {name}", data)
+
+def apply_plan(plan, actual, repo, workers=4, graphql=False, batch_size=50):
+    """Execute exactly the changes in a plan; returns a dict of action -> number succeeded."""
+    done = {}
+    if graphql:
+        results = create_labels_batched(plan['create_labels'], repo, batch_size)
     else:
-        api_path = 'repos/{owner}/{repo}/milestones'
+        results = run_concurrently(create_label, plan['create_labels'], repo, workers)
+    done['create_labels'] = sum(results.values())
+    done['update_labels'] = sum(run_concurrently(update_label, plan['update_labels'], repo, workers).values())
+    done['delete_labels'] = sum(run_concurrently(delete_label, plan['delete_labels'], repo, workers).values())
+
+    done['create_milestones'] = sum(create_milestones_batched(plan['create_milestones'], repo, workers).values())
+    milestones = actual['milestones']
+    for action, func in (('update_milestones', update_milestone), ('delete_milestones', delete_milestone)):
+        results = run_concurrently(lambda title, repo: func(milestones[title], repo), plan[action], repo, workers)
+        done[action] = sum(results.values())
+    return done
+
+def sync_repo(categories, repo, plan_only=False, prune=False, workers=4, graphql=False, batch_size=50,
+              update_descriptions=False):
+    """Plan and, unless plan_only, apply the category sync for one repository.
     
-    cmd = ['api', api_path, '-X', 'POST', 
-           '-f', f'title={name}', '-f', f'description={description}']
-    result = run_gh_command(cmd, repo)
+    Returns {'plan': ..., 'done': ...} ('done' is None when nothing was applied),
+    or None if the repository state could not be read.
+    """
+    # Get existing labels and milestones
+    actual = read_state(repo)
+    if actual is None:
+        print("❌ Error: could not read labels and milestones, nothing changed")
+        return None
     
-    if result is not None:
-        print(f"✓ Created milestone: {name}")
-        return True
-    else:
-        print(f"✗ Failed to create milestone: {name}")
-        return False
+    print(f"Found {len(actual['labels'])} existing labels")
+    print(f"Found {len(actual['milestones'])} existing milestones")
+    
+    with tracing.span('plan sync'):
+        plan = build_plan(desired_state(categories), actual, prune, update_descriptions)
+    print("\n--- Plan ---")
+    print_plan(plan)
+    
+    if plan_only or not plan_size(plan):
+        return {'plan': plan, 'done': None}
+    
+    print(f"\n--- Applying plan ({workers} workers) ---")
+    with tracing.span('apply sync', changes=plan_size(plan)):
+        done = apply_plan(plan, actual, repo, workers, graphql, batch_size)
+    
+    print(f"\n✅ Summary:")
+    print(f"   Labels created: {done['create_labels']}")
+    print(f"   Labels updated: {done['update_labels']}")
+    print(f"   Labels deleted: {done['delete_labels']}")
+    print(f"   Milestones created: {done['create_milestones']}")
+    print(f"   Milestones updated: {done['update_milestones']}")
+    print(f"   Milestones deleted: {done['delete_milestones']}")
+    return {'plan': plan, 'done': done}
+
+def init_worker(resume_at, slots, trace):
+    """Set up a sync worker process: rate-limit pauses and request slots shared with the others."""
+    github_client.share_limits(resume_at, slots)
+    # A forked worker starts with a copy of the parent's calls and spans; they are the parent's to report
+    github_client.usage.take()
+    if trace:
+        tracing.enable(None)
+        tracing.collect()
+
+def sync_worker(categories, repo, plan_only, prune, workers, graphql, batch_size, update_descriptions):
+    """sync_repo for one repository in a worker process; its output and API calls are handed back."""
+    output = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(output), tracing.span('sync repository', repo=repo):
+        try:
+            outcome = sync_repo(categories, repo, plan_only, prune, workers, graphql, batch_size,
+                                update_descriptions)
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            outcome = None
+    return {
+        'outcome': outcome,
+        'output': output.getvalue(),
+        'seconds': time.perf_counter() - started,
+        'usage': github_client.usage.take(),
+        'trace': tracing.collect(),
+    }
+
+def sync_repos(categories, repos, plan_only=False, prune=False, workers=4, graphql=False, batch_size=50,
+               jobs=None, max_requests=8, update_descriptions=False):
+    """Sync several repositories at once, one worker process each; returns {repo: sync_worker result}.
+
+    The workers share one rate-limit pause and at most max_requests
+    requests in flight, so they slow down together instead of each
+    hammering GitHub. Each repository's output is printed when it is done.
+    """
+    context = multiprocessing.get_context()
+    resume_at = context.Value('d', 0.0)
+    slots = context.BoundedSemaphore(max_requests)
+    jobs = jobs or min(len(repos), 16)
+    results = {}
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context, initializer=init_worker,
+                             initargs=(resume_at, slots, tracing.enabled())) as pool:
+        futures = {pool.submit(sync_worker, categories, repo, plan_only, prune, workers, graphql, batch_size,
+                               update_descriptions): repo
+                   for repo in repos}
+        for future in as_completed(futures):
+            repo = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'outcome': None, 'output': f"❌ Error: {e}\n", 'seconds': 0.0, 'usage': ([], {}),
+                          'trace': ([], [])}
+            github_client.usage.add(*result['usage'])
+            tracing.merge(result['trace'])
+            print(f"\n=== {repo} ===")
+            print(result['output'], end='')
+            results[repo] = result
+    return results
+
+def print_results(results):
+    """One line per repository: changes planned or made, API calls and time."""
+    width = max(len(repo) for repo in results)
+    print(f"\n{'Repository':<{width}}  {'Labels +/~/-':>14}  {'Milestones +/~/-':>16}  {'Calls':>5}  {'Time':>6}  Result")
+    for repo in sorted(results):
+        result = results[repo]
+        outcome = result['outcome']
+        calls = len(result['usage'][0])
+        if outcome is None:
+            print(f"{repo:<{width}}  {'':>14}  {'':>16}  {calls:>5}  {result['seconds']:>5.1f}s  ❌ failed")
+            continue
+        plan, done = outcome['plan'], outcome['done']
+        counts = done or {action: len(items) for action, items in plan.items()}
+        labels = '/'.join(str(counts[f'{action}_labels']) for action in ('create', 'update', 'delete'))
+        milestones = '/'.join(str(counts[f'{action}_milestones']) for action in ('create', 'update', 'delete'))
+        if not plan_size(plan):
+            status = '✅ in sync'
+        elif done is None:
+            status = 'planned'
+        elif sum(done.values()) < plan_size(plan):
+            status = f"⚠️  {plan_size(plan) - sum(done.values())} changes failed"
+        else:
+            status = '✅ applied'
+        print(f"{repo:<{width}}  {labels:>14}  {milestones:>16}  {calls:>5}  {result['seconds']:>5.1f}s  {status}")
 
 def main():
     parser = argparse.ArgumentParser(description="Sync categories with GitHub labels and milestones")
-    parser.add_argument("--repo", help="GitHub repository (owner/repo) - uses current repo if not specified")
+    parser.add_argument("--repo", nargs="+",
+                        help="GitHub repositories (owner/repo, or owner/pattern such as 'WCRP-CMIP/CMIP7-*') "
+                             "- uses current repo if not specified")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--plan", action="store_true", help="Print the changes without writing anything")
+    mode.add_argument("--apply", action="store_true", help="Apply the changes (default)")
+    mode.add_argument("--estimate", action="store_true",
+                      help="Check whether the changes fit in the rate-limit budget left, without writing")
+    parser.add_argument("--update-descriptions", action="store_true",
+                        help="Also reset descriptions of existing labels and milestones to the generated ones")
+    parser.add_argument("--prune", action="store_true",
+                        help="Also delete labels and milestones that are not in categories.txt")
+    parser.add_argument("--graphql", action="store_true",
+                        help="Create labels in batched GraphQL mutations instead of one request each")
+    parser.add_argument("--batch-size", type=int, default=50,
+                        help="Labels per GraphQL request with --graphql (default: 50)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Number of concurrent create requests per repository (default: 4)")
+    parser.add_argument("--jobs", type=int,
+                        help="Repositories synced at once, one process each (default: all, at most 16)")
+    parser.add_argument("--max-requests", type=int, default=8,
+                        help="Requests in flight across all repositories (default: 8)")
+    parser.add_argument("--api-url", metavar="URL",
+                        help="GitHub API to use, e.g. http://127.0.0.1:8000 for fake_github.py")
+    parser.add_argument("--trace", metavar="FILE", help="Write a Chrome trace of the run's phases to FILE")
     args = parser.parse_args()
+    if args.api_url:
+        github_client.use_api(args.api_url)
+    if args.trace:
+        tracing.enable(args.trace)
     
     print("Syncing categories with GitHub")
     print("==============================")
     
-    if args.repo:
-        print(f"Using repository: {args.repo}")
-    else:
-        print("Using current repository")
-    
-    # Load categories
-    entries = load_categories()
-    print(f"Loaded {len(entries)} entries from categories.txt")
-    
-    # Get existing labels and milestones
-    existing_labels = get_existing_labels(args.repo)
-    existing_milestones = get_existing_milestones(args.repo)
+    # Load and validate categories
+    categories = load_categories()
+    print(f"Loaded {len(categories.entries)} entries from categories.txt")
+    for warning in categories.warnings:
+        print(f"⚠️  {warning}")
     
-    print(f"Found {len(existing_labels)} existing labels")
-    print(f"Found {len(existing_milestones)} existing milestones")
+    repos = expand_repos(args.repo) if args.repo else [resolve_repo()]
+    if not repos or None in repos:
+        print("❌ Error: could not determine the repository, use --repo OWNER/REPO")
+        return
     
-    labels_created = 0
-    
-    # Ensure essential labels exist first
-    essential_labels = ['CVsTT', 'task', 'discussion', 'general']
-    print("\n--- Creating essential labels ---")
-    for label_name in essential_labels:
-        if label_name not in existing_labels:
-            if create_label(label_name, args.repo):
-                labels_created += 1
-        else:
-            print(f"- Essential label already exists: {label_name}")
-    
-    # Create missing labels from categories
-    print("\n--- Creating category labels ---")
-    for entry in entries:
-        if entry['label'] not in existing_labels:
-            if create_label(entry['label'], args.repo):
-                labels_created += 1
-        else:
-            print(f"- Label already exists: {entry['label']}")
-    
-    # Create missing milestones
-    print("\n--- Creating missing milestones ---")
-    milestones_created = 0
-    for entry in entries:
-        if entry['milestone'] not in existing_milestones:
-            if create_milestone(entry['milestone'], args.repo):
-                milestones_created += 1
+    plan_only = args.plan or args.estimate
+    if len(repos) == 1:
+        print(f"Using repository: {repos[0]}")
+        outcomes = [sync_repo(categories, repos[0], plan_only, args.prune, args.workers,
+                              args.graphql, args.batch_size, args.update_descriptions)]
+    else:
+        print(f"Using {len(repos)} repositories: {', '.join(repos)}")
+        results = sync_repos(categories, repos, plan_only, args.prune, args.workers, args.graphql,
+                             args.batch_size, args.jobs, args.max_requests, args.update_descriptions)
+        print_results(results)
+        outcomes = [result['outcome'] for result in results.values()]
+
+    if args.estimate and all(outcomes):
+        estimates = [estimate_plan(outcome['plan'], args.graphql, args.batch_size) for outcome in outcomes]
+        estimate = {key: sum(e[key] for e in estimates) for key in ('core', 'graphql', 'creates')}
+        if github_client.check_budget(estimate):
+            print("\n✅ The sync fits in the current rate-limit budget")
         else:
-            print(f"- Milestone already exists: {entry['milestone']}")
-    
-    print(f"\n✅ Summary:")
-    print(f"   Labels created: {labels_created}")
-    print(f"   Milestones created: {milestones_created}")
+            print("\n❌ The sync does not fit in the current rate-limit budget")
+    github_client.usage.report()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Assign issues to CVsTT child teams in bulk
+
+Assigning an issue to a team adds the team's members as assignees. Issues
+are grouped by team so each team's members are looked up once, then
+assigned with aliased addAssigneesToAssignable GraphQL mutations, many
+issues per request and several requests at a time.
+
+The child teams known to exist under a parent team are cached in
+../.cache/teams.json, so the list is only re-read when a team is missing
+from the cache. Missing teams are only created when asked (create=True);
+this script creates the one it is given.
+
+Issues are read with github_client.iter_issues, a cursor-paginated GraphQL
+iterator, so there is no upper limit like `gh issue list --limit 1000`.
+
+Usage: python teams.py TEAM [--repo OWNER/REPO] [--parent CVsTT] [--description TEXT]
+       (assigns every issue in the repository to TEAM)
+"""
+
+import os
+import re
+import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import github_client
+import sync_categories
+
+TEAM_CACHE_FILE = Path(__file__).parent.parent / ".cache" / "teams.json"
+PARENT_TEAM = 'CVsTT'
+
+# GitHub accepts at most this many assignees per issue
+MAX_ASSIGNEES = 10
+
+def team_slug(name):
+    """GitHub's slug for a team name (e.g. 'CVs-Framework' -> 'cvs-framework')."""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+def load_team_cache():
+    try:
+        with open(TEAM_CACHE_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def save_team_cache(cache):
+    TEAM_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = TEAM_CACHE_FILE.with_name(f".{TEAM_CACHE_FILE.name}.{os.getpid()}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp, TEAM_CACHE_FILE)
+
+def fetch_child_teams(org, parent):
+    """Slugs of the child teams of a parent team, or None on failure."""
+    status, data = github_client.paginate(f'orgs/{org}/teams/{team_slug(parent)}/teams')
+    if status != 200:
+        print(f"Error: {github_client.error_message(data)}")
+        return None
+    return sorted(team['slug'] for team in data)
+
+def create_child_team(org, parent, name, description=None):
+    """Create a team under the parent team."""
+    status, _, data = github_client.request('GET', f'orgs/{org}/teams/{team_slug(parent)}')
+    if status != 200:
+        return sync_categories.report(False, '', f"Failed to find parent team: {parent}", data)
+    body = {'name': name, 'parent_team_id': data['id'], 'privacy': 'closed'}
+    if description:
+        body['description'] = description
+    status, _, data = github_client.request('POST', f'orgs/{org}/teams', body)
+    return sync_categories.report(status == 201, f"Created team: {name}", f"Failed to create team: {name}", data)
+
+def child_teams(org, names=(), parent=PARENT_TEAM):
+    """Slugs of the child teams of parent, or None if they cannot be read.
+
+    The cached list is trusted unless there is none or one of names is
+    missing from it; only then is it re-read (and cached).
+    """
+    cache = load_team_cache()
+    key = github_client.cache_key(f"{org}/{team_slug(parent)}")
+    known = cache.get(key)
+    wanted = {team_slug(name) for name in names} - {team_slug(parent)}
+    if known is None or wanted - set(known):
+        known = fetch_child_teams(org, parent)
+        if known is None:
+            return None
+        cache[key] = known
+        save_team_cache(cache)
+    return set(known)
+
+def ensure_child_teams(org, names, parent=PARENT_TEAM, descriptions=None, create=False):
+    """Slugs of the named teams that exist under parent, creating the missing ones if create is set.
+
+    The parent itself counts as existing.
+    """
+    descriptions = descriptions or {}
+    wanted = {team_slug(name): name for name in names if team_slug(name) != team_slug(parent)}
+    known = child_teams(org, names, parent)
+    if known is None:
+        return set()
+
+    missing = sorted(set(wanted) - known)
+    if create and missing:
+        for slug in missing:
+            if create_child_team(org, parent, wanted[slug], descriptions.get(wanted[slug])):
+                known.add(slug)
+        cache = load_team_cache()
+        cache[github_client.cache_key(f"{org}/{team_slug(parent)}")] = sorted(known)
+        save_team_cache(cache)
+
+    existing = {slug for slug in wanted if slug in known}
+    if any(team_slug(name) == team_slug(parent) for name in names):
+        existing.add(team_slug(parent))
+    return existing
+
+@lru_cache(maxsize=None)
+def team_member_ids(org, slug):
+    """Node ids of a team's members (child team members included), looked up once per run."""
+    status, data = github_client.paginate(f'orgs/{org}/teams/{slug}/members')
+    if status != 200:
+        print(f"Error: {github_client.error_message(data)}")
+        return ()
+    return tuple(member['node_id'] for member in data)
+
+def build_assign_mutation(issue_ids, assignee_ids):
+    """One aliased addAssigneesToAssignable mutation giving every issue the same assignees."""
+    params = ['$users: [ID!]!'] + [f'$i{i}: ID!' for i in range(len(issue_ids))]
+    fields = [f'  a{i}: addAssigneesToAssignable(input: {{assignableId: $i{i}, assigneeIds: $users}}) '
+              f'{{ clientMutationId }}' for i in range(len(issue_ids))]
+    variables = {'users': list(assignee_ids)}
+    variables.update({f'i{i}': issue_id for i, issue_id in enumerate(issue_ids)})
+    query = f"mutation({', '.join(params)}) {{\n" + '\n'.join(fields) + '\n}'
+    return query, variables
+
+def assign_batch(issue_ids, assignee_ids):
+    """Assign one batch; returns the set of issue ids that succeeded."""
+    query, variables = build_assign_mutation(issue_ids, assignee_ids)
+    response = github_client.graphql(query, variables)
+    data = response.get('data') or {}
+    failed = {(error.get('path') or [None])[0] for error in response.get('errors', [])}
+    for error in response.get('errors', []):
+        print(f"Error: {error.get('message')}")
+    return {issue_id for i, issue_id in enumerate(issue_ids)
+            if f'a{i}' in data and f'a{i}' not in failed and None not in failed}
+
+def assign_to_teams(org, issues_by_team, batch_size=50, workers=4):
+    """Assign issues to teams: {team name: [issue node ids]} -> {team name: set of assigned ids}.
+
+    Every team's members are looked up once, and all batches of all teams
+    are sent concurrently.
+    """
+    jobs = []
+    for team, issue_ids in issues_by_team.items():
+        members = team_member_ids(org, team_slug(team))
+        if not members:
+            print(f"⚠️  Team '{team}' has no members, nothing to assign")
+            continue
+        if len(members) > MAX_ASSIGNEES:
+            print(f"⚠️  Team '{team}' has {len(members)} members, only the first {MAX_ASSIGNEES} are assigned")
+            members = members[:MAX_ASSIGNEES]
+        issue_ids = list(dict.fromkeys(issue_ids))
+        for start in range(0, len(issue_ids), batch_size):
+            jobs.append((team, issue_ids[start:start + batch_size], members))
+
+    assigned = {team: set() for team in issues_by_team}
+    if not jobs:
+        return assigned
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as pool:
+        for (team, batch, _), done in zip(jobs, pool.map(lambda job: assign_batch(job[1], job[2]), jobs)):
+            assigned[team] |= done
+            sync_categories.report(len(done) == len(batch), f"Assigned {len(done)} issues to {team}",
+                                   f"Assigned {len(done)} of {len(batch)} issues to {team}")
+    return assigned
+
+def main():
+    parser = argparse.ArgumentParser(description="Assign every issue in a repository to a team")
+    parser.add_argument("team", help="Team name, created under the parent team if missing")
+    parser.add_argument("--repo", help="GitHub repository (owner/repo) - uses current repo if not specified")
+    parser.add_argument("--parent", default=PARENT_TEAM, help=f"Parent team (default: {PARENT_TEAM})")
+    parser.add_argument("--description", help="Description used if the team has to be created")
+    parser.add_argument("--batch-size", type=int, default=50, help="Issues per GraphQL request (default: 50)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent requests (default: 4)")
+    parser.add_argument("--api-url", metavar="URL",
+                        help="GitHub API to use, e.g. http://127.0.0.1:8000 for fake_github.py")
+    args = parser.parse_args()
+    if args.api_url:
+        github_client.use_api(args.api_url)
+
+    print("Assigning issues to team")
+    print("========================")
+
+    repo = sync_categories.resolve_repo(args.repo)
+    if not repo:
+        print("❌ Error: could not determine the repository, use --repo OWNER/REPO")
+        return
+    org = repo.split('/', 1)[0]
+
+    try:
+        if team_slug(args.team) not in ensure_child_teams(org, [args.team], args.parent,
+                                                          {args.team: args.description}, create=True):
+            print(f"❌ Error: team {args.team} does not exist and could not be created")
+            return
+        issue_ids = [issue['id'] for issue in github_client.iter_issues(repo, 'id')]
+        print(f"Found {len(issue_ids)} issues in {repo}")
+        assigned = assign_to_teams(org, {args.team: issue_ids}, args.batch_size, args.workers)
+        print(f"\n✅ Assigned {len(assigned[args.team])} issues to {args.team}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    github_client.usage.report()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Timing spans for the scripts, exported as a Chrome trace
+
+Phases (parsing categories.txt, rendering, YAML scanning, file writes,
+network calls, ...) are wrapped in spans. Tracing is off unless the
+CVSTT_TRACE environment variable or a script's --trace option names an
+output file; while off, span() hands back one shared no-op object, so a
+span costs a function call and a None check.
+
+When on, every span becomes a complete event in the Chrome trace format,
+written when the process exits. Open the file in chrome://tracing or
+https://ui.perfetto.dev; spans from worker threads show up on their own rows,
+and those of worker processes (handed over with collect()/merge()) under
+their own process.
+
+Usage:
+    import tracing
+    with tracing.span('render', file=filename):
+        ...
+    CVSTT_TRACE=trace.json python build.py   (or python build.py --trace trace.json)
+"""
+
+import os
+import json
+import time
+import atexit
+import threading
+from pathlib import Path
+
+_events = None
+_path = None
+_threads = {}
+_lock = threading.Lock()
+_origin = time.perf_counter_ns()
+
+class _Span:
+    """A timed region recorded as one complete ('X') event."""
+    __slots__ = ('name', 'cat', 'args', 'start')
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def set(self, **args):
+        """Attach more arguments, e.g. a status known only at the end."""
+        self.args.update(args)
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        event = {'name': self.name, 'cat': self.cat, 'ph': 'X', 'pid': os.getpid(),
+                 'tid': threading.get_ident(), 'ts': (self.start - _origin) / 1000,
+                 'dur': (end - self.start) / 1000}
+        if self.args:
+            event['args'] = self.args
+        with _lock:
+            _events.append(event)
+            _threads[(event['pid'], event['tid'])] = threading.current_thread().name
+        return False
+
+class _NullSpan:
+    """Shared stand-in while tracing is off."""
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL = _NullSpan()
+
+def enabled():
+    return _events is not None
+
+def enable(path):
+    """Start recording spans; they are written to path when the process exits.
+
+    With path None, spans are only recorded, for a worker process to hand
+    them to its parent with collect().
+    """
+    global _events, _path
+    with _lock:
+        if _events is None:
+            _events = []
+            atexit.register(write)
+        _path = Path(path) if path else None
+
+def span(name, cat='phase', **args):
+    """Context manager timing a region; does nothing unless tracing is enabled."""
+    if _events is None:
+        return _NULL
+    return _Span(name, cat, args)
+
+def collect():
+    """Remove and return the spans recorded so far, with the names of their threads."""
+    with _lock:
+        events = list(_events or ())
+        threads = list(_threads.items())
+        if _events is not None:
+            _events.clear()
+        _threads.clear()
+    return events, threads
+
+def merge(collected):
+    """Add spans returned by collect() in another process; they keep that process's id."""
+    events, threads = collected
+    if _events is None:
+        return
+    with _lock:
+        _events.extend(events)
+        _threads.update((tuple(key), name) for key, name in threads)
+
+def write():
+    """Write the recorded spans as a Chrome trace JSON file."""
+    if _events is None or _path is None:
+        return
+    with _lock:
+        events = list(_events)
+        threads = dict(_threads)
+    names = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+             for (pid, tid), name in threads.items()]
+    _path.parent.mkdir(parents=True, exist_ok=True)
+    with open(_path, 'w') as f:
+        json.dump({'traceEvents': names + events, 'displayTimeUnit': 'ms'}, f)
+    print(f"Trace with {len(events)} spans written to {_path}")
+
+if os.environ.get('CVSTT_TRACE'):
+    enable(os.environ['CVSTT_TRACE'])
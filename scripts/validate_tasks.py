@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Check task CSVs before importing them
+
+Every row of every file is checked and all problems are reported at once.
+Errors, which make import_tasks.py refuse to start:
+    - a missing title, or a duplicate id, or title in CSVs without ids
+      (rows are matched to issues by id, or by title when there is none)
+    - dates that are not YYYY-MM-DD, or an end_date before the start_date
+    - more than one milestone (an issue takes one; the rest would be dropped)
+    - titles, and bodies with the import's marker, longer than GitHub accepts
+    - labels and milestones in neither categories.txt nor the repository,
+      unless --allow-new lets the import create them
+    - assignee teams that do not exist under the CVsTT team, unless
+      --create-teams lets the import create them (--no-teams skips them)
+    - a repository whose labels, milestones or teams cannot be read
+Names that are allowed to be created are reported as warnings.
+
+The repository's labels and milestones and the CVsTT child teams are taken
+from what earlier runs cached (../.cache/github, ../.cache/teams.json) and
+only read from GitHub when nothing is cached, or when a team is missing
+from the cached list, so checking a few thousand rows usually takes a
+fraction of a second and no API calls.
+
+Usage: python validate_tasks.py CSV [CSV ...] [--repo OWNER/REPO] [--allow-new] [--create-teams | --no-teams] [--api-url URL]
+"""
+
+import re
+import csv
+import sys
+import argparse
+from datetime import date
+from pathlib import Path
+
+import github_client
+import sync_categories
+import teams
+from categories import load_categories
+
+COLUMNS = ('title', 'start_date', 'end_date', 'milestone', 'labels', 'assignees', 'content')
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+MAX_TITLE_LENGTH = 256
+MAX_BODY_LENGTH = 65536
+
+def split_list(value):
+    """Split a comma-separated CSV cell into stripped, non-empty items."""
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+def parse_date(value):
+    """A YYYY-MM-DD date, or None if the value is not one."""
+    if not DATE_PATTERN.fullmatch(value):
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+REPO_LISTS = {'labels': ('name', None), 'milestones': ('title', {'state': 'all'})}
+
+def repo_names(repo, kind, refresh=False):
+    """Names of the repository's labels or milestones, cached unless refresh; None if unreadable."""
+    field, params = REPO_LISTS[kind]
+    path = f'repos/{repo}/{kind}'
+    items = None if refresh else github_client.cached_list(path, params)
+    if items is None:
+        status, items = github_client.paginate(path, params)
+        if status != 200:
+            return None
+    return {item[field] for item in items}
+
+def known_names(repo=None, check_teams=True):
+    """What rows may refer to: {'labels', 'milestones', 'repo_labels', 'repo_milestones', 'teams'}.
+
+    The repository's labels and milestones and the CVsTT child teams are
+    read from GitHub only if earlier runs did not cache them; an entry is
+    None when it could not be read, or without a repo (or check_teams).
+    """
+    categories = load_categories()
+    known = {
+        'labels': set(categories.labels) | set(sync_categories.ESSENTIAL_LABELS),
+        'milestones': set(categories.milestones),
+        'repo_labels': None,
+        'repo_milestones': None,
+        'teams': None,
+    }
+    if repo:
+        for kind in REPO_LISTS:
+            known[f'repo_{kind}'] = repo_names(repo, kind)
+    if repo and check_teams:
+        known['teams'] = teams.child_teams(repo.split('/', 1)[0])
+        if known['teams'] is not None:
+            known['teams'].add(teams.team_slug(teams.PARENT_TEAM))
+    return known
+
+def is_known(kind, name, known):
+    """Whether a label, milestone or team name is known; one on the repository is too."""
+    if kind == 'teams':
+        name = teams.team_slug(name)
+    if name in known[kind]:
+        return True
+    on_repo = known.get(f'repo_{kind}')
+    return on_repo is not None and name in on_repo
+
+def check_row(row, known):
+    """(errors, names) for one CSV row; names are the (kind, name) pairs it refers to."""
+    # Imported here since import_tasks imports this module
+    from import_tasks import task_from_row, with_marker
+    errors = []
+    names = []
+
+    title = (row.get('title') or '').strip()
+    if not title:
+        errors.append("empty title")
+    elif len(title) > MAX_TITLE_LENGTH:
+        errors.append(f"title longer than {MAX_TITLE_LENGTH} characters")
+    # The body sent is the content with the import's hidden marker appended
+    task = task_from_row(row)
+    if len(with_marker(task['body'], task)) > MAX_BODY_LENGTH:
+        errors.append(f"content plus the import marker longer than GitHub's {MAX_BODY_LENGTH} characters")
+
+    dates = {}
+    for column in ('start_date', 'end_date'):
+        value = (row.get(column) or '').strip()
+        if value:
+            dates[column] = parse_date(value)
+            if dates[column] is None:
+                errors.append(f"{column} '{value}' is not a YYYY-MM-DD date")
+    if dates.get('start_date') and dates.get('end_date') and dates['end_date'] < dates['start_date']:
+        errors.append(f"end_date {dates['end_date']} is before start_date {dates['start_date']}")
+
+    milestones = split_list(row.get('milestone'))
+    if len(milestones) > 1:
+        errors.append(f"{len(milestones)} milestones ({', '.join(milestones)}): an issue takes one, "
+                      f"only '{milestones[0]}' would be set")
+    names += [('milestones', milestone) for milestone in milestones[:1]]
+    names += [('labels', label) for label in split_list(row.get('labels'))]
+    names += [('teams', team) for team in split_list(row.get('assignees'))]
+    return errors, names
+
+def validate_csv(path, known, titles=None, unknown=None):
+    """Check every row of a CSV; returns its errors as 'file row N (line L): message' strings.
+
+    titles maps the row keys (ids, or titles) seen so far to where they were seen, and
+    unknown collects {(kind, name): [where, ...]} for names missing from
+    known; pass the same dicts for several files.
+    """
+    titles = {} if titles is None else titles
+    unknown = {} if unknown is None else unknown
+    name = Path(path).name
+    errors = []
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        missing = [column for column in COLUMNS if column not in (reader.fieldnames or ())]
+        if 'title' in missing:
+            return [f"{name}: no title column"]
+
+        line = reader.line_num + 1
+        for row_number, row in enumerate(reader, 1):
+            where = f"{name} row {row_number} (line {line})"
+            line = reader.line_num + 1
+            row_errors, names = check_row(row, known)
+            # Rows are matched to issues by id, or by title when there is none
+            row_id = (row.get('id') or '').strip()
+            key = row_id or (row.get('title') or '').strip()
+            if key in titles:
+                row_errors.append(f"same {'id' if row_id else 'title'} as {titles[key]}: "
+                                  f"rows are matched to issues by {'id' if row_id else 'title'}")
+            elif key:
+                titles[key] = where
+            errors += [f"{where}: {message}" for message in row_errors]
+            for kind, value in names:
+                if known[kind] is not None and not is_known(kind, value, known):
+                    unknown.setdefault((kind, value), []).append(where)
+    return errors
+
+def validate_files(paths, repo=None, check_teams=True, allow_new=False, create_teams=False):
+    """Check several CSVs against the same names; returns (errors, warnings).
+
+    Labels and milestones the rows name but that do not exist are errors,
+    or warnings when allow_new lets the import create them; so are teams,
+    with create_teams. Without a repo only categories.txt is checked against.
+    """
+    known = known_names(repo, check_teams)
+    titles = {}
+    unknown = {}
+    errors = []
+    for path in paths:
+        errors += validate_csv(path, known, titles, unknown)
+
+    # The cached lists may predate names created since; re-read those with a miss once
+    org = repo.split('/', 1)[0] if repo else None
+    for kind in {kind for kind, _ in unknown} if repo else ():
+        names = [value for other, value in unknown if other == kind]
+        if kind == 'teams':
+            current = teams.child_teams(org, names)
+            if current is not None:
+                known['teams'] |= current
+        else:
+            current = repo_names(repo, kind, refresh=True)
+            if current is not None:
+                known[f'repo_{kind}'] = current
+        for value in names:
+            if is_known(kind, value, known):
+                del unknown[(kind, value)]
+
+    warnings = []
+    for (kind, value), places in unknown.items():
+        where = places[0] if len(places) == 1 else f"{len(places)} rows, first {places[0]}"
+        if kind == 'teams':
+            message = f"team '{value}' does not exist under {teams.PARENT_TEAM}, {where}"
+            allowed, option = create_teams, '--create-teams'
+        else:
+            on_repo = " or on the repository" if repo else ""
+            message = f"{kind[:-1]} '{value}' is not in categories.txt{on_repo}, {where}"
+            allowed, option = allow_new, '--allow-new'
+        if allowed:
+            warnings.append(f"{message}; the import creates it")
+        else:
+            errors.append(f"{message} (add it, or use {option})")
+
+    for kind in ('labels', 'milestones'):
+        if repo and known[f'repo_{kind}'] is None:
+            errors.append(f"Could not read the {kind} of {repo}, they were not checked")
+    if repo and check_teams and known['teams'] is None:
+        errors.append(f"Could not read the {teams.PARENT_TEAM} teams of {org}, assignee teams were not checked "
+                      f"(use --no-teams to import without them)")
+    return errors, warnings
+
+def print_problems(errors, warnings):
+    for warning in warnings:
+        print(f"⚠️  {warning}")
+    for error in errors:
+        print(f"❌ {error}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Check task CSVs before importing them")
+    parser.add_argument("csv", nargs="+", help="Task CSV files (e.g. ../src/framework_tasks.csv)")
+    parser.add_argument("--repo", help="GitHub repository (owner/repo) - uses current repo if not specified")
+    parser.add_argument("--allow-new", action="store_true",
+                        help="Labels and milestones that do not exist yet are warnings, not errors")
+    team_mode = parser.add_mutually_exclusive_group()
+    team_mode.add_argument("--create-teams", action="store_true",
+                           help="Assignee teams that do not exist yet are warnings, not errors")
+    team_mode.add_argument("--no-teams", action="store_true", help="Do not check assignee teams")
+    parser.add_argument("--api-url", metavar="URL",
+                        help="GitHub API checked against, e.g. http://127.0.0.1:8000 for fake_github.py")
+    args = parser.parse_args()
+    if args.api_url:
+        github_client.use_api(args.api_url)
+
+    repo = sync_categories.resolve_repo(args.repo)
+    if not repo:
+        print("❌ Error: could not determine the repository, use --repo OWNER/REPO")
+        return 1
+    errors, warnings = validate_files(args.csv, repo, check_teams=not args.no_teams,
+                                      allow_new=args.allow_new, create_teams=args.create_teams)
+    print_problems(errors, warnings)
+    if errors:
+        print(f"\n❌ {len(errors)} problems in {len(args.csv)} files")
+        return 1
+    print(f"\n✅ {len(args.csv)} files are ready to import")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
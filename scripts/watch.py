@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Regenerate issue templates and config.yml as their inputs change
+
+`python build.py --watch` keeps running after the build and watches
+categories.txt, custom_links.json, the Jinja2 sources in scripts/templates/
+and the hand-written templates in .github/ISSUE_TEMPLATE/. The parsed
+categories, the jobs and headers of the generated templates, the custom
+links and the YAML of every config entry stay in memory, so a change costs a
+diff rather than a rebuild:
+
+    categories.txt      templates of milestones whose labels changed are
+                        rendered, those of removed milestones deleted
+    templates/*.j2      every template of that kind is rendered
+    custom_links.json   only config.yml is rebuilt
+    hand-written *.yml  its header is re-read and config.yml rebuilt
+
+config.yml is assembled from the entries' YAML, of which only new or changed
+entries are serialised, and is written only when its text differs from the
+file. Generated files that are edited or deleted by hand are restored.
+
+Changes are picked up with inotify on Linux, and elsewhere (or with --poll)
+by comparing the directories' mtimes every POLL_INTERVAL seconds. Labels and
+milestones are not synced while watching.
+
+Usage: python build.py --watch [--poll] [--skip-sync]
+"""
+
+import os
+import json
+import time
+import yaml
+import ctypes
+import ctypes.util
+import select
+import struct
+from pathlib import Path
+
+import create_config
+import create_templates
+import tracing
+from categories import load_categories, CATEGORIES_FILE
+
+POLL_INTERVAL = 0.25
+
+# Editors save in several steps (write, rename, chmod); events arriving this
+# soon after the first one are handled together
+DEBOUNCE = 0.05
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+EVENT_HEADER = struct.Struct('iIII')
+
+class InotifyWatcher:
+    """Files changed in a few directories (not recursive), reported by Linux inotify."""
+
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+
+    def __init__(self, directories):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}
+        for directory in directories:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"cannot watch {directory}")
+            self.directories[wd] = Path(directory)
+
+    def wait(self):
+        """Block until files change; returns their paths, or None if the kernel dropped events."""
+        changed = set()
+        timeout = None
+        while True:
+            ready, _, _ = select.select([self.fd], [], [], timeout)
+            if not ready:
+                return changed
+            data = os.read(self.fd, 65536)
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    changed = None
+                elif changed is not None and name and wd in self.directories:
+                    changed.add(self.directories[wd] / os.fsdecode(name))
+            timeout = DEBOUNCE
+
+class PollingWatcher:
+    """Files changed in a few directories, found by comparing their mtimes and sizes."""
+
+    def __init__(self, directories, interval=POLL_INTERVAL):
+        self.directories = [Path(directory) for directory in directories]
+        self.interval = interval
+        self.stamps = self.scan()
+
+    def scan(self):
+        stamps = {}
+        for directory in self.directories:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            stamps[directory / entry.name] = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                continue
+        return stamps
+
+    def wait(self):
+        """Block until files change; returns their paths."""
+        while True:
+            time.sleep(self.interval)
+            stamps = self.scan()
+            changed = {path for path in stamps.keys() | self.stamps.keys()
+                       if stamps.get(path) != self.stamps.get(path)}
+            self.stamps = stamps
+            if changed:
+                return changed
+
+def make_watcher(directories, poll=False):
+    """An inotify watcher, or a polling one when asked or where inotify is unavailable."""
+    if not poll:
+        try:
+            return InotifyWatcher(directories)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify is not available ({e}), polling every {POLL_INTERVAL}s instead")
+    return PollingWatcher(directories)
+
+class Workspace:
+    """The templates' and config's inputs and outputs, kept in memory between changes."""
+
+    def __init__(self, template_dir=create_config.TEMPLATE_DIR):
+        self.template_dir = template_dir
+        self.categories = load_categories()
+        self.sources = {name: create_templates.template_source(name)
+                        for name in create_templates.TEMPLATES.values()}
+        # Brings the directory and the manifest up to date; normally writes nothing after a build
+        create_templates.generate_templates(self.categories, template_dir)
+        self.outputs = create_templates.template_outputs(self.categories)
+        self.manifest = create_templates.load_manifest()
+        self.rendered = {}
+        self.custom_links = create_config.load_custom_links()
+        self.general = {}
+        for path in sorted(template_dir.glob("*.yml")):
+            if self.is_general(path.name):
+                self.read_general(path)
+        self.entries = {}
+        self.config_text = None
+        self.update_config()
+
+    def is_general(self, filename):
+        """Whether a file in the template directory is a hand-written template."""
+        return (filename.endswith('.yml') and filename != "config.yml" and not filename.startswith('.')
+                and not create_templates.is_generated(filename))
+
+    def read_general(self, path):
+        metadata = create_config.read_template(path) if path.exists() else None
+        if metadata:
+            self.general[path.name] = metadata
+        else:
+            self.general.pop(path.name, None)
+
+    def write(self, filename, content):
+        """Write a generated template unless the file already holds content; returns whether it wrote."""
+        path = self.template_dir / filename
+        try:
+            if path.read_text() == content:
+                return False
+        except FileNotFoundError:
+            pass
+        with tracing.span('write template', 'io', file=filename):
+            create_templates.write_atomic(path, content)
+        print(f"✓ Created {filename}")
+        return True
+
+    def update_templates(self, changed_sources=()):
+        """Render the templates whose job changed and delete those no longer generated; returns (written, removed)."""
+        outputs = create_templates.template_outputs(self.categories)
+        stale = [filename for filename, job in outputs.items()
+                 if self.outputs.get(filename) != job or job[0] in changed_sources]
+        gone = [filename for filename in self.outputs if filename not in outputs]
+
+        with tracing.span('render templates', 'render', files=len(stale)):
+            rendered = create_templates.render_all([outputs[filename] for filename in stale])
+        written = 0
+        for filename, content in zip(stale, rendered):
+            name, data = outputs[filename]
+            self.manifest[filename] = {'hash': create_templates.input_hash(self.sources[name], data)}
+            self.manifest[filename].update(create_config.read_header(content))
+            self.rendered[filename] = content
+            written += self.write(filename, content)
+        for filename in gone:
+            self.manifest.pop(filename, None)
+            self.rendered.pop(filename, None)
+            self.remove(filename)
+        self.outputs = outputs
+
+        if stale or gone:
+            with tracing.span('write manifest', 'io'):
+                create_templates.write_atomic(create_templates.MANIFEST_FILE,
+                                              json.dumps(self.manifest, indent=2, sort_keys=True))
+        return written, len(gone)
+
+    def remove(self, filename):
+        path = self.template_dir / filename
+        if path.exists():
+            path.unlink()
+            print(f"✓ Removed {filename}")
+
+    def restore(self, filename):
+        """Put back a generated template that was edited or deleted by hand; returns whether it wrote."""
+        if filename not in self.outputs:
+            self.remove(filename)
+            return False
+        if filename not in self.rendered:
+            self.rendered[filename] = create_templates.render_template(*self.outputs[filename])
+        return self.write(filename, self.rendered[filename])
+
+    def dump_config(self, config):
+        """config.yml text, as yaml.dump writes it, serialising only entries not seen before."""
+        links = config['contact_links']
+        head = {key: value for key, value in config.items() if key != 'contact_links'}
+        if not links or list(config)[-1] != 'contact_links':
+            return yaml.dump(config, default_flow_style=False, sort_keys=False)
+        entries = {}
+        for link in links:
+            key = tuple(link.items())
+            if key not in entries:
+                entries[key] = self.entries.get(key) or yaml.dump([link], default_flow_style=False, sort_keys=False)
+        self.entries = entries
+        return (yaml.dump(head, default_flow_style=False, sort_keys=False) + "contact_links:\n"
+                + ''.join(entries[tuple(link.items())] for link in links))
+
+    def update_config(self):
+        """Rebuild config.yml in memory and write it if the file differs; returns whether it wrote."""
+        templates = [{'filename': filename, 'name': entry['name'], 'description': entry['description']}
+                     for filename, entry in self.manifest.items() if filename in self.outputs]
+        templates += self.general.values()
+        config = create_config.create_config_yml(templates, self.custom_links)
+        self.config_text = self.dump_config(config)
+        config_file = self.template_dir / "config.yml"
+        try:
+            if config_file.read_text() == self.config_text:
+                return False
+        except FileNotFoundError:
+            pass
+        with tracing.span('write config', 'io'):
+            create_templates.write_atomic(config_file, self.config_text)
+        print(f"✓ Created {config_file.name}")
+        return True
+
+    def apply(self, paths):
+        """Bring templates and config up to date after paths changed (None: anything may have).
+
+        Returns a one-line summary, or None if none of the paths is an input or output.
+        """
+        start = time.perf_counter()
+        if paths is None:
+            paths = {CATEGORIES_FILE, create_config.CUSTOM_LINKS_FILE}
+            paths |= {create_templates.TEMPLATE_SOURCE_DIR / name for name in self.sources}
+            paths |= set(self.template_dir.glob("*.yml")) | {self.template_dir / name for name in self.outputs}
+            paths |= {self.template_dir / name for name in self.general}
+        changed_sources = {path.name for path in paths
+                           if path.parent == create_templates.TEMPLATE_SOURCE_DIR and path.name in self.sources}
+        in_template_dir = {path.name for path in paths if path.parent == self.template_dir}
+        general = {name for name in in_template_dir if self.is_general(name)}
+        generated = {name for name in in_template_dir if create_templates.is_generated(name)}
+        inputs = sorted(name for name, hit in (
+            (CATEGORIES_FILE.name, CATEGORIES_FILE in paths),
+            (create_config.CUSTOM_LINKS_FILE.name, create_config.CUSTOM_LINKS_FILE in paths),
+        ) if hit) + sorted(changed_sources) + sorted(general)
+        if not inputs and not generated and "config.yml" not in in_template_dir:
+            return None
+
+        with tracing.span('watch update', files=len(paths)):
+            if CATEGORIES_FILE in paths:
+                self.reload_categories()
+            if create_config.CUSTOM_LINKS_FILE in paths:
+                self.reload_custom_links()
+            for name in changed_sources:
+                self.sources[name] = create_templates.template_source(name)
+            if changed_sources:
+                # auto_reload is off, so compiled templates are cached until told otherwise
+                create_templates.get_environment().cache.clear()
+            for name in general:
+                self.read_general(self.template_dir / name)
+
+            written, removed = self.update_templates(changed_sources)
+            # Our own writes come back as events too; those files already match
+            for name in sorted(generated):
+                if self.restore(name):
+                    written += 1
+            config_written = self.update_config()
+
+        elapsed = (time.perf_counter() - start) * 1000
+        if not inputs and not written and not removed and not config_written:
+            return None
+        what = ', '.join(inputs) or "generated files"
+        return (f"{what} changed: {written} templates written, {removed} removed, "
+                f"config.yml {'updated' if config_written else 'unchanged'} ({elapsed:.1f} ms)")
+
+    def reload_categories(self):
+        try:
+            categories = load_categories()
+        except FileNotFoundError:
+            print(f"⚠️  {CATEGORIES_FILE.name} is missing, keeping the last categories")
+            return
+        for warning in categories.warnings:
+            if warning not in self.categories.warnings:
+                print(f"⚠️  {warning}")
+        self.categories = categories
+
+    def reload_custom_links(self):
+        try:
+            self.custom_links = create_config.load_custom_links()
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not read {create_config.CUSTOM_LINKS_FILE.name} ({e}), keeping the last links")
+
+def watch(template_dir=create_config.TEMPLATE_DIR, poll=False):
+    """Regenerate templates and config.yml on every change until interrupted."""
+    template_dir.mkdir(parents=True, exist_ok=True)
+    directories = [CATEGORIES_FILE.parent, create_templates.TEMPLATE_SOURCE_DIR, template_dir]
+    # Watch first, so changes made while loading are not missed
+    watcher = make_watcher(directories, poll)
+    workspace = Workspace(template_dir)
+    how = "polling" if isinstance(watcher, PollingWatcher) else "inotify"
+    print(f"\n👀 Watching {CATEGORIES_FILE.name}, {create_config.CUSTOM_LINKS_FILE.name}, "
+          f"scripts/templates/ and {template_dir.name}/ ({how}), Ctrl-C to stop")
+    try:
+        while True:
+            changed = watcher.wait()
+            try:
+                summary = workspace.apply(changed)
+            except Exception as e:
+                print(f"❌ Error: {e}")
+                continue
+            if summary:
+                print(f"✅ {summary}")
+    except KeyboardInterrupt:
+        print("\nStopped watching")